@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Agent and model client construction overhead per run.
+
+Builds the agents of a worst-case run (Auditor + Bridge, then Architect,
+Artisan and QA Judge for each of 3 attempts = 11 agents) twice:
+- fresh: a new BedrockModel + Agent for every stage (the old behaviour)
+- pooled: the process-level model pool plus a per-run AgentPool
+
+No Bedrock calls are made, but boto3 still needs AWS_REGION to build clients.
+
+Usage:
+  python benchmarks/bench_agent_construction.py [--runs 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from strands import Agent
+from strands.models import BedrockModel
+
+from agent_pool import AgentPool
+from model.load import MODEL_ID, load_model, reset_model_pool
+
+ROLES_PER_RUN = ["auditor", "bridge"] + ["architect", "artisan", "qa_judge"] * 3
+
+
+def _fresh_factory(session_manager=None):
+    return Agent(model=BedrockModel(model_id=MODEL_ID), session_manager=session_manager, tools=[])
+
+
+def _pooled_factory(session_manager=None):
+    return Agent(model=load_model(), session_manager=session_manager, tools=[])
+
+
+def run_fresh() -> float:
+    start = time.perf_counter()
+    for _ in ROLES_PER_RUN:
+        _fresh_factory()
+    return time.perf_counter() - start
+
+
+def run_pooled() -> float:
+    factories = {role: _pooled_factory for role in set(ROLES_PER_RUN)}
+    start = time.perf_counter()
+    pool = AgentPool(factories)
+    for role in ROLES_PER_RUN:
+        pool.get(role)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure agent construction overhead")
+    parser.add_argument("--runs", type=int, default=5, help="Number of simulated runs")
+    args = parser.parse_args()
+
+    fresh = [run_fresh() for _ in range(args.runs)]
+    reset_model_pool()
+    # First pooled run pays the cold model build; later runs reuse the pool
+    pooled = [run_pooled() for _ in range(args.runs)]
+
+    print(f"agents per run: {len(ROLES_PER_RUN)}")
+    print(f"fresh : median {statistics.median(fresh) * 1000:.1f} ms/run")
+    print(f"pooled: median {statistics.median(pooled) * 1000:.1f} ms/run "
+          f"(cold {pooled[0] * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
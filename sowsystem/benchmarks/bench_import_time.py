@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Cold start cost of the runner and the agent module.
+
+Runs each target in a fresh interpreter with `python -X importtime` and
+reports the median wall time, the total import time and the most
+expensive top-level imports:
+- runner --help: argument parsing only
+- runner --dry-run: workspace setup for a small throwaway project, no agents
+- import main: what the AgentCore entrypoint and runner.py load up front
+  (the workflow modules; strands, models, tools and MCP clients are only
+  imported when invoke runs)
+
+Usage:
+  python benchmarks/bench_import_time.py [--runs 5] [--top 8] [--max-ms 1000]
+
+--max-ms fails (exit 1) when any target's median wall time exceeds it, so
+the script can guard startup cost in CI.
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# "import time:  self [us] | cumulative | imported package"
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _targets(project: Path, workspaces: Path) -> dict:
+    """name -> (interpreter arguments, working directory, import depth to break down)"""
+    runner = str(ROOT / "runner.py")
+    return {
+        "runner --help": ([runner, "--help"], ROOT, 0),
+        "runner --dry-run": ([runner, str(project), "--sow", str(project / "sow.md"), "--dry-run",
+                              "--workspace-dir", str(workspaces)], ROOT, 0),
+        # Depth 1: the modules main itself imports (none of them should pull in strands)
+        "import main": (["-c", "import main"], ROOT / "src", 1),
+    }
+
+
+def _parse_importtime(stderr: str, depth: int):
+    """
+    Total import time and the cumulative time of each import at a nesting depth
+
+    Returns:
+        (total microseconds, {module: cumulative microseconds})
+    """
+    total, modules = 0, {}
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        level = len(match.group(3)) // 2
+        if level == 0:
+            total += int(match.group(2))
+        if level == depth:
+            modules[match.group(4)] = int(match.group(2))
+    return total, modules
+
+
+def measure(args: list, cwd: Path, depth: int = 0):
+    """
+    Run a target once in a fresh interpreter
+
+    Returns:
+        (wall seconds, total import microseconds, {module: cumulative microseconds}, exit code)
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    return (elapsed, *_parse_importtime(proc.stderr, depth), proc.returncode)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure runner and agent module startup cost")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per target")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per target")
+    parser.add_argument("--max-ms", type=float, help="Fail if any target's median wall time exceeds this")
+    args = parser.parse_args()
+
+    over_budget = []
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "project"
+        project.mkdir()
+        (project / "app.py").write_text("print('hello')\n")
+        (project / "sow.md").write_text("# SOW\n- Print a greeting\n")
+
+        for name, (target, cwd, depth) in _targets(project, Path(tmp) / "workspaces").items():
+            walls, failed = [], None
+            for _ in range(args.runs):
+                wall, total, imports, code = measure(target, cwd, depth)
+                walls.append(wall)
+                if code != 0:
+                    failed = code
+            wall_ms = statistics.median(walls) * 1000
+            print(f"{name}: median {wall_ms:.0f} ms wall, {total / 1000:.0f} ms importing"
+                  + (f" (exit code {failed})" if failed is not None else ""))
+            for module, micros in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+                print(f"  {micros / 1000:8.1f} ms  {module}")
+            if args.max_ms and wall_ms > args.max_ms:
+                over_budget.append(name)
+
+    if over_budget:
+        print(f"Over the {args.max_ms:.0f} ms startup budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark - MCP connection handshakes per run: per-agent vs shared session.
+
+Starts a local stand-in MCP server (streamable HTTP, 20 Datadog-like tools,
+optional per-request latency to emulate the hosted server's round trip)
+and simulates the agents of a worst-case run (Auditor + Bridge, then
+Architect, Artisan and QA Judge for each of 3 attempts = 11 agents), each
+listing the tools and making one tool call:
+- per-agent: every agent opens, lists and closes its own connection
+- shared: one MCPSession (mcp_client.session) connects and lists once
+
+Requires the mcp and uvicorn packages.
+
+Usage:
+  python benchmarks/bench_mcp_sessions.py [--runs 5] [--latency-ms 40]
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import uvicorn
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.server.fastmcp import FastMCP
+from strands.tools.mcp.mcp_client import MCPClient
+
+from mcp_client.session import MCPSessionManager
+
+ROLES_PER_RUN = ["auditor", "bridge"] + ["architect", "artisan", "qa_judge"] * 3
+TOOL_NAMES = [f"{verb}_datadog_{noun}" for verb in ("search", "get", "analyze", "list")
+              for noun in ("logs", "metrics", "incidents", "monitors", "traces")]
+
+
+def _stand_in_server(latency_ms: float):
+    """ASGI app of an MCP server with TOOL_NAMES, delaying every HTTP request"""
+    server = FastMCP("stand-in", log_level="WARNING")
+
+    def handler(query: str = "") -> str:
+        return f"no results for {query!r}"
+
+    for name in TOOL_NAMES:
+        server.add_tool(handler, name=name, description=f"Stand-in for {name}")
+    app = server.streamable_http_app()
+
+    async def delayed(scope, receive, send):
+        if scope["type"] == "http" and latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000)
+        await app(scope, receive, send)
+
+    return delayed
+
+
+def _serve(app) -> str:
+    """Run an ASGI app in a background thread; returns its MCP URL"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/mcp"
+
+
+def run_per_agent(url: str) -> float:
+    start = time.perf_counter()
+    for i, role in enumerate(ROLES_PER_RUN):
+        client = MCPClient(lambda: streamablehttp_client(url))
+        with client:
+            tools = client.list_tools_sync()
+            client.call_tool_sync(f"{role}-{i}", tools[0].tool_name, {"query": role})
+    return time.perf_counter() - start
+
+
+def run_shared(url: str) -> float:
+    manager = MCPSessionManager(health_interval=0)
+    session = manager.session("stand-in", lambda: MCPClient(lambda: streamablehttp_client(url)))
+    start = time.perf_counter()
+    for i, role in enumerate(ROLES_PER_RUN):
+        tools = session.tools()
+        session.client.call_tool_sync(f"{role}-{i}", tools[0].tool_name, {"query": role})
+    elapsed = time.perf_counter() - start
+    manager.close_all()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MCP handshake savings of shared sessions")
+    parser.add_argument("--runs", type=int, default=5, help="Number of simulated runs")
+    parser.add_argument("--latency-ms", type=float, default=40,
+                        help="Delay added to every HTTP request (emulated network round trip)")
+    args = parser.parse_args()
+
+    url = _serve(_stand_in_server(args.latency_ms))
+    per_agent = [run_per_agent(url) for _ in range(args.runs)]
+    shared = [run_shared(url) for _ in range(args.runs)]
+
+    print(f"agents per run: {len(ROLES_PER_RUN)}, tools: {len(TOOL_NAMES)}, latency: {args.latency_ms:.0f} ms")
+    print(f"per-agent: median {statistics.median(per_agent) * 1000:.1f} ms/run "
+          f"({len(ROLES_PER_RUN)} handshakes + listings)")
+    print(f"shared   : median {statistics.median(shared) * 1000:.1f} ms/run (1 handshake + listing)")
+
+
+if __name__ == "__main__":
+    main()
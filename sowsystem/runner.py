@@ -17,6 +17,8 @@ Does NOT:
 import sys
 import os
 import argparse
+import json
+import logging
 from pathlib import Path
 
 # Add src to path for imports
@@ -26,13 +28,41 @@ from workspace_manager import WorkspaceManager
 from project_adapter import ProjectAdapter, LocalProjectAdapter
 
 
-def run_agents_on_project(workspace: Path, user_prompt: str = "Implement SOW requirements") -> str:
+class EventPrinter:
+    """Renders workflow events as readable console output"""
+
+    def __init__(self):
+        # events pulls in asyncio; imported here so --help and --dry-run stay fast
+        from events import TextRenderer, WorkflowEvent
+        self.renderer = TextRenderer()
+        self.event_type = WorkflowEvent
+
+    def print(self, event: dict):
+        print(self.renderer.render(self.event_type(**event)), end="", flush=True)
+
+
+def _show_workflow_logs():
+    """Print the workflow's log lines (normally configured by the AgentCore app)"""
+    logger = logging.getLogger("bedrock_agentcore.app")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def run_agents_on_project(workspace: Path, user_prompt: str = "Implement SOW requirements",
+                          concurrent_intake: bool = False, speculative_plans: int = 1,
+                          json_events: bool = False) -> str:
     """
     Invoke the existing AgentCore orchestration on the workspace
     
     Args:
         workspace: Path to workspace directory
         user_prompt: Prompt to pass to agents
+        concurrent_intake: Run the Auditor and Bridge agents concurrently
+        speculative_plans: Architect plans tried in parallel per attempt (1 = off)
+        json_events: Print the raw workflow events as JSON lines instead of text
         
     Returns:
         Final status from QA Judge (PASS or FAIL: reason)
@@ -44,11 +74,13 @@ def run_agents_on_project(workspace: Path, user_prompt: str = "Implement SOW req
         # Move to workspace root so agents can access src/, sow/, etc.
         os.chdir(workspace)
         
-        # Import the invoke function directly from main
+        # Import the invoke function directly from main (the agent stack is
+        # only loaded here, so --help and --dry-run start fast)
         import sys
         sys.path.insert(0, str(Path(__file__).parent / "src"))
         
-        from main import invoke, app
+        from main import invoke
+        _show_workflow_logs()
         
         # Create a mock context for the entrypoint
         class MockContext:
@@ -56,35 +88,36 @@ def run_agents_on_project(workspace: Path, user_prompt: str = "Implement SOW req
         
         payload = {
             "prompt": user_prompt,
-            "user_id": "runner"
+            "user_id": "runner",
+            "concurrent_intake": concurrent_intake,
+            "speculative_plans": speculative_plans,
+            # Structured events (the default stream is plain text)
+            "events": True,
         }
         
-        # Collect output from agent stream
-        output_parts = []
+        # The workflow ends with a single "result" event
+        result = {}
+        printer = EventPrinter()
         
         # Run the existing agent workflow
         import asyncio
         async def run_workflow():
             # Call the invoke function directly (not through app.entrypoint)
-            async for chunk in invoke(payload, MockContext()):
-                output_parts.append(chunk)
-                print(chunk, end='', flush=True)
+            async for event in invoke(payload, MockContext()):
+                if json_events:
+                    print(json.dumps(event), flush=True)
+                else:
+                    printer.print(event)
+                if event["kind"] == "result":
+                    result.update(event["data"])
         
         asyncio.run(run_workflow())
         
-        full_output = "".join(output_parts)
-        
-        # Extract final QA result
-        # Look for PASS or FAIL in the output
-        if "PASS" in full_output:
+        if result.get("status") == "PASS":
             return "PASS"
-        elif "FAIL:" in full_output:
-            # Extract failure reason
-            fail_idx = full_output.rfind("FAIL:")
-            reason = full_output[fail_idx:fail_idx+200].split('\n')[0]
-            return reason
-        else:
-            return "FAIL: Unable to determine QA result"
+        if result:
+            return f"FAIL: {result.get('report') or result['status']}"[:200]
+        return "FAIL: Unable to determine QA result"
     
     finally:
         os.chdir(original_cwd)
@@ -124,8 +157,39 @@ def main():
         action="store_true",
         help="After success, push workspace changes to a new GitHub branch (requires GITHUB_TOKEN)"
     )
+    parser.add_argument(
+        "--concurrent-intake",
+        action="store_true",
+        help="Run the Auditor and Bridge agents concurrently instead of back to back"
+    )
+    parser.add_argument(
+        "--speculative-plans",
+        type=int,
+        default=1,
+        help="Generate N Architect plans per attempt, implement and judge them in parallel "
+             "copy-on-write branches; the first to PASS wins (default: 1 = off)"
+    )
+    parser.add_argument(
+        "--json-events",
+        action="store_true",
+        help="Print workflow events (stage, agent, attempt, kind, data, timestamps) as JSON lines"
+    )
+    parser.add_argument(
+        "--llm-cache",
+        choices=["off", "on", "replay"],
+        help="Cache model responses on disk (on) or replay only recorded responses, "
+             "failing on a miss (replay); overrides SOW_LLM_CACHE"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Prepare the workspace and stop before running the agents (no models or MCP servers are loaded)"
+    )
     
     args = parser.parse_args()
+    if args.llm_cache:
+        # Read when the agent modules are imported
+        os.environ["SOW_LLM_CACHE"] = args.llm_cache
     
     print(f"🚀 SOW Agent Runner")
     print(f"Project: {args.project}")
@@ -183,12 +247,17 @@ def main():
         print(f"✓ Snapshot created")
         
         # Step 6: Run agents
-        print("\n🤖 Running agent workflow...")
-        print("=" * 60)
-        
-        final_status = run_agents_on_project(workspace, args.prompt)
-        
-        print("=" * 60)
+        if args.dry_run:
+            print("\n🔎 Dry run: agent workflow skipped")
+            final_status = "DRY RUN"
+        else:
+            print("\n🤖 Running agent workflow...")
+            print("=" * 60)
+            
+            final_status = run_agents_on_project(workspace, args.prompt, args.concurrent_intake,
+                                                 args.speculative_plans, args.json_events)
+            
+            print("=" * 60)
         print(f"\n📊 Final Status: {final_status}")
         
         # Step 8: Optional push to GitHub
@@ -213,7 +282,7 @@ def main():
             print(f"\n💾 Workspace preserved: {workspace}")
         
         # Exit with appropriate code
-        if final_status.startswith("PASS"):
+        if final_status.startswith("PASS") or args.dry_run:
             print("\n✅ SUCCESS")
             sys.exit(0)
         else:
@@ -0,0 +1,97 @@
+"""
+Agent Pool - Reuses agent instances across stages and retry attempts.
+
+Responsibilities:
+- Build each agent role once per run from its factory (the template)
+- Reset per-use conversation state before handing an agent out again
+- Track how much construction time the reuse saves
+"""
+
+import time
+
+
+class AgentPool:
+    """Per-run cache of agents keyed by role"""
+
+    def __init__(self, factories: dict, session_manager=None):
+        """
+        Initialize agent pool
+
+        Args:
+            factories: Mapping of role name -> create_*_agent factory
+            session_manager: Session manager passed to every factory
+        """
+        self.factories = factories
+        self.session_manager = session_manager
+        self._agents = {}
+        # agent.state each agent was built with, restored on every reuse
+        self._initial_state = {}
+        # Model every agent handed out uses from now on (e.g. a cheaper one when over budget)
+        self.model_override = None
+        self.builds = 0
+        self.reuses = 0
+        self.build_seconds = 0.0
+
+    def get(self, role: str, slot: int = 0):
+        """
+        Get a clean agent for a role, building it on first use
+
+        Args:
+            role: Agent role (key in factories)
+            slot: Instance slot, for roles that need several live instances
+
+        Returns:
+            Agent with an empty conversation
+        """
+        key = (role, slot)
+        agent = self._agents.get(key)
+        if agent is None:
+            start = time.perf_counter()
+            agent = self.factories[role](self.session_manager)
+            self.build_seconds += time.perf_counter() - start
+            self.builds += 1
+            self._agents[key] = agent
+            state = getattr(agent, "state", None)
+            self._initial_state[key] = state.get() if state is not None else {}
+        else:
+            self.reuses += 1
+            reset_agent(agent, self._initial_state[key])
+        if self.model_override is not None:
+            agent.model = self.model_override
+        return agent
+
+    def stats(self) -> dict:
+        """
+        Get construction counters for this run
+
+        Returns:
+            Dict with builds, reuses, total build time and the estimated
+            time saved by reusing agents instead of rebuilding them
+        """
+        avg_build = self.build_seconds / self.builds if self.builds else 0.0
+        return {
+            "builds": self.builds,
+            "reuses": self.reuses,
+            "build_seconds": round(self.build_seconds, 4),
+            "saved_seconds_estimate": round(avg_build * self.reuses, 4),
+        }
+
+
+def reset_agent(agent, initial_state: dict = None):
+    """
+    Clear the per-use state of an agent so it can run a fresh task
+
+    Args:
+        agent: Strands Agent to reset
+        initial_state: agent.state to restore (default: empty)
+    """
+    agent.messages.clear()
+    conversation_manager = getattr(agent, "conversation_manager", None)
+    if hasattr(conversation_manager, "removed_message_count"):
+        conversation_manager.removed_message_count = 0
+    state = getattr(agent, "state", None)
+    if state is not None:
+        for key in state.get():
+            state.delete(key)
+        for key, value in (initial_state or {}).items():
+            state.set(key, value)
@@ -0,0 +1,103 @@
+"""
+Atomic Write - Crash-safe batched file writes.
+
+Responsibilities:
+- Stage every file of a batch in a temp file next to its destination
+- Flush the whole batch to disk in one fsync pass
+- Swap each temp file into place with os.replace, so readers only ever see
+  the old or the new contents, never a half-written file
+- Leave no temp files behind when staging fails
+"""
+
+import os
+import tempfile
+
+
+def _read_umask():
+    """
+    The process umask, read without changing it (os.umask would briefly
+    affect files created by other threads)
+
+    Returns:
+        Umask bits, or None where /proc/self/status has no Umask line
+    """
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+# Mode for newly created files (mkstemp would otherwise create them 0600)
+_umask = _read_umask()
+NEW_FILE_MODE = 0o666 & ~_umask if _umask is not None else 0o644
+
+
+def _fsync_dir(directory: str):
+    """fsync a directory so renames inside it are durable (no-op where unsupported)"""
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_files_atomically(files: dict) -> list:
+    """
+    Write several files, each atomically
+
+    Args:
+        files: Mapping of path -> text content
+
+    Returns:
+        One summary dict per file: {"path", "bytes", "created"}
+
+    Raises:
+        OSError: If staging fails (no destination file is touched in that case)
+    """
+    staged = []
+    try:
+        for path, content in files.items():
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            staged.append((path, tmp_path))
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            try:
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+            except FileNotFoundError:
+                os.chmod(tmp_path, NEW_FILE_MODE)
+
+        # One durability pass for the whole batch
+        for _, tmp_path in staged:
+            fd = os.open(tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    except BaseException:
+        for _, tmp_path in staged:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        raise
+
+    results = []
+    for path, tmp_path in staged:
+        created = not os.path.exists(path)
+        os.replace(tmp_path, path)
+        results.append({"path": path, "bytes": os.path.getsize(path), "created": created})
+    for directory in {os.path.dirname(path) for path, _ in staged}:
+        _fsync_dir(directory)
+    return results
@@ -0,0 +1,195 @@
+"""
+Budget - Per-run token, cost and wall-clock budget governor.
+
+Responsibilities:
+- Track cumulative input/output tokens across every agent of a run (from
+  the agents' event loop metrics) plus elapsed time and estimated cost
+- Decide when a run must downgrade to cheaper settings or stop
+- Report the final budget use
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+
+from model.load import model_id_of
+
+log = logging.getLogger(__name__)
+
+# Limits (0 = unlimited); a payload "budget" object overrides them per run
+BUDGET_MAX_TOKENS = int(os.getenv("SOW_BUDGET_MAX_TOKENS", "0"))
+BUDGET_MAX_INPUT_TOKENS = int(os.getenv("SOW_BUDGET_MAX_INPUT_TOKENS", "0"))
+BUDGET_MAX_OUTPUT_TOKENS = int(os.getenv("SOW_BUDGET_MAX_OUTPUT_TOKENS", "0"))
+BUDGET_MAX_SECONDS = float(os.getenv("SOW_BUDGET_MAX_SECONDS", "0"))
+BUDGET_MAX_USD = float(os.getenv("SOW_BUDGET_MAX_USD", "0"))
+
+# stop = stop at the limit; downgrade = switch to cheaper settings at
+# DOWNGRADE_AT of a limit, then stop at the limit
+BUDGET_POLICY = os.getenv("SOW_BUDGET_POLICY", "stop").lower()
+BUDGET_DOWNGRADE_AT = float(os.getenv("SOW_BUDGET_DOWNGRADE_AT", "0.75"))
+BUDGET_DOWNGRADE_MODEL = os.getenv("SOW_BUDGET_DOWNGRADE_MODEL", "amazon.nova-micro-v1:0")
+
+# A run past its limit stops at the next stage boundary; a stage that keeps
+# going past this multiple of a limit is cut off
+HARD_LIMIT_FACTOR = 1.2
+
+# USD per 1K input / output tokens (on-demand, us-east-1); extend with SOW_MODEL_PRICES
+MODEL_PRICES = {
+    "amazon.nova-micro-v1:0": (0.000035, 0.00014),
+    "amazon.nova-lite-v1:0": (0.00006, 0.00024),
+    "amazon.nova-pro-v1:0": (0.0008, 0.0032),
+    **json.loads(os.getenv("SOW_MODEL_PRICES", "{}")),
+}
+
+POLICIES = ("stop", "downgrade")
+
+
+@dataclass
+class BudgetLimits:
+    """Limits for one run (0 = unlimited)"""
+    max_tokens: int = BUDGET_MAX_TOKENS
+    max_input_tokens: int = BUDGET_MAX_INPUT_TOKENS
+    max_output_tokens: int = BUDGET_MAX_OUTPUT_TOKENS
+    max_seconds: float = BUDGET_MAX_SECONDS
+    max_usd: float = BUDGET_MAX_USD
+    policy: str = BUDGET_POLICY
+    downgrade_at: float = BUDGET_DOWNGRADE_AT
+
+    @classmethod
+    def from_payload(cls, payload: dict):
+        """
+        Build limits from env defaults and a payload "budget" object
+
+        Never raises: unknown settings, values of the wrong type and unknown
+        policies are logged and ignored, so a bad payload runs with the
+        defaults instead of failing the request.
+        """
+        overrides = payload.get("budget") or {}
+        if not isinstance(overrides, dict):
+            log.warning(f"Ignoring budget settings: expected an object, got {type(overrides).__name__}")
+            overrides = {}
+        types = {f.name: type(f.default) for f in fields(cls)}
+        settings = {}
+        for name, value in overrides.items():
+            if name not in types:
+                log.warning(f"Ignoring unknown budget setting {name!r}")
+                continue
+            try:
+                settings[name] = types[name](value)
+            except (TypeError, ValueError):
+                log.warning(f"Ignoring budget setting {name}={value!r}: expected {types[name].__name__}")
+        policy = settings.get("policy", BUDGET_POLICY).lower()
+        if policy not in POLICIES:
+            log.warning(f"Unknown budget policy {policy!r} (use one of {', '.join(POLICIES)}); using 'stop'")
+            policy = "stop"
+        settings["policy"] = policy
+        return cls(**settings)
+
+
+def _usage_of(agent) -> tuple:
+    """Cumulative (input, output) tokens an agent has used so far"""
+    metrics = getattr(agent, "event_loop_metrics", None)
+    usage = getattr(metrics, "accumulated_usage", None) or {}
+    return usage.get("inputTokens", 0), usage.get("outputTokens", 0)
+
+
+class BudgetGovernor:
+    """Tracks one run's spend against its limits"""
+
+    def __init__(self, limits: BudgetLimits):
+        """
+        Initialize budget governor (the wall clock starts now)
+
+        Args:
+            limits: Limits for the run
+        """
+        self.limits = limits
+        self.started = time.monotonic()
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.usd = 0.0
+        self.by_stage = {}
+        self.downgraded = False
+        self.stopped_reason = None
+        self._seen = {}
+
+    def record(self, agent, stage: str):
+        """
+        Add the tokens an agent used since it was last recorded
+
+        Agents are reused across stages and their metrics keep accumulating,
+        so only the delta since the previous call is counted.
+
+        Args:
+            agent: Strands Agent
+            stage: Stage the tokens are attributed to
+        """
+        input_tokens, output_tokens = _usage_of(agent)
+        seen_input, seen_output = self._seen.get(id(agent), (0, 0))
+        delta_input = max(input_tokens - seen_input, 0)
+        delta_output = max(output_tokens - seen_output, 0)
+        self._seen[id(agent)] = (input_tokens, output_tokens)
+        if not delta_input and not delta_output:
+            return
+        self.input_tokens += delta_input
+        self.output_tokens += delta_output
+        price_in, price_out = MODEL_PRICES.get(model_id_of(agent), (0.0, 0.0))
+        self.usd += delta_input / 1000 * price_in + delta_output / 1000 * price_out
+        stage_usage = self.by_stage.setdefault(stage, {"input_tokens": 0, "output_tokens": 0})
+        stage_usage["input_tokens"] += delta_input
+        stage_usage["output_tokens"] += delta_output
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def usage_fraction(self) -> dict:
+        """Used fraction of every configured limit"""
+        limits = self.limits
+        spent = {
+            "tokens": (self.input_tokens + self.output_tokens, limits.max_tokens),
+            "input_tokens": (self.input_tokens, limits.max_input_tokens),
+            "output_tokens": (self.output_tokens, limits.max_output_tokens),
+            "seconds": (self.elapsed, limits.max_seconds),
+            "usd": (self.usd, limits.max_usd),
+        }
+        return {name: used / limit for name, (used, limit) in spent.items() if limit > 0}
+
+    def _over(self, threshold: float):
+        """Name of the first limit at or past threshold, or None"""
+        for name, fraction in self.usage_fraction().items():
+            if fraction >= threshold:
+                return name
+        return None
+
+    def exhausted(self):
+        """Name of the limit that is used up (stop at the next stage boundary), or None"""
+        return self._over(1.0)
+
+    def over_hard_limit(self):
+        """Name of the limit overrun far enough to cut off the running stage, or None"""
+        return self._over(HARD_LIMIT_FACTOR)
+
+    def should_downgrade(self) -> bool:
+        """Whether to switch to cheaper settings now (only once, only with the downgrade policy)"""
+        if self.downgraded or self.limits.policy != "downgrade":
+            return False
+        return self._over(self.limits.downgrade_at) is not None
+
+    def report(self) -> dict:
+        """Final (or current) budget use"""
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.input_tokens + self.output_tokens,
+            "estimated_usd": round(self.usd, 6),
+            "elapsed_seconds": round(self.elapsed, 2),
+            "used_fraction": {name: round(value, 3) for name, value in self.usage_fraction().items()},
+            "by_stage": self.by_stage,
+            "downgraded": self.downgraded,
+            "stopped_reason": self.stopped_reason,
+            "limits": asdict(self.limits),
+        }
+
@@ -0,0 +1,272 @@
+"""
+Code Edit - Targeted search-and-replace and unified-diff edits.
+
+Responsibilities:
+- Apply exact search-and-replace edits to file contents
+- Parse unified diffs and apply their hunks with context validation
+- Explain precisely why an edit does not apply (EditError)
+- Compute new contents only; writing files is left to the caller
+"""
+
+import difflib
+import re
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class EditError(Exception):
+    """An edit could not be applied; the message says where and why"""
+
+
+def _line_number(text: str, offset: int) -> int:
+    """1-based line number of a character offset"""
+    return text.count("\n", 0, offset) + 1
+
+
+def replace_text(text: str, old: str, new: str, replace_all: bool = False, label: str = "file") -> str:
+    """
+    Replace an exact snippet in text
+
+    Args:
+        text: Current file contents
+        old: Snippet to replace (must match exactly, including indentation)
+        new: Replacement snippet
+        replace_all: Replace every occurrence instead of requiring exactly one
+        label: Name used in error messages
+
+    Returns:
+        New file contents
+
+    Raises:
+        EditError: If old is empty or blank, missing, or ambiguous
+    """
+    if not old.strip():
+        raise EditError(f"{label}: old_string is empty or only whitespace; include the lines to replace")
+    count = text.count(old)
+    if count == 0:
+        first_line = old.strip().splitlines()[0]
+        close = difflib.get_close_matches(first_line.strip(), [l.strip() for l in text.splitlines()], n=1)
+        hint = f"; closest line is {close[0]!r}" if close else ""
+        raise EditError(f"{label}: old_string not found{hint}")
+    if count > 1 and not replace_all:
+        lines = []
+        start = text.find(old)
+        while start != -1:
+            lines.append(str(_line_number(text, start)))
+            start = text.find(old, start + 1)
+        raise EditError(
+            f"{label}: old_string matches {count} times (lines {', '.join(lines)}); "
+            "include more surrounding lines or set replace_all"
+        )
+    return text.replace(old, new) if replace_all else text.replace(old, new, 1)
+
+
+def _strip_path(path: str):
+    """Normalize a ---/+++ path: drop timestamps and a/ b/ prefixes, None for /dev/null"""
+    path = path.split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def _continues_hunk(lines: list, i: int) -> bool:
+    """Whether line i still belongs to the current hunk body"""
+    if i >= len(lines):
+        return False
+    line = lines[i]
+    if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+        return False
+    return line == "" and _continues_hunk(lines, i + 1) or line.startswith((" ", "-", "+"))
+
+
+def parse_unified_diff(diff: str) -> list:
+    """
+    Parse a unified diff
+
+    Args:
+        diff: Unified diff text (one or more files)
+
+    Returns:
+        List of file patches: {"old_path", "new_path", "hunks"}, where each hunk
+        is {"header", "old_start", "old", "new", "old_count", "new_count"} with
+        old/new lists of lines
+
+    Raises:
+        EditError: If the diff is malformed, or a hunk body does not have the
+                   line counts its header gives
+    """
+    patches = []
+    patch = None
+    hunk = None
+    lines = diff.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            patch = {"old_path": _strip_path(line[4:]), "new_path": _strip_path(lines[i + 1][4:]), "hunks": []}
+            patches.append(patch)
+            hunk = None
+            i += 2
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match:
+            if patch is None:
+                raise EditError(f"diff line {i + 1}: hunk header before any ---/+++ file header")
+            hunk = {"header": line, "old_start": int(match.group(1)), "old": [], "new": [],
+                    "old_count": int(match.group(2) or 1), "new_count": int(match.group(4) or 1)}
+            patch["hunks"].append(hunk)
+        elif hunk is not None and line.startswith((" ", "-", "+")):
+            body = line[1:]
+            if line[0] in " -":
+                hunk["old"].append(body)
+            if line[0] in " +":
+                hunk["new"].append(body)
+        elif hunk is not None and line == "" and _continues_hunk(lines, i + 1):
+            # Some generators drop the leading space of empty context lines
+            hunk["old"].append("")
+            hunk["new"].append("")
+        elif line.startswith("\\"):
+            pass  # "\ No newline at end of file"
+        elif hunk is None and patch is None:
+            pass  # preamble (e.g. "diff --git" or prose)
+        else:
+            hunk = None
+        i += 1
+
+    if not patches:
+        raise EditError("no file headers (--- / +++) found in diff")
+    for patch in patches:
+        label = patch["new_path"] or patch["old_path"]
+        if not patch["hunks"] and patch["new_path"] is not None:
+            raise EditError(f"{label}: no hunks in diff")
+        for number, hunk in enumerate(patch["hunks"], 1):
+            if (len(hunk["old"]), len(hunk["new"])) != (hunk["old_count"], hunk["new_count"]):
+                raise EditError(
+                    f"{label}: hunk {number} ({hunk['header']}) header counts {hunk['old_count']} old and "
+                    f"{hunk['new_count']} new lines, but its body has {len(hunk['old'])} old and "
+                    f"{len(hunk['new'])} new lines"
+                )
+    return patches
+
+
+def _find_hunk(lines: list, old: list, expected: int):
+    """Find where old lines occur, preferring the position nearest to expected"""
+    if not old:
+        return min(max(expected, 0), len(lines))
+    candidates = []
+    for strip in (False, True):
+        norm = (lambda l: l.rstrip()) if strip else (lambda l: l)
+        target = [norm(l) for l in old]
+        for pos in range(0, len(lines) - len(old) + 1):
+            if norm(lines[pos]) == target[0] and [norm(l) for l in lines[pos:pos + len(old)]] == target:
+                candidates.append(pos)
+        if candidates:
+            return min(candidates, key=lambda pos: abs(pos - expected))
+    return None
+
+
+def _mismatch(lines: list, old: list, expected: int) -> str:
+    """Describe the first context line that differs at the expected position"""
+    for k, want in enumerate(old):
+        pos = expected + k
+        have = lines[pos] if 0 <= pos < len(lines) else "<end of file>"
+        if have != want:
+            return f"line {pos + 1}: expected {want!r}, found {have!r}"
+    return f"expected {len(old)} lines at line {expected + 1}"
+
+
+def apply_hunks(text: str, hunks: list, label: str = "file") -> str:
+    """
+    Apply parsed hunks to file contents
+
+    Args:
+        text: Current file contents ("" for a new file)
+        hunks: Hunks from parse_unified_diff
+        label: Name used in error messages
+
+    Returns:
+        New file contents
+
+    Raises:
+        EditError: If a hunk's context or removed lines do not match
+    """
+    lines = text.splitlines()
+    trailing_newline = text.endswith("\n") or not text
+    delta = 0
+    for number, hunk in enumerate(hunks, 1):
+        # For a pure insertion (old count 0) old_start is the line to insert after
+        base = hunk["old_start"] if not hunk["old"] else max(hunk["old_start"] - 1, 0)
+        expected = base + delta
+        pos = _find_hunk(lines, hunk["old"], expected)
+        if pos is None:
+            raise EditError(
+                f"{label}: hunk {number} ({hunk['header']}) does not apply: "
+                f"{_mismatch(lines, hunk['old'], expected)}"
+            )
+        lines[pos:pos + len(hunk["old"])] = hunk["new"]
+        delta = pos - base + len(hunk["new"]) - len(hunk["old"])
+    return "\n".join(lines) + ("\n" if trailing_newline and lines else "")
+
+
+def resolve_unified_diff(diff: str, read_file=None) -> dict:
+    """
+    Compute the result of a unified diff without writing anything
+
+    Args:
+        diff: Unified diff text
+        read_file: Callable path -> current text (defaults to reading from disk)
+
+    Returns:
+        Mapping of path -> new contents, or None for deleted files
+
+    Raises:
+        EditError: If the diff is malformed or any hunk does not apply
+                   (nothing should be written in that case)
+    """
+    if read_file is None:
+        def read_file(path):
+            with open(path, 'r') as f:
+                return f.read()
+
+    results = {}
+    for patch in parse_unified_diff(diff):
+        old_path, new_path = patch["old_path"], patch["new_path"]
+        if new_path is None:
+            if old_path in results and results[old_path] is None:
+                raise EditError(f"{old_path}: diff deletes the file twice")
+            if old_path not in results:
+                try:
+                    read_file(old_path)
+                except FileNotFoundError:
+                    raise EditError(f"{old_path}: diff deletes the file but it does not exist")
+            results[old_path] = None
+            continue
+        if old_path is None:
+            if new_path in results:
+                if results[new_path] is not None:
+                    raise EditError(f"{new_path}: diff creates the file but an earlier patch already wrote it")
+                current = ""  # Deleted earlier in this diff, now recreated
+            else:
+                try:
+                    read_file(new_path)
+                except FileNotFoundError:
+                    current = ""
+                else:
+                    raise EditError(f"{new_path}: diff creates the file but it already exists")
+        else:
+            if old_path in results:
+                current = results[old_path]
+                if current is None:
+                    raise EditError(f"{old_path}: diff patches the file after deleting it"
+                                    f" (hunk 1, {patch['hunks'][0]['header']})")
+            else:
+                try:
+                    current = read_file(old_path)
+                except FileNotFoundError:
+                    raise EditError(f"{old_path}: file not found")
+        results[new_path] = apply_hunks(current, patch["hunks"], new_path)
+        if old_path and old_path != new_path:
+            results[old_path] = None
+    return results
@@ -0,0 +1,151 @@
+"""
+Code Outline - Compact structural summaries of Python source files.
+
+Responsibilities:
+- Build an outline of a module with the ast module: docstring, imports,
+  classes, functions, signatures and first docstring lines
+- Cache outlines by content hash (bounded LRU) so unchanged files are
+  never re-parsed
+- Parse large batches of files in parallel across a process pool
+"""
+
+import ast
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many uncached files, parsing in-process beats pool startup
+PARALLEL_MIN_FILES = int(os.getenv("SOW_OUTLINE_PARALLEL_MIN_FILES", "64"))
+# Outlines kept in memory (least recently used are evicted)
+OUTLINE_CACHE_MAX_ENTRIES = int(os.getenv("SOW_OUTLINE_CACHE_ENTRIES", "4096"))
+
+_outline_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _first_line(node) -> str:
+    """First line of a node's docstring, or an empty string"""
+    doc = ast.get_docstring(node, clean=True)
+    return doc.strip().splitlines()[0] if doc else ""
+
+
+def _signature(node) -> str:
+    """Render a function signature from its AST node"""
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+    return signature
+
+
+def _decorators(node) -> str:
+    """Render decorators as a compact prefix"""
+    return "".join(f"@{ast.unparse(d)} " for d in node.decorator_list)
+
+
+def _outline_body(body, indent: str, lines: list):
+    """Append outline lines for the classes and functions in a statement list"""
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            doc = _first_line(node)
+            line = f"{indent}{_decorators(node)}{_signature(node)}"
+            lines.append(f"{line}  # {doc}" if doc else line)
+        elif isinstance(node, ast.ClassDef):
+            bases = ", ".join(ast.unparse(b) for b in node.bases + node.keywords)
+            doc = _first_line(node)
+            line = f"{indent}{_decorators(node)}class {node.name}" + (f"({bases})" if bases else "")
+            lines.append(f"{line}  # {doc}" if doc else line)
+            _outline_body(node.body, indent + "    ", lines)
+
+
+def outline_source(source: str) -> str:
+    """
+    Build the outline of one Python module
+
+    Args:
+        source: Module source code
+
+    Returns:
+        Outline text (one line per import group, class and function)
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return f"(syntax error: {e.msg} at line {e.lineno})"
+
+    lines = []
+    doc = _first_line(tree)
+    if doc:
+        lines.append(f'"""{doc}"""')
+
+    imports = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            imports.extend(f"{module}.{alias.name}" for alias in node.names)
+    if imports:
+        lines.append(f"imports: {', '.join(imports)}")
+
+    constants = [
+        target.id
+        for node in tree.body if isinstance(node, (ast.Assign, ast.AnnAssign))
+        for target in (node.targets if isinstance(node, ast.Assign) else [node.target])
+        if isinstance(target, ast.Name) and target.id.isupper()
+    ]
+    if constants:
+        lines.append(f"constants: {', '.join(constants)}")
+
+    _outline_body(tree.body, "", lines)
+    return "\n".join(lines) if lines else "(no imports or definitions)"
+
+
+def _outline_worker(item):
+    """Process pool entry point: (digest, source) -> (digest, outline)"""
+    digest, source = item
+    return digest, outline_source(source)
+
+
+def build_outlines(sources: dict) -> dict:
+    """
+    Get outlines for many files, using the hash cache and a process pool
+
+    Args:
+        sources: Mapping of content hash -> callable returning the source text
+                 (only called for hashes that are not cached yet)
+
+    Returns:
+        Mapping of content hash -> outline text
+    """
+    with _cache_lock:
+        missing = [digest for digest in sources if digest not in _outline_cache]
+
+    outlines = {}
+    if missing:
+        items = [(digest, sources[digest]()) for digest in missing]
+        if len(items) >= PARALLEL_MIN_FILES:
+            workers = min(os.cpu_count() or 1, 8)
+            # Spawned workers: forking a threaded process can deadlock on locks held by other threads
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = list(pool.map(_outline_worker, items, chunksize=max(1, len(items) // (workers * 4))))
+        else:
+            results = [_outline_worker(item) for item in items]
+        outlines.update(results)
+
+    with _cache_lock:
+        for digest in sources:
+            if digest in outlines:
+                _outline_cache[digest] = outlines[digest]
+            elif digest in _outline_cache:
+                outlines[digest] = _outline_cache[digest]
+            else:
+                # Evicted by a concurrent call since the lookup above
+                outlines[digest] = outline_source(sources[digest]())
+                _outline_cache[digest] = outlines[digest]
+            _outline_cache.move_to_end(digest)
+        while len(_outline_cache) > OUTLINE_CACHE_MAX_ENTRIES:
+            _outline_cache.popitem(last=False)
+    return outlines
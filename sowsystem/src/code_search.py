@@ -0,0 +1,311 @@
+"""
+Code Search - Trigram-indexed regex search over a workspace directory.
+
+Responsibilities:
+- Maintain a trigram -> files inverted index on top of a WorkspaceIndex
+- Re-index only the files whose content hash changed since the last search
+- Narrow a regex search to candidate files using the literal trigrams the
+  pattern requires, then scan only those files
+- Rank matches and render them with surrounding line context
+"""
+
+import fnmatch
+import os
+import re
+import threading
+from collections import defaultdict
+
+from source_files import SNIFF_BYTES, is_binary
+from workspace_index import get_workspace_index
+
+# Files larger than this are not indexed (generated bundles, data dumps)
+MAX_INDEXED_FILE_BYTES = int(os.getenv("SOW_SEARCH_MAX_FILE_BYTES", str(1024 * 1024)))
+
+
+def _trigrams(text: str) -> set:
+    """All lower-cased trigrams of a string"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Escapes of a character class, a position or a control character (they end a literal)
+_CLASS_ESCAPES = set("dDwWsSbBAZ") | set("ntrfva")
+# Escapes of one character by code point, with the number of hex digits
+_HEX_ESCAPES = {"x": 2, "u": 4, "U": 8}
+
+
+def _required_literals(pattern: str) -> list:
+    """
+    Extract literal substrings every match of a regex must contain
+
+    Conservative: alternations, groups, classes and optional characters
+    are skipped, and escapes that are not decoded here (octal, named
+    characters, back-references) give up entirely, so the result may be
+    empty but is never wrong.
+    """
+    if "|" in pattern:
+        return []
+
+    literals = []
+    current = []
+
+    def flush():
+        if current:
+            literals.append("".join(current))
+            current.clear()
+
+    i = 0
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1:i + 2]
+            i += 2
+            if nxt and not nxt.isalnum():
+                if depth == 0:
+                    current.append(nxt)
+                else:
+                    flush()
+            elif nxt in _HEX_ESCAPES:
+                digits = pattern[i:i + _HEX_ESCAPES[nxt]]
+                if len(digits) != _HEX_ESCAPES[nxt] or not all(d in "0123456789abcdefABCDEF" for d in digits):
+                    return []
+                i += len(digits)
+                if depth == 0:
+                    current.append(chr(int(digits, 16)))
+                else:
+                    flush()
+            elif nxt in _CLASS_ESCAPES:
+                flush()
+            else:
+                # \0, \N{...}, back-references: the matched text is unknown here
+                return []
+            continue
+        if c == "[":
+            flush()
+            i += 1
+            if pattern[i:i + 1] == "^":
+                i += 1
+            if pattern[i:i + 1] == "]":
+                i += 1
+            while i < len(pattern) and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        if c in "*?{":
+            # The preceding character is optional
+            if current:
+                current.pop()
+            flush()
+            if c == "{":
+                closing = pattern.find("}", i)
+                i = closing if closing != -1 else i
+            i += 1
+            continue
+        if c in "()":
+            flush()
+            depth += 1 if c == "(" else -1
+            i += 1
+            continue
+        if c in ".^$+":
+            flush()
+            i += 1
+            continue
+        if depth == 0:
+            current.append(c)
+        i += 1
+    flush()
+    return [literal for literal in literals if len(literal) >= 3]
+
+
+class TrigramIndex:
+    """Inverted trigram index over the files of one directory"""
+
+    def __init__(self, directory: str):
+        """
+        Initialize trigram index
+
+        Args:
+            directory: Directory to index (shares its WorkspaceIndex)
+        """
+        self.directory = directory
+        self.files = get_workspace_index(directory)
+        self.postings = defaultdict(set)
+        self.documents = {}
+        self._lock = threading.RLock()
+
+    def _read_indexable(self, rel: str):
+        """Get a file's text, or None if it is too large or binary"""
+        entry = self.files.entry(rel)
+        if entry is None or entry["size"] > MAX_INDEXED_FILE_BYTES:
+            return None
+        data = self.files.read_bytes(rel)
+        if is_binary(data[:SNIFF_BYTES]):
+            return None
+        return data.decode("utf-8", errors="replace")
+
+    def _remove(self, rel: str):
+        """Drop a file from the postings"""
+        _, grams = self.documents.pop(rel, (None, ()))
+        for gram in grams:
+            files = self.postings.get(gram)
+            if files is not None:
+                files.discard(rel)
+                if not files:
+                    del self.postings[gram]
+
+    def _add(self, rel: str, digest: str):
+        """Index one file"""
+        text = self._read_indexable(rel)
+        grams = frozenset(_trigrams(text)) if text is not None else frozenset()
+        for gram in grams:
+            self.postings[gram].add(rel)
+        self.documents[rel] = (digest, grams)
+
+    def _digest(self, rel: str) -> str:
+        """Identity of a file's indexed content"""
+        entry = self.files.entry(rel)
+        if entry["size"] > MAX_INDEXED_FILE_BYTES:
+            # Never indexed, so size and mtime are identity enough
+            return f"unindexed:{entry['size']}:{entry['mtime_ns']}"
+        return self.files.hash_of(rel)
+
+    def update(self) -> int:
+        """
+        Bring the index up to date with the directory
+
+        Returns:
+            Number of files (re)indexed or removed
+        """
+        with self._lock:
+            self.files.refresh()
+            current = set(self.files.files())
+            updated = 0
+            for rel in list(self.documents):
+                if rel not in current:
+                    self._remove(rel)
+                    updated += 1
+            for rel in current:
+                digest = self._digest(rel)
+                known = self.documents.get(rel)
+                if known is None or known[0] != digest:
+                    self._remove(rel)
+                    self._add(rel, digest)
+                    updated += 1
+            return updated
+
+    def reindex_file(self, rel: str):
+        """
+        Re-index a single file right after it was written
+
+        Args:
+            rel: Path relative to the indexed directory
+        """
+        with self._lock:
+            self._remove(rel)
+            if self.files.refresh_path(rel):
+                self._add(rel, self._digest(rel))
+
+    def candidates(self, pattern: str) -> list:
+        """Files that can contain a match of pattern, narrowed by trigrams"""
+        with self._lock:
+            selected = None
+            for literal in _required_literals(pattern):
+                for gram in _trigrams(literal):
+                    files = self.postings.get(gram, set())
+                    selected = set(files) if selected is None else selected & files
+                    if not selected:
+                        return []
+            if selected is None:
+                selected = {rel for rel, (_, grams) in self.documents.items() if grams}
+            return sorted(selected)
+
+    def search(self, pattern: str, path_glob: str = "*", ignore_case: bool = False,
+               max_results: int = 30, context_lines: int = 2) -> str:
+        """
+        Search the directory for a regex
+
+        Args:
+            pattern: Python regular expression
+            path_glob: fnmatch glob on the relative path ("*" also crosses "/")
+            ignore_case: Match case-insensitively
+            max_results: Maximum number of matching lines to show
+            context_lines: Lines of context shown around each match
+
+        Returns:
+            Matches grouped by file, files with the most matches first
+        """
+        regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        self.update()
+
+        hits = []
+        for rel in self.candidates(pattern):
+            if not fnmatch.fnmatch(rel, path_glob):
+                continue
+            lines = self.files.read_text(rel).splitlines()
+            matched = [n for n, line in enumerate(lines) if regex.search(line)]
+            if matched:
+                hits.append((rel, lines, matched))
+
+        if not hits:
+            return f"No matches for {pattern!r} in {self.directory}"
+
+        hits.sort(key=lambda hit: (-len(hit[2]), hit[0]))
+        total = sum(len(matched) for _, _, matched in hits)
+        result = []
+        shown = 0
+        for rel, lines, matched in hits:
+            if shown >= max_results:
+                break
+            result.append(f"=== {os.path.join(self.directory, rel)} ({len(matched)} matches) ===")
+            last = -1
+            for n in matched[:max_results - shown]:
+                start = max(n - context_lines, last + 1)
+                if last >= 0 and start > last + 1:
+                    result.append("  ...")
+                for k in range(start, min(n + context_lines + 1, len(lines))):
+                    marker = ">" if k == n else " "
+                    result.append(f"{marker}{k + 1:5}: {lines[k]}")
+                    last = k
+                shown += 1
+        if total > shown:
+            result.append(f"--- {total - shown} more matches not shown; narrow the pattern or path_glob ---")
+        return "\n".join(result)
+
+
+_search_indexes = {}
+_search_lock = threading.Lock()
+
+
+def get_search_index(directory: str = "src") -> TrigramIndex:
+    """
+    Get the process-wide trigram index for a directory, creating it on first use
+
+    Args:
+        directory: Directory to index
+
+    Returns:
+        TrigramIndex (built lazily on its first search)
+    """
+    key = os.path.realpath(directory)
+    with _search_lock:
+        index = _search_indexes.get(key)
+        if index is None:
+            index = TrigramIndex(directory)
+            _search_indexes[key] = index
+        return index
+
+
+def reindex_written_file(path: str):
+    """
+    Update every trigram index that covers a file that was just written
+
+    Args:
+        path: Path of the written file
+    """
+    real = os.path.realpath(path)
+    with _search_lock:
+        indexes = list(_search_indexes.items())
+    for root, index in indexes:
+        if real.startswith(root + os.sep) and index.documents:
+            index.reindex_file(os.path.relpath(real, root).replace(os.sep, "/"))
@@ -0,0 +1,164 @@
+"""
+Context Budget - Token estimates and bounded digests of stage outputs.
+
+Responsibilities:
+- Estimate the token count of prompts, stage outputs and tool schemas
+- Compact stage outputs into digests that fit a token budget
+- Keep the full texts in a store so agents can fetch them by reference
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# Heuristic used for budgeting; close enough for Nova/Claude tokenizers on code and prose
+CHARS_PER_TOKEN = 4
+
+# Default token budget for each stage output embedded in a prompt
+STAGE_DIGEST_TOKENS = int(os.getenv("SOW_STAGE_DIGEST_TOKENS", "4000"))
+
+# Full texts kept for on-demand fetches (oldest dropped first)
+STORE_MAX_CHARS = int(os.getenv("SOW_OUTPUT_STORE_CHARS", str(32 * 1024 * 1024)))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text
+
+    Args:
+        text: Prompt or output text
+
+    Returns:
+        Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def tool_schema_tokens(specs) -> int:
+    """
+    Estimate the tokens tool schemas add to every model call
+
+    Args:
+        specs: Tool specs (name, description, inputSchema)
+
+    Returns:
+        Approximate token count
+    """
+    return sum(estimate_tokens(json.dumps(spec, separators=(",", ":"))) for spec in specs)
+
+
+class OutputStore:
+    """Bounded in-memory store of full texts, addressed by reference"""
+
+    def __init__(self, max_chars: int = STORE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._texts = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+
+    def put(self, label: str, text: str) -> str:
+        """
+        Store a full text
+
+        Args:
+            label: Short name for the text (e.g. "auditor")
+            text: Full text
+
+        Returns:
+            Reference to pass to get() / the fetch_full_output tool
+        """
+        ref = f"{label}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}"
+        with self._lock:
+            if ref not in self._texts:
+                self._texts[ref] = text
+                self._chars += len(text)
+            self._texts.move_to_end(ref)
+            while self._chars > self.max_chars and len(self._texts) > 1:
+                _, dropped = self._texts.popitem(last=False)
+                self._chars -= len(dropped)
+        return ref
+
+    def get(self, ref: str):
+        """Get a stored text, or None if unknown or evicted"""
+        with self._lock:
+            return self._texts.get(ref)
+
+
+_store = OutputStore()
+
+
+def get_output_store() -> OutputStore:
+    """Get the process-wide output store"""
+    return _store
+
+
+def _structured_line(line: str) -> bool:
+    """Whether a line looks like part of a JSON document (never deduplicated)"""
+    stripped = line.strip()
+    return stripped.startswith(('"', "{", "}", "[", "]")) or stripped.endswith((",", "{", "["))
+
+
+def _normalize(text: str) -> str:
+    """
+    Drop trailing whitespace, repeated blank lines and runs of identical lines
+
+    Only consecutive repeats of prose or log lines are collapsed (into the
+    first line with a repeat count); code blocks and JSON are kept verbatim.
+    """
+    keep_all = text.lstrip().startswith(("{", "["))
+    in_fence = False
+    lines = []
+    previous = None
+    count = 0
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif (line == previous and not keep_all and not in_fence
+              and len(line.strip()) > 20 and not _structured_line(line)):
+            count += 1
+            lines[-1] = f"{line} [x{count}]"
+            continue
+        previous = line
+        count = 1
+        lines.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def digest(text: str, budget_tokens: int = STAGE_DIGEST_TOKENS, ref: str = None) -> str:
+    """
+    Compact a text to fit a token budget
+
+    Texts within budget are returned unchanged. Otherwise whitespace and
+    runs of repeated lines are dropped first; if that is not enough, the head and
+    tail are kept and the middle is replaced by a marker naming the
+    reference the full text can be fetched with.
+
+    Args:
+        text: Full text
+        budget_tokens: Maximum tokens for the digest
+        ref: OutputStore reference of the full text, if stored
+
+    Returns:
+        Digest text
+    """
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    text = _normalize(text)
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+
+    marker_budget = 40
+    chars = max(budget_tokens - marker_budget, 0) * CHARS_PER_TOKEN
+    head = text[:chars * 3 // 5]
+    tail = text[len(text) - chars * 2 // 5:] if chars else ""
+    if "\n" in head:
+        head = head[:head.rindex("\n")]
+    if "\n" in tail:
+        tail = tail[tail.index("\n") + 1:]
+    omitted = estimate_tokens(text) - estimate_tokens(head) - estimate_tokens(tail)
+    fetch = f'; call fetch_full_output(ref="{ref}") for the full text' if ref else ""
+    return f"{head}\n[... ~{omitted} tokens omitted{fetch} ...]\n{tail}"
@@ -4,42 +4,186 @@ Datadog Tools - Graceful degradation wrapper for Datadog MCP tools.
 Initializes the Datadog MCP client and returns tools for strands agents.
 If credentials are missing or the connection fails, returns an empty list
 so agents continue working without Datadog tools.
+
+All agents share one long-lived connection (see mcp_client.session), and
+each agent role only gets the Datadog tools its system prompt names, so
+the ~20 tool schemas of the server are not sent with every model call.
 """
 
 import os
 import logging
+import threading
+
+from strands.tools.tool_provider import ToolProvider
+
+from context_budget import tool_schema_tokens
+from mcp_client.session import get_session_manager
 
 logger = logging.getLogger(__name__)
 
+# Datadog tools named in each agent's system prompt (None = all tools).
+# SOW_DATADOG_TOOLS_<ROLE> overrides a role: comma-separated names, "*" for all.
+DATADOG_TOOL_ALLOWLIST = {
+    "auditor": ["search_datadog_incidents", "search_datadog_logs"],
+    "bridge": ["search_datadog_services", "search_datadog_service_dependencies", "search_datadog_metrics"],
+    "architect": ["analyze_datadog_logs", "search_datadog_monitors", "search_datadog_incidents",
+                  "get_datadog_metric"],
+    "artisan": ["search_datadog_logs", "get_datadog_trace"],
+    "qa_judge": ["analyze_datadog_logs", "get_datadog_metric", "search_datadog_incidents",
+                 "search_datadog_monitors", "create_datadog_notebook"],
+}
+
+_session = None
+_session_checked = False
+_session_lock = threading.Lock()
+
+# Per-role tool counts and schema token estimates from the last listing
+_schema_stats = {}
+
+
+def allowed_datadog_tools(role: str):
+    """
+    Get the Datadog tool names an agent role may use
+
+    Args:
+        role: Agent role (e.g. "artisan")
+
+    Returns:
+        List of tool names, or None for all tools
+    """
+    override = os.getenv(f"SOW_DATADOG_TOOLS_{role.upper()}")
+    if override is not None:
+        names = [name.strip() for name in override.split(",") if name.strip()]
+        return None if names == ["*"] else names
+    return DATADOG_TOOL_ALLOWLIST.get(role)
+
 
-def get_datadog_tools():
+class FilteredToolProvider(ToolProvider):
+    """
+    Exposes an allow-listed subset of a shared MCP client's tools.
+
+    The client lists its tools once and keeps a single connection; each
+    agent gets a view that only carries the schemas it is allowed to call.
+    """
+
+    def __init__(self, provider, allowed: list, label: str):
+        """
+        Initialize filtered tool provider
+
+        Args:
+            provider: Shared tool provider (MCPSession)
+            allowed: Tool names to expose (server names, without prefix)
+            label: Name used in logs and stats (the agent role)
+        """
+        self.provider = provider
+        self.allowed = set(allowed)
+        self.label = label
+
+    async def load_tools(self, **kwargs):
+        tools = await self.provider.load_tools(**kwargs)
+        selected = [tool for tool in tools if _server_name(tool) in self.allowed]
+        missing = self.allowed - {_server_name(tool) for tool in selected}
+        if missing:
+            logger.warning(f"Datadog tools for {self.label} not offered by the server: {', '.join(sorted(missing))}")
+        stats = {
+            "tools": len(selected),
+            "available": len(tools),
+            "schema_tokens": tool_schema_tokens(tool.tool_spec for tool in selected),
+            "available_schema_tokens": tool_schema_tokens(tool.tool_spec for tool in tools),
+        }
+        _schema_stats[self.label] = stats
+        logger.info(f"Datadog tools for {self.label}: {stats['tools']}/{stats['available']}"
+                    f" (~{stats['schema_tokens']} of ~{stats['available_schema_tokens']} schema tokens per call)")
+        return selected
+
+    def add_consumer(self, consumer_id, **kwargs):
+        self.provider.add_consumer(consumer_id, **kwargs)
+
+    def remove_consumer(self, consumer_id, **kwargs):
+        # The shared client disconnects once its last consumer is gone
+        self.provider.remove_consumer(consumer_id, **kwargs)
+
+
+def _server_name(tool) -> str:
+    """Tool name as the MCP server knows it"""
+    mcp_tool = getattr(tool, "mcp_tool", None)
+    return mcp_tool.name if mcp_tool is not None else tool.tool_name
+
+
+def _datadog_configured() -> bool:
+    """Whether Datadog credentials are set"""
+    return bool(os.getenv("DD_API_KEY", "")) and bool(os.getenv("DD_APPLICATION_KEY", ""))
+
+
+def _shared_session():
+    """Datadog MCP session shared by all agents, or None if unavailable (checked once)"""
+    global _session, _session_checked
+    with _session_lock:
+        if not _session_checked:
+            _session_checked = True
+            if not _datadog_configured():
+                logger.warning(
+                    "DD_API_KEY or DD_APPLICATION_KEY not set. "
+                    "Datadog MCP tools will not be available."
+                )
+            else:
+                try:
+                    from mcp_client.datadog_client import get_datadog_mcp_client
+                    _session = get_session_manager().session("datadog", get_datadog_mcp_client)
+                except Exception as e:
+                    logger.warning(f"Failed to initialize Datadog MCP client: {e}")
+        return _session
+
+
+def get_datadog_tools(role: str = None):
     """
     Load Datadog MCP tools with graceful degradation.
 
+    Args:
+        role: Agent role; limits the tools to the role's allow-list
+            (None = all tools)
+
     Returns:
         list: List of MCP tools if connection succeeds, empty list otherwise.
     """
-    api_key = os.getenv("DD_API_KEY", "")
-    app_key = os.getenv("DD_APPLICATION_KEY", "")
-
-    if not api_key or not app_key:
-        logger.warning(
-            "DD_API_KEY or DD_APPLICATION_KEY not set. "
-            "Datadog MCP tools will not be available."
-        )
+    session = _shared_session()
+    if session is None:
         return []
+    allowed = allowed_datadog_tools(role) if role else None
+    if allowed is None:
+        # The shared session is a tool provider — strands Agent accepts it
+        # directly in its tools list; the session manager owns the connection.
+        return [session]
+    if not allowed:
+        return []
+    return [FilteredToolProvider(session, allowed, role)]
 
-    try:
-        from mcp_client.datadog_client import get_datadog_mcp_client
 
-        client = get_datadog_mcp_client()
-        # Return the client itself as a tool provider — strands Agent
-        # accepts MCPClient directly in its tools list and manages
-        # the lifecycle automatically.
-        return [client]
-    except Exception as e:
-        logger.warning(f"Failed to initialize Datadog MCP client: {e}")
-        return []
+def datadog_tool_stats() -> dict:
+    """
+    Get per-role Datadog tool counts and schema token estimates
+
+    Returns:
+        Dict of role -> {tools, available, schema_tokens, available_schema_tokens}
+    """
+    return dict(_schema_stats)
+
+
+def start_datadog_cache_run() -> dict:
+    """
+    Count Datadog result cache hits and misses for the run of the current task
+
+    Cached results are shared across runs and expire by TTL; only the
+    counters are per run.
+
+    Returns:
+        The run's counters (hits, misses, coalesced), updated in place;
+        empty without Datadog credentials
+    """
+    if not _datadog_configured():
+        return {}
+    from mcp_client.datadog_client import start_cache_run
+    return start_cache_run()
 
 
 def get_datadog_mcp_client_instance():
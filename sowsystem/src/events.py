@@ -0,0 +1,198 @@
+"""
+Events - Typed workflow event stream with chunk coalescing.
+
+Responsibilities:
+- Define the event every workflow step emits (stage, agent, attempt, kind,
+  data, timestamps), serializable to a plain dict
+- Coalesce runs of small text events within a time and size window, so
+  consumers flush and transmit far fewer, larger chunks
+- Render events as the plain text stream clients read by default
+"""
+
+import asyncio
+import json
+import os
+import time
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+# Event kinds
+STAGE_START = "stage_start"
+TEXT = "text"
+STAGE_END = "stage_end"
+STATUS = "status"
+RESULT = "result"
+
+# Coalescing window for text events (0 disables the respective bound)
+COALESCE_MS = int(os.getenv("SOW_STREAM_COALESCE_MS", "50"))
+COALESCE_CHARS = int(os.getenv("SOW_STREAM_COALESCE_CHARS", "2048"))
+
+
+@dataclass
+class WorkflowEvent:
+    """One item of the workflow stream"""
+    kind: str
+    stage: str = "workflow"
+    agent: Optional[str] = None
+    attempt: Optional[int] = None
+    data: Any = None
+    ts: float = field(default_factory=time.time)
+    ts_end: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """Plain dict for JSON streaming (ts_end defaults to ts)"""
+        event = asdict(self)
+        if event["ts_end"] is None:
+            event["ts_end"] = event["ts"]
+        return event
+
+    def stream_key(self) -> tuple:
+        """Identifies the agent stream an event belongs to"""
+        return (self.stage, self.agent, self.attempt)
+
+
+class TextRenderer:
+    """Renders workflow events as readable text chunks (stage banners, agent output, results)"""
+
+    def __init__(self):
+        self.current_agent = None
+
+    def render(self, event: WorkflowEvent) -> str:
+        """
+        Text for one event
+
+        Args:
+            event: Workflow event, in stream order
+
+        Returns:
+            Text chunk (empty for events that have no text form)
+        """
+        attempt = f" (attempt {event.attempt})" if event.attempt else ""
+        data = event.data
+        if event.kind == STAGE_START:
+            self.current_agent = event.agent
+            schema = f", tool schemas ~{data['tool_schema_tokens']}" if data.get("tool_schema_tokens") else ""
+            return (f"\n\n=== {event.agent.upper()} AGENT{attempt} ===\n"
+                    f"[{event.agent} prompt: ~{data['prompt_tokens']} tokens{schema}]\n")
+        if event.kind == TEXT:
+            prefix = ""
+            if event.agent != self.current_agent:
+                # Concurrent stages interleave; tag each switch
+                prefix = f"\n[{event.agent}] "
+                self.current_agent = event.agent
+            return prefix + data
+        if event.kind == STATUS:
+            self.current_agent = None
+            text = f"\n\n--- {data['message']}\n"
+            report = data.get("report")
+            if report:
+                text += (report if isinstance(report, str) else json.dumps(report, indent=2)) + "\n"
+            return text
+        if event.kind == RESULT:
+            banner = "=== ✅ SUCCESS ===" if data["status"] == "PASS" else "=== ❌ FAILED ==="
+            text = f"\n\n{banner}\n{data['message']}\n"
+            budget = data.get("budget")
+            if budget:
+                text += (f"Budget used: {budget['input_tokens']} input + {budget['output_tokens']} output tokens,"
+                         f" ~${budget['estimated_usd']}, {budget['elapsed_seconds']}s\n")
+            return text + "=== WORKFLOW COMPLETE ===\n"
+        return ""
+
+
+async def coalesce_events(events, max_delay_ms: int = COALESCE_MS, max_chars: int = COALESCE_CHARS):
+    """
+    Merge text events of the same agent stream
+
+    Each stream (stage, agent, attempt) has its own buffer, so interleaved
+    concurrent agents are coalesced too. A buffer is released when it reaches
+    max_chars, when max_delay_ms has passed since its first chunk, or when a
+    non-text event arrives (which releases all buffers first, keeping order).
+    The producer is driven by a single background task, so context variables
+    (tracing spans, workspace roots) set inside it keep working.
+
+    Args:
+        events: Async iterator of WorkflowEvent
+        max_delay_ms: Longest time text is held back (0 = no time bound)
+        max_chars: Largest merged text (0 = no size bound)
+
+    Yields:
+        WorkflowEvent
+    """
+    if max_delay_ms <= 0 and max_chars <= 0:
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await _aclose(events)
+        return
+
+    queue = asyncio.Queue(maxsize=256)
+    finished = object()
+
+    async def produce():
+        try:
+            async for event in events:
+                await queue.put(event)
+            await queue.put(finished)
+        except Exception as e:
+            await queue.put(e)
+
+    producer = asyncio.create_task(produce())
+    loop = asyncio.get_running_loop()
+    # One buffer per stream, so concurrent agents are coalesced independently
+    pending = {}
+    deadlines = {}
+    try:
+        while True:
+            if pending and max_delay_ms > 0:
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(min(deadlines.values()) - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    now = loop.time()
+                    for key in [key for key, deadline in deadlines.items() if deadline <= now]:
+                        del deadlines[key]
+                        yield pending.pop(key)
+                    continue
+            else:
+                item = await queue.get()
+
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if item.kind != TEXT:
+                for buffered in pending.values():
+                    yield buffered
+                pending.clear()
+                deadlines.clear()
+                yield item
+                continue
+
+            key = item.stream_key()
+            buffered = pending.get(key)
+            if buffered is None:
+                buffered = pending[key] = item
+                deadlines[key] = loop.time() + max_delay_ms / 1000
+            else:
+                buffered.data += item.data
+                buffered.ts_end = item.ts
+            if max_chars > 0 and len(buffered.data) >= max_chars:
+                del deadlines[key]
+                yield pending.pop(key)
+        for buffered in pending.values():
+            yield buffered
+    finally:
+        # Stop the producer before closing the stream it iterates, so an early
+        # close or cancellation runs the stream's cleanup now, not at loop shutdown
+        producer.cancel()
+        with suppress(asyncio.CancelledError):
+            await producer
+        await _aclose(events)
+
+
+async def _aclose(events):
+    """Close an async generator (other async iterators are left alone)"""
+    aclose = getattr(events, "aclose", None)
+    if aclose is not None:
+        await aclose()
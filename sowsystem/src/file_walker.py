@@ -0,0 +1,173 @@
+"""
+File Walker - Streaming, .gitignore-aware directory traversal.
+
+Responsibilities:
+- Walk a tree with os.scandir, yielding files lazily in a stable order
+- Honour .gitignore files (root and nested), pruning ignored directories
+  before descending into them
+- Support depth limits; callers bound the count with itertools.islice
+"""
+
+import os
+import re
+from typing import NamedTuple
+
+# Directories never worth walking, ignored or not
+SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.venv', 'venv'}
+
+
+class IgnoreRule(NamedTuple):
+    """One compiled .gitignore pattern"""
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+    base: str
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore glob into a regex body"""
+    out = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            closing = pattern.find("]", i + 2)
+            if closing == -1:
+                out.append(re.escape("["))
+                i += 1
+                continue
+            body = pattern[i + 1:closing]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = closing + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def parse_gitignore(text: str, base: str = "") -> list:
+    """
+    Compile the rules of one .gitignore file
+
+    Args:
+        text: Contents of the .gitignore
+        base: Directory of the .gitignore, relative to the walk root ("" for root)
+
+    Returns:
+        List of IgnoreRule in file order
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        if "/" in line:
+            # Anchored to the .gitignore directory
+            regex = re.compile(_translate(line.lstrip("/")) + "$")
+        else:
+            regex = re.compile("(?:.*/)?" + _translate(line) + "$")
+        rules.append(IgnoreRule(regex, negate, dir_only, base))
+    return rules
+
+
+def is_ignored(rules: list, rel: str, is_dir: bool) -> bool:
+    """
+    Check a path against .gitignore rules (the last matching rule wins)
+
+    Args:
+        rules: Rules from the root down to the path's directory
+        rel: Path relative to the walk root, "/"-separated
+        is_dir: Whether the path is a directory
+
+    Returns:
+        True if the path is ignored
+    """
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.base:
+            if not rel.startswith(rule.base + "/"):
+                continue
+            path = rel[len(rule.base) + 1:]
+        else:
+            path = rel
+        if rule.regex.match(path):
+            ignored = not rule.negate
+    return ignored
+
+
+def iter_project_files(root: str = ".", max_depth: int = None, use_gitignore: bool = True):
+    """
+    Lazily walk a directory tree
+
+    Files of a directory come before its subdirectories, each in name order,
+    so the output is stable and can be paged with islice.
+
+    Args:
+        root: Directory to walk
+        max_depth: Deepest directory level to enter (0 = only root's files,
+                   None = unlimited)
+        use_gitignore: Honour .gitignore files found during the walk
+
+    Yields:
+        (relative path with "/" separators, os.DirEntry) for each file
+    """
+    stack = [("", 0, [])]
+    while stack:
+        rel_dir, depth, rules = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        if use_gitignore:
+            for entry in entries:
+                if entry.name == ".gitignore" and entry.is_file():
+                    try:
+                        with open(entry.path, 'r', errors="replace") as f:
+                            rules = rules + parse_gitignore(f.read(), rel_dir)
+                    except OSError:
+                        pass
+                    break
+
+        subdirs = []
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIRS or is_ignored(rules, rel, True):
+                    continue
+                if max_depth is None or depth < max_depth:
+                    subdirs.append((rel, depth + 1, rules))
+            elif entry.is_file(follow_symlinks=False):
+                if not is_ignored(rules, rel, False):
+                    yield rel, entry
+        stack.extend(reversed(subdirs))
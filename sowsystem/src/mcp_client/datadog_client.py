@@ -6,12 +6,193 @@ to strands agents for observability-driven self-healing.
 
 Uses DD_API_KEY + DD_APPLICATION_KEY headers for authentication.
 Endpoint: https://mcp.{DD_SITE}/api/unstable/mcp-server/mcp
+
+Read-only tool results are cached for SOW_DATADOG_CACHE_TTL seconds, keyed by
+tool name and normalized arguments, and concurrent identical calls share a
+single request (agents tend to ask the same questions within a minute).
+The cache is shared by concurrent runs and expires by TTL only; hit and miss
+counters are kept per run (see start_cache_run).
+Oversized results are compacted before they reach the agent (see
+mcp_client.results).
 """
 
+import asyncio
+import concurrent.futures
+import copy
+import json
 import os
+import threading
+import time
+from contextvars import ContextVar
+
 from mcp.client.streamable_http import streamablehttp_client
 from strands.tools.mcp.mcp_client import MCPClient
 
+from mcp_client.results import compact_tool_result
+
+# Seconds a successful read-only result is reused (0 disables caching and coalescing)
+DATADOG_CACHE_TTL = float(os.getenv("SOW_DATADOG_CACHE_TTL", "60"))
+DATADOG_CACHE_MAX_ENTRIES = 256
+
+# Tools with side effects are always called
+UNCACHED_TOOL_PREFIXES = ("create_", "update_", "delete_", "edit_", "add_")
+
+
+# Cache counters of the run the current task belongs to (None outside a run)
+_run_cache_stats = ContextVar("sow_datadog_cache_stats", default=None)
+
+
+def start_cache_run() -> dict:
+    """
+    Start counting cache hits, misses and coalesced calls for the current run
+
+    Call it in the task that drives the run; tool calls inherit the
+    counters from there, so concurrent runs do not mix their stats.
+
+    Returns:
+        The run's counters dict (updated in place as tools are called)
+    """
+    stats = {"hits": 0, "misses": 0, "coalesced": 0}
+    _run_cache_stats.set(stats)
+    return stats
+
+
+def normalize_arguments(arguments) -> str:
+    """
+    Canonical form of tool arguments, so equivalent calls share a cache entry
+
+    Keys are sorted, empty values dropped and whitespace in strings collapsed.
+
+    Args:
+        arguments: Tool input
+
+    Returns:
+        JSON string
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items() if v not in (None, "", [], {})}
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+        if isinstance(value, str):
+            return " ".join(value.split())
+        return value
+
+    return json.dumps(normalize(arguments or {}), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _for_tool_use(result: dict, tool_use_id: str) -> dict:
+    """Copy of a shared result, addressed to another tool use"""
+    return {**copy.deepcopy(result), "toolUseId": tool_use_id}
+
+
+class CachingMCPClient(MCPClient):
+    """
+    MCPClient with a TTL result cache, single-flight coalescing of identical
+    tool calls and bounded (compacted) results
+    """
+
+    def __init__(self, transport_callable, *, ttl_seconds: float = DATADOG_CACHE_TTL, **kwargs):
+        """
+        Initialize caching MCP client
+
+        Args:
+            transport_callable: Returns the MCP transport (see MCPClient)
+            ttl_seconds: Lifetime of cached results (0 = no caching)
+            **kwargs: Passed to MCPClient (tool_filters, prefix, ...)
+        """
+        super().__init__(transport_callable, **kwargs)
+        self.ttl_seconds = ttl_seconds
+        self._results = {}
+        self._inflight = {}
+        self._cache_lock = threading.Lock()
+        # Process totals; per-run counters come from start_cache_run
+        self.cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def _cacheable(self, name: str) -> bool:
+        return self.ttl_seconds > 0 and not name.startswith(UNCACHED_TOOL_PREFIXES)
+
+    def _count(self, outcome: str):
+        """Count a lookup in the process totals and the current run (call with _cache_lock held)"""
+        self.cache_stats[outcome] += 1
+        run_stats = _run_cache_stats.get()
+        if run_stats is not None:
+            run_stats[outcome] += 1
+
+    def _claim(self, key):
+        """
+        Look up a call: ("hit", result), ("wait", future of the leader's
+        result) or ("lead", future to settle once the call returns)
+        """
+        with self._cache_lock:
+            entry = self._results.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._count("hits")
+                return "hit", entry[1]
+            future = self._inflight.get(key)
+            if future is not None:
+                self._count("coalesced")
+                return "wait", future
+            self._count("misses")
+            future = self._inflight[key] = concurrent.futures.Future()
+            return "lead", future
+
+    def _settle(self, key, future, result):
+        """Publish the leader's result (None = call abandoned; waiters call themselves)"""
+        with self._cache_lock:
+            self._inflight.pop(key, None)
+            if result is not None and result.get("status") == "success":
+                now = time.monotonic()
+                if len(self._results) >= DATADOG_CACHE_MAX_ENTRIES:
+                    self._results = {k: v for k, v in self._results.items() if v[0] > now}
+                if len(self._results) < DATADOG_CACHE_MAX_ENTRIES:
+                    self._results[key] = (now + self.ttl_seconds, result)
+        future.set_result(result)
+
+    async def call_tool_async(self, tool_use_id, name, arguments=None, read_timeout_seconds=None):
+        if not self._cacheable(name):
+            return compact_tool_result(
+                name, await super().call_tool_async(tool_use_id, name, arguments, read_timeout_seconds))
+        key = (name, normalize_arguments(arguments))
+        state, value = self._claim(key)
+        if state == "hit":
+            return _for_tool_use(value, tool_use_id)
+        if state == "wait":
+            result = await asyncio.wrap_future(value)
+            if result is not None:
+                return _for_tool_use(result, tool_use_id)
+            return compact_tool_result(
+                name, await super().call_tool_async(tool_use_id, name, arguments, read_timeout_seconds))
+        result = None
+        try:
+            result = compact_tool_result(
+                name, await super().call_tool_async(tool_use_id, name, arguments, read_timeout_seconds))
+            return result
+        finally:
+            self._settle(key, value, result)
+
+    def call_tool_sync(self, tool_use_id, name, arguments=None, read_timeout_seconds=None):
+        if not self._cacheable(name):
+            return compact_tool_result(
+                name, super().call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds))
+        key = (name, normalize_arguments(arguments))
+        state, value = self._claim(key)
+        if state == "hit":
+            return _for_tool_use(value, tool_use_id)
+        if state == "wait":
+            result = value.result()
+            if result is not None:
+                return _for_tool_use(result, tool_use_id)
+            return compact_tool_result(
+                name, super().call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds))
+        result = None
+        try:
+            result = compact_tool_result(
+                name, super().call_tool_sync(tool_use_id, name, arguments, read_timeout_seconds))
+            return result
+        finally:
+            self._settle(key, value, result)
+
 
 def get_datadog_mcp_client() -> MCPClient:
     """
@@ -23,7 +204,8 @@ def get_datadog_mcp_client() -> MCPClient:
         - DD_SITE: Datadog site (default: datadoghq.com)
 
     Returns:
-        MCPClient compatible with strands Agent(tools=[...])
+        MCPClient compatible with strands Agent(tools=[...]), caching
+        read-only tool results for SOW_DATADOG_CACHE_TTL seconds
     """
     api_key = os.getenv("DD_API_KEY", "")
     app_key = os.getenv("DD_APPLICATION_KEY", "")
@@ -36,4 +218,4 @@ def get_datadog_mcp_client() -> MCPClient:
         "DD-APPLICATION-KEY": app_key,
     }
 
-    return MCPClient(lambda: streamablehttp_client(url, headers=headers))
+    return CachingMCPClient(lambda: streamablehttp_client(url, headers=headers))
@@ -0,0 +1,227 @@
+"""
+MCP Results - Bounded tool results for the agent conversation.
+
+Responsibilities:
+- Cap the text an MCP tool result adds to the conversation (per-tool token
+  limits, SOW_MCP_RESULT_MAX_TOKENS by default)
+- Collapse repeated log lines and records (differing only in timestamps,
+  IDs or durations) into one entry with a repeat count
+- Keep the most recent records (JSON with timestamps) or the most relevant
+  lines (errors and warnings first)
+- Store the full payload in the output store, fetchable by reference
+"""
+
+import json
+import os
+import re
+from collections import OrderedDict
+
+from context_budget import CHARS_PER_TOKEN, estimate_tokens, get_output_store
+
+# Token cap per tool result (0 = unlimited); SOW_MCP_RESULT_TOKEN_LIMITS overrides per tool (JSON)
+MCP_RESULT_MAX_TOKENS = int(os.getenv("SOW_MCP_RESULT_MAX_TOKENS", "3000"))
+MCP_RESULT_TOKEN_LIMITS = json.loads(os.getenv("SOW_MCP_RESULT_TOKEN_LIMITS", "{}"))
+
+# Room kept for the truncation note
+_NOTE_TOKENS = 80
+
+# Keys that hold the list of records in a JSON payload, and their timestamps
+_RECORD_KEYS = ("data", "logs", "events", "spans", "traces", "results", "items", "incidents", "monitors")
+_TIME_KEYS = ("timestamp", "@timestamp", "ts", "time", "date", "start", "created", "created_at")
+_MESSAGE_KEYS = ("message", "msg", "content", "title", "name")
+
+# Volatile parts of a log line, replaced before comparing lines
+_VOLATILE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ][\d:.]+(?:Z|[+-]\d{2}:?\d{2})?"  # ISO timestamps
+    r"|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"  # UUIDs
+    r"|\b0x[0-9a-f]+\b|\b[0-9a-f]{16,}\b"  # hex IDs
+    r"|\d+\.\d+|\d{4,}|\d+(?=\s?(?:ms|us|ns|s|%|b|kb|mb)\b)",  # durations, sizes, counters
+    re.IGNORECASE,
+)
+_ERROR = re.compile(r"\b(error|exception|traceback|fatal|critical|panic|fail(ed|ure)?|5\d\d)\b", re.IGNORECASE)
+_WARNING = re.compile(r"\b(warn(ing)?|timeout|retry|4\d\d)\b", re.IGNORECASE)
+
+
+def token_limit(tool_name: str) -> int:
+    """Token cap for a tool's results (0 = unlimited)"""
+    return int(MCP_RESULT_TOKEN_LIMITS.get(tool_name, MCP_RESULT_MAX_TOKENS))
+
+
+def _fingerprint(text: str) -> str:
+    return _VOLATILE.sub("#", text.strip())
+
+
+def _relevance(text: str) -> int:
+    if _ERROR.search(text):
+        return 2
+    if _WARNING.search(text):
+        return 1
+    return 0
+
+
+def compact_lines(text: str, budget_tokens: int):
+    """
+    Deduplicate lines and keep the most relevant ones within a token budget
+
+    Lines that only differ in timestamps, IDs or durations are collapsed into
+    the first one, marked with a repeat count. Errors are kept first, then
+    warnings, then the rest; the kept lines stay in their original order.
+
+    Returns:
+        (compacted text, kept lines, unique lines, collapsed duplicates)
+    """
+    groups = OrderedDict()
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        group = groups.setdefault(_fingerprint(line), [line, 0])
+        group[1] += 1
+    unique = [f"{line} [x{count}]" if count > 1 else line for line, count in groups.values()]
+    duplicates = sum(count - 1 for _, count in groups.values())
+
+    order = sorted(range(len(unique)), key=lambda i: (-_relevance(unique[i]), i))
+    kept, used = set(), 0
+    for i in order:
+        cost = estimate_tokens(unique[i]) + 1
+        if used + cost > budget_tokens:
+            continue
+        kept.add(i)
+        used += cost
+    if not kept and unique:
+        # Not even one line fits: cut the most relevant one
+        return unique[order[0]][:budget_tokens * CHARS_PER_TOKEN], 1, len(unique), duplicates
+    return "\n".join(unique[i] for i in sorted(kept)), len(kept), len(unique), duplicates
+
+
+def _find_records(payload):
+    """(container key or None, list of record dicts) of a JSON payload, or None"""
+    if isinstance(payload, list) and payload and all(isinstance(r, dict) for r in payload):
+        return None, payload
+    if isinstance(payload, dict):
+        for key in _RECORD_KEYS:
+            records = payload.get(key)
+            if isinstance(records, list) and records and all(isinstance(r, dict) for r in records):
+                return key, records
+    return None
+
+
+def _structured_records(content: list):
+    """
+    (payload, container key or None, list of records) of the first JSON
+    content item (or JSON text) that holds a list of records, or None
+    """
+    for item in content:
+        payload = item.get("json")
+        if payload is None and isinstance(item.get("text"), str):
+            try:
+                payload = json.loads(item["text"])
+            except ValueError:
+                continue
+        found = _find_records(payload)
+        if found is not None:
+            return (payload, *found)
+    return None
+
+
+def _record_time(record: dict):
+    for source in (record, record.get("attributes") or {}):
+        for key in _TIME_KEYS:
+            if isinstance(source, dict) and source.get(key) is not None:
+                return str(source[key])
+    return None
+
+
+def _record_message(record: dict) -> str:
+    for source in (record, record.get("attributes") or {}):
+        for key in _MESSAGE_KEYS:
+            if isinstance(source, dict) and isinstance(source.get(key), str):
+                return source[key]
+    return json.dumps(record, sort_keys=True, default=str)
+
+
+def compact_records(records: list, budget_tokens: int):
+    """
+    Deduplicate records by message and keep the most recent ones within a token budget
+
+    Returns:
+        (kept records, unique records, collapsed duplicates)
+    """
+    groups = OrderedDict()
+    for record in records:
+        fingerprint = _fingerprint(_record_message(record))
+        group = groups.get(fingerprint)
+        if group is None:
+            groups[fingerprint] = [record, 1]
+        else:
+            group[1] += 1
+            # Keep the newest occurrence of a repeated record
+            if (_record_time(record) or "") > (_record_time(group[0]) or ""):
+                group[0] = record
+    unique = [dict(record, _repeats=count) if count > 1 else record for record, count in groups.values()]
+    duplicates = len(records) - len(unique)
+
+    if any(_record_time(record) for record in unique):
+        unique.sort(key=lambda record: _record_time(record) or "", reverse=True)
+    kept, used = [], 2
+    for record in unique:
+        cost = estimate_tokens(json.dumps(record, default=str, separators=(",", ":"))) + 1
+        if used + cost > budget_tokens:
+            break
+        kept.append(record)
+        used += cost
+    return kept, len(unique), duplicates
+
+
+def compact_tool_result(tool_name: str, result: dict) -> dict:
+    """
+    Bound the text of an MCP tool result
+
+    Results within the tool's token limit are returned unchanged. Larger
+    ones are stored in full in the output store and replaced by one text
+    block with the deduplicated, most recent/relevant entries and a
+    fetch_full_output reference.
+
+    Args:
+        tool_name: MCP tool name
+        result: MCPToolResult (status, toolUseId, content, ...)
+
+    Returns:
+        The result, or a compacted copy
+    """
+    limit = token_limit(tool_name)
+    content = result.get("content") or []
+    texts = [item["text"] for item in content if isinstance(item.get("text"), str)]
+    texts += [json.dumps(item["json"], default=str) for item in content if "json" in item]
+    full = "\n".join(texts)
+    total_tokens = estimate_tokens(full)
+    if limit <= 0 or total_tokens <= limit:
+        return result
+
+    ref = get_output_store().put(f"mcp-{tool_name}", full)
+    budget = max(limit - _NOTE_TOKENS, 1)
+    kept = None
+    found = _structured_records(content)
+    if found is not None:
+        payload, key, records = found
+        # Sibling fields (pagination cursors, totals, meta) are kept as they are
+        siblings = {k: v for k, v in payload.items() if k != key} if key else {}
+        sibling_tokens = estimate_tokens(json.dumps(siblings, default=str, separators=(",", ":"))) if siblings else 0
+        if sibling_tokens < budget:
+            kept, unique, duplicates = compact_records(records, budget - sibling_tokens)
+    if kept:
+        # Replace only the record list, in place
+        compacted_payload = {k: (kept if k == key else v) for k, v in payload.items()} if key else kept
+        body = json.dumps(compacted_payload, default=str, separators=(",", ":"))
+        summary = f"kept {len(kept)} of {unique} unique records (most recent first)"
+    else:
+        body, kept_lines, unique, duplicates = compact_lines(full, budget)
+        summary = f"kept {kept_lines} of {unique} unique lines (errors and warnings first)"
+    if duplicates:
+        summary += f", {duplicates} repeats collapsed"
+    note = (f"--- {tool_name} result truncated from ~{total_tokens} tokens: {summary}."
+            f' Full payload: fetch_full_output(ref="{ref}") ---')
+
+    compacted = {key: value for key, value in result.items() if key != "structuredContent"}
+    compacted["content"] = [item for item in content if "text" not in item and "json" not in item]
+    compacted["content"].insert(0, {"text": f"{body}\n{note}"})
+    return compacted
@@ -0,0 +1,249 @@
+"""
+MCP Sessions - Long-lived MCP connections shared by every agent.
+
+Responsibilities:
+- Open each registered MCP connection once (per process, or per run with
+  SOW_MCP_SESSION_SCOPE=run) and list its tools once
+- Hand the connection to agents as a tool provider whose lifecycle the
+  manager owns, so agents no longer connect and disconnect around each use
+- Keep connections warm with periodic health checks and reconnect
+  failed ones
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from strands.tools.tool_provider import ToolProvider
+
+log = logging.getLogger(__name__)
+
+# process = connections outlive runs; run = closed at the end of every run
+MCP_SESSION_SCOPE = os.getenv("SOW_MCP_SESSION_SCOPE", "process").lower()
+# Seconds between health checks of open connections (0 = no background checks)
+MCP_HEALTH_INTERVAL = float(os.getenv("SOW_MCP_HEALTH_INTERVAL", "30"))
+
+SESSION_SCOPES = ("process", "run")
+
+
+class MCPSession(ToolProvider):
+    """
+    One shared MCP connection, exposed as a strands tool provider.
+
+    Agents register as consumers but never stop the connection; the
+    manager does. Reconnecting restarts the same MCPClient object, so the
+    tool objects agents already hold keep working.
+    """
+
+    def __init__(self, name: str, factory):
+        """
+        Initialize MCP session
+
+        Args:
+            name: Connection name (e.g. "datadog")
+            factory: Callable returning a new, unstarted MCPClient
+        """
+        self.name = name
+        self.factory = factory
+        self.client = None
+        self._tools = None
+        self._connected = False
+        self._consumers = set()
+        self._lock = threading.RLock()
+        self.stats = {"connects": 0, "reconnects": 0, "tool_listings": 0, "health_checks": 0,
+                      "health_failures": 0, "connect_seconds": 0.0}
+
+    def _connect(self):
+        """Start (or restart) the connection; call with the lock held"""
+        if self.client is None:
+            self.client = self.factory()
+        elif self._connected:
+            self._disconnect()
+        start = time.perf_counter()
+        self.client.start()
+        self._connected = True
+        self._tools = None
+        self.stats["connects"] += 1
+        self.stats["connect_seconds"] += time.perf_counter() - start
+        log.info(f"MCP session {self.name} connected in {time.perf_counter() - start:.2f}s")
+
+    def _disconnect(self):
+        """Stop the connection; call with the lock held"""
+        self._connected = False
+        try:
+            self.client.stop(None, None, None)
+        except Exception as e:
+            # stop() re-raises the error that closed the connection
+            log.info(f"MCP session {self.name} closed with error: {e}")
+
+    def ensure_connected(self):
+        """Connect if not connected yet"""
+        with self._lock:
+            if not self._connected:
+                self._connect()
+
+    def tools(self) -> list:
+        """
+        Get the server's tools, listed once per connection
+
+        Returns:
+            List of MCPAgentTool bound to the shared client
+        """
+        with self._lock:
+            self.ensure_connected()
+            if self._tools is None:
+                tools = []
+                pagination_token = None
+                while True:
+                    page = self.client.list_tools_sync(pagination_token)
+                    tools.extend(page)
+                    pagination_token = page.pagination_token
+                    if pagination_token is None:
+                        break
+                self._tools = tools
+                self.stats["tool_listings"] += 1
+            return self._tools
+
+    def check(self) -> bool:
+        """
+        Health check: list tools over the live connection, reconnect on failure
+
+        The probe runs without the lock, so agents loading tools are not
+        blocked behind a slow server; the lock is only taken to reconnect.
+
+        Returns:
+            True if the connection was healthy
+        """
+        with self._lock:
+            if not self._connected:
+                return True
+            self.stats["health_checks"] += 1
+            connects = self.stats["connects"]
+        try:
+            self.client.list_tools_sync()
+            return True
+        except Exception as e:
+            error = e
+        with self._lock:
+            self.stats["health_failures"] += 1
+            if not self._connected or self.stats["connects"] != connects:
+                # Closed or reconnected by someone else while probing
+                return False
+            log.warning(f"MCP session {self.name} failed its health check ({error}); reconnecting")
+            try:
+                self._connect()
+                self.stats["reconnects"] += 1
+            except Exception as e:
+                self._connected = False
+                log.warning(f"MCP session {self.name} could not reconnect: {e}")
+            return False
+
+    def close(self):
+        """Close the connection (the next use reconnects)"""
+        with self._lock:
+            if self._connected:
+                self._disconnect()
+            self._tools = None
+
+    # ToolProvider interface: agents share the connection but never close it
+
+    async def load_tools(self, **kwargs):
+        return await asyncio.to_thread(self.tools)
+
+    def add_consumer(self, consumer_id, **kwargs):
+        self._consumers.add(consumer_id)
+
+    def remove_consumer(self, consumer_id, **kwargs):
+        self._consumers.discard(consumer_id)
+
+
+class MCPSessionManager:
+    """Registry of shared MCP sessions with a background health checker"""
+
+    def __init__(self, health_interval: float = MCP_HEALTH_INTERVAL):
+        """
+        Initialize MCP session manager
+
+        Args:
+            health_interval: Seconds between health checks (0 = none)
+        """
+        self.health_interval = health_interval
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checker = None
+
+    def session(self, name: str, factory) -> MCPSession:
+        """
+        Get the shared session for a connection, registering it on first use
+
+        Args:
+            name: Connection name
+            factory: Callable returning a new MCPClient (used once)
+
+        Returns:
+            MCPSession (connects lazily, when an agent first loads its tools)
+        """
+        with self._lock:
+            session = self._sessions.get(name)
+            if session is None:
+                session = self._sessions[name] = MCPSession(name, factory)
+            if self.health_interval > 0 and self._checker is None:
+                self._checker = threading.Thread(target=self._check_loop, name="mcp-health", daemon=True)
+                self._checker.start()
+            return session
+
+    def _check_loop(self):
+        while not self._stop.wait(self.health_interval):
+            with self._lock:
+                sessions = list(self._sessions.values())
+            for session in sessions:
+                session.check()
+
+    def close_all(self):
+        """Close every connection (sessions stay registered and reconnect on next use)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            session.close()
+
+    def start_run(self):
+        """
+        Check the session settings before a run starts
+
+        Raises:
+            ValueError: If SOW_MCP_SESSION_SCOPE is unknown
+        """
+        if MCP_SESSION_SCOPE not in SESSION_SCOPES:
+            raise ValueError(f"Unknown SOW_MCP_SESSION_SCOPE {MCP_SESSION_SCOPE!r}; use process or run")
+
+    def end_run(self):
+        """Close connections at the end of a run when SOW_MCP_SESSION_SCOPE=run (never raises)"""
+        if MCP_SESSION_SCOPE == "run":
+            self.close_all()
+
+    def stats(self) -> dict:
+        """
+        Get per-session counters
+
+        Returns:
+            Dict of name -> connects, reconnects, tool listings, health checks
+        """
+        with self._lock:
+            return {name: dict(session.stats, connect_seconds=round(session.stats["connect_seconds"], 3))
+                    for name, session in self._sessions.items()}
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> MCPSessionManager:
+    """Process-wide MCP session manager"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MCPSessionManager()
+        return _manager
@@ -0,0 +1,247 @@
+"""
+LLM Cache - On-disk cache of model responses with LRU eviction and replay.
+
+Responsibilities:
+- Wrap a strands model so identical requests (model ID, system prompt,
+  messages including tool results, tool specs) replay the recorded stream
+- Store entries on disk and evict the least recently used ones once the
+  cache exceeds its size budget
+- Offer a strict replay mode that never calls the model, so runs are
+  deterministic and offline
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from strands.models.model import Model
+
+from atomic_write import write_files_atomically
+
+log = logging.getLogger(__name__)
+
+# off = no caching, on = read-through cache, replay = cache only (misses fail)
+LLM_CACHE_MODE = os.getenv("SOW_LLM_CACHE", "off").lower()
+LLM_CACHE_DIR = os.path.join(
+    os.path.expanduser(os.getenv("SOW_CACHE_DIR", "~/.cache/sow-agent")), "llm"
+)
+LLM_CACHE_MAX_BYTES = int(os.getenv("SOW_LLM_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+CACHE_MODES = ("off", "on", "replay")
+
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request was never recorded"""
+
+
+def _json_default(value):
+    """
+    Encode message content with bytes (images, documents) as JSON
+
+    Raises:
+        TypeError: For any other type; a repr (with its memory address)
+                   would make keys differ between runs
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"Cannot encode {type(value).__name__} in an LLM cache entry")
+
+
+def _json_object_hook(obj: dict):
+    """Decode what _json_default encoded, so replayed events match the recorded ones"""
+    if len(obj) == 1 and "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def request_key(model_id: str, system_prompt, messages, tool_specs, **kwargs) -> str:
+    """
+    Hash everything that determines a model response
+
+    Args:
+        model_id: Model ID
+        system_prompt: System prompt
+        messages: Conversation so far (tool results included)
+        tool_specs: Tool specs offered to the model
+        **kwargs: Other request options (e.g. tool_choice)
+
+    Returns:
+        Hex digest
+
+    Raises:
+        TypeError: If the request holds values that have no stable JSON form
+    """
+    request = {
+        "model_id": model_id,
+        "system_prompt": system_prompt,
+        "messages": messages,
+        "tool_specs": tool_specs,
+        "options": kwargs,
+    }
+    text = json.dumps(request, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Directory of recorded model streams, evicted least recently used first"""
+
+    def __init__(self, directory: str = LLM_CACHE_DIR, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        """
+        Initialize response cache
+
+        Args:
+            directory: Cache directory
+            max_bytes: Size budget; oldest entries (by last use) are evicted beyond it
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _entries(self):
+        """(mtime, size, path) of every entry"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, path))
+        return entries
+
+    def get(self, key: str):
+        """
+        Get a recorded stream, marking it as recently used
+
+        Returns:
+            List of stream events, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                events = json.load(f, object_hook=_json_object_hook)["events"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return events
+
+    def put(self, key: str, events: list, model_id: str):
+        """Record a stream and evict old entries if over budget"""
+        data = json.dumps({"model_id": model_id, "events": events}, default=_json_default)
+        write_files_atomically({self._path(key): data})
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data.encode("utf-8"))
+            if self._size > self.max_bytes:
+                self._evict()
+        with _stats_lock:
+            _stats["writes"] += 1
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is 90% of its budget"""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 9 // 10
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            with _stats_lock:
+                _stats["evictions"] += 1
+
+
+class CachingModel(Model):
+    """Model wrapper that records and replays streamed responses"""
+
+    def __init__(self, model: Model, mode: str = LLM_CACHE_MODE, cache: ResponseCache = None):
+        """
+        Initialize caching model
+
+        Args:
+            model: Model to wrap (e.g. BedrockModel)
+            mode: "on" (read-through) or "replay" (misses raise CacheMissError)
+            cache: Response cache (default: shared directory in SOW_CACHE_DIR)
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}; use one of {', '.join(CACHE_MODES)}")
+        self.model = model
+        self.mode = mode
+        self.cache = cache or ResponseCache()
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self):
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        # Parsed pydantic outputs are not recorded; pass through
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        config = self.model.get_config() or {}
+        model_id = config.get("model_id", type(self.model).__name__)
+        try:
+            key = request_key(model_id, system_prompt, messages, tool_specs, **kwargs)
+        except TypeError as e:
+            if self.mode == "replay":
+                raise CacheMissError(f"Request cannot be looked up in the cache: {e}") from e
+            log.warning(f"Not caching model request: {e}")
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+            return
+
+        events = self.cache.get(key)
+        if events is not None:
+            with _stats_lock:
+                _stats["hits"] += 1
+            for event in events:
+                yield event
+            return
+
+        with _stats_lock:
+            _stats["misses"] += 1
+        if self.mode == "replay":
+            raise CacheMissError(f"No recorded response for request {key[:12]} (SOW_LLM_CACHE=replay)")
+
+        recorded = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            recorded.append(event)
+            yield event
+        # Only complete streams are recorded; errors and cancellations propagate above
+        try:
+            self.cache.put(key, recorded, model_id)
+        except (OSError, TypeError) as e:
+            log.warning(f"Could not cache model response: {e}")
+
+
+def llm_cache_stats() -> dict:
+    """
+    Get LLM cache counters for the process
+
+    Returns:
+        Dict with mode, hits, misses, writes and evictions
+    """
+    with _stats_lock:
+        return {"mode": LLM_CACHE_MODE, **_stats}
@@ -1,11 +1,80 @@
+import threading
+import time
+
 from strands.models import BedrockModel
 
-# Uses Amazon Nova Lite (current model)
+from model.cache import LLM_CACHE_MODE, CachingModel
+from model.routing import route_model
+from telemetry import TracingModel, tracing_enabled
+
+# Default model (Amazon Nova Lite); agents use per-role models from model.routing
 MODEL_ID = "amazon.nova-lite-v1:0"
 
-def load_model() -> BedrockModel:
+# Process-level pool: one BedrockModel (and boto3 client) per model ID
+_model_pool = {}
+_pool_lock = threading.Lock()
+_pool_stats = {"builds": 0, "hits": 0, "build_seconds": 0.0}
+
+
+def load_model(model_id: str = MODEL_ID):
     """
     Get Bedrock model client.
     Uses IAM authentication via the execution role.
+
+    Clients are pooled per model ID, so the boto3 client, credential
+    resolution and TLS connections are shared by every agent in the process.
+    With SOW_LLM_CACHE=on|replay the client is wrapped in the on-disk
+    response cache, and in a span-recording wrapper when tracing is on.
+    """
+    with _pool_lock:
+        model = _model_pool.get(model_id)
+        if model is not None:
+            _pool_stats["hits"] += 1
+            return model
+
+        start = time.perf_counter()
+        model = BedrockModel(model_id=model_id)
+        if LLM_CACHE_MODE != "off":
+            model = CachingModel(model, LLM_CACHE_MODE)
+        if tracing_enabled():
+            model = TracingModel(model)
+        _pool_stats["build_seconds"] += time.perf_counter() - start
+        _pool_stats["builds"] += 1
+        _model_pool[model_id] = model
+        return model
+
+
+def load_model_for(role: str):
+    """
+    Get the pooled model client routed to an agent role
+
+    Args:
+        role: Agent role (e.g. "auditor"); see model.routing
+    """
+    return load_model(route_model(role))
+
+
+def model_id_of(agent):
+    """Model ID an agent currently uses (through cache/tracing wrappers), or None"""
+    model = getattr(agent, "model", None)
+    try:
+        return (model.get_config() or {}).get("model_id")
+    except AttributeError:
+        return None
+
+
+def model_pool_stats() -> dict:
+    """
+    Get model pool counters.
+
+    Returns:
+        Dict with number of clients built, pool hits and total build time
     """
-    return BedrockModel(model_id=MODEL_ID)
\ No newline at end of file
+    with _pool_lock:
+        return dict(_pool_stats)
+
+
+def reset_model_pool():
+    """Drop all pooled model clients (next load_model() builds fresh ones)"""
+    with _pool_lock:
+        _model_pool.clear()
@@ -0,0 +1,245 @@
+"""
+Model Routing - Per-agent model selection.
+
+Responsibilities:
+- Map each agent role to a model ID (every role uses the baseline model
+  unless SOW_MODEL_PROFILE=economy, SOW_MODEL_<ROLE> or SOW_MODEL_ROUTES
+  opt into other models)
+- Optionally pick adaptively among candidate models per role, preferring
+  the fastest model whose observed pass rate is close to the best one
+- Persist per-role, per-model latency and pass-rate stats across runs,
+  merged under a file lock so concurrent runs do not lose each other's stats
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+from contextlib import contextmanager
+
+from atomic_write import write_files_atomically
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; only the thread lock applies there
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+MICRO = "amazon.nova-micro-v1:0"
+LITE = "amazon.nova-lite-v1:0"
+PRO = "amazon.nova-pro-v1:0"
+
+ROLES = ("auditor", "bridge", "architect", "artisan", "qa_judge")
+
+# baseline = the model every agent has always used; economy = cheap, fast
+# models for extraction and surveying, Lite where the output is built on
+MODEL_PROFILES = {
+    "baseline": {role: LITE for role in ROLES},
+    "economy": {
+        "auditor": MICRO,
+        "bridge": MICRO,
+        "architect": LITE,
+        "artisan": LITE,
+        "qa_judge": LITE,
+    },
+}
+MODEL_PROFILE = os.getenv("SOW_MODEL_PROFILE", "baseline").lower()
+if MODEL_PROFILE not in MODEL_PROFILES:
+    log.warning(f"Unknown SOW_MODEL_PROFILE {MODEL_PROFILE!r}; using 'baseline'")
+    MODEL_PROFILE = "baseline"
+
+
+def _parse_routes(text: str):
+    """
+    Parse SOW_MODEL_ROUTES (a JSON object of role -> model ID)
+
+    Returns:
+        (routes, error): the routes, or {} and a message when the value is malformed
+    """
+    try:
+        routes = json.loads(text)
+    except ValueError as e:
+        return {}, f"SOW_MODEL_ROUTES is not valid JSON ({e})"
+    if not isinstance(routes, dict) or not all(isinstance(v, str) and v for v in routes.values()):
+        return {}, 'SOW_MODEL_ROUTES must be a JSON object of role to model ID, e.g. {"auditor": "..."}'
+    return routes, None
+
+
+# Malformed settings are reported by validate_routing() at run start, not at import
+_ROUTES_OVERRIDE, ROUTES_ERROR = _parse_routes(os.getenv("SOW_MODEL_ROUTES", "{}"))
+
+DEFAULT_ROUTES = MODEL_PROFILES[MODEL_PROFILE]
+ROUTES = {
+    **DEFAULT_ROUTES,
+    **_ROUTES_OVERRIDE,
+    **{role: os.environ[f"SOW_MODEL_{role.upper()}"] for role in ROLES
+       if os.getenv(f"SOW_MODEL_{role.upper()}")},
+}
+
+# static = always the routing table; adaptive = choose among candidates from recorded stats
+MODEL_ROUTING = os.getenv("SOW_MODEL_ROUTING", "static").lower()
+ROUTE_CANDIDATES = [m for m in os.getenv("SOW_MODEL_CANDIDATES", f"{MICRO},{LITE},{PRO}").split(",") if m]
+ROUTE_MIN_SAMPLES = int(os.getenv("SOW_MODEL_MIN_SAMPLES", "3"))
+ROUTE_EXPLORE = float(os.getenv("SOW_MODEL_EXPLORE", "0.1"))
+ROUTE_PASS_TOLERANCE = float(os.getenv("SOW_MODEL_PASS_TOLERANCE", "0.1"))
+ROUTE_STATS_FILE = os.path.join(
+    os.path.expanduser(os.getenv("SOW_CACHE_DIR", "~/.cache/sow-agent")), "model_stats.json"
+)
+
+ROUTING_MODES = ("static", "adaptive")
+
+# Weight of the newest observation in the latency moving average
+LATENCY_ALPHA = 0.3
+
+_stats_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_stats(path: str):
+    """
+    Hold the stats lock for a read-merge-write of the stats file
+
+    The thread lock covers this process; an flock on a sidecar lock file
+    covers other runs sharing the cache directory.
+    """
+    with _stats_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _load_stats(path: str = ROUTE_STATS_FILE) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _pass_rate(entry: dict) -> float:
+    """Smoothed pass rate, so a single run does not decide"""
+    return (entry.get("passes", 0) + 1) / (entry.get("runs", 0) + 2)
+
+
+def choose_model(role: str, stats: dict, candidates: list, default: str, rng=random) -> str:
+    """
+    Pick a model for a role from recorded stats
+
+    Candidates with fewer than ROUTE_MIN_SAMPLES runs are explored with
+    probability ROUTE_EXPLORE. Otherwise the fastest candidate whose pass
+    rate is within ROUTE_PASS_TOLERANCE of the best one wins.
+
+    Args:
+        role: Agent role
+        stats: Recorded stats ({role: {model_id: entry}})
+        candidates: Model IDs to choose from
+        default: Model to use without enough data
+        rng: Random source (for exploration)
+
+    Returns:
+        Model ID
+    """
+    role_stats = stats.get(role, {})
+    sampled = {m: role_stats[m] for m in candidates
+               if role_stats.get(m, {}).get("runs", 0) >= ROUTE_MIN_SAMPLES and "latency" in role_stats[m]}
+    unexplored = [m for m in candidates if m not in sampled]
+    if unexplored and (not sampled or rng.random() < ROUTE_EXPLORE):
+        return default if default in unexplored else rng.choice(unexplored)
+    best_rate = max(_pass_rate(entry) for entry in sampled.values())
+    eligible = [m for m, entry in sampled.items() if _pass_rate(entry) >= best_rate - ROUTE_PASS_TOLERANCE]
+    return min(eligible, key=lambda m: sampled[m]["latency"])
+
+
+def validate_routing():
+    """
+    Check the routing settings before a run starts
+
+    Raises:
+        ValueError: If SOW_MODEL_ROUTES is malformed or SOW_MODEL_ROUTING is unknown
+    """
+    if ROUTES_ERROR:
+        raise ValueError(ROUTES_ERROR)
+    if MODEL_ROUTING not in ROUTING_MODES:
+        raise ValueError(f"Unknown SOW_MODEL_ROUTING {MODEL_ROUTING!r}; use one of {', '.join(ROUTING_MODES)}")
+
+
+def route_model(role: str) -> str:
+    """
+    Get the model ID an agent role should use
+
+    Args:
+        role: Agent role (e.g. "architect")
+
+    Returns:
+        Model ID from the routing table, or the adaptive choice with
+        SOW_MODEL_ROUTING=adaptive
+    """
+    default = ROUTES.get(role, LITE)
+    if MODEL_ROUTING == "static":
+        return default
+    validate_routing()
+    candidates = list(dict.fromkeys([default] + ROUTE_CANDIDATES))
+    with _stats_lock:
+        stats = _load_stats()
+    model_id = choose_model(role, stats, candidates, default)
+    log.info(f"Routing {role} to {model_id}")
+    return model_id
+
+
+class RouteRecorder:
+    """Collects one run's stage latencies per (role, model) and stores them with the run outcome"""
+
+    def __init__(self, path: str = ROUTE_STATS_FILE):
+        """
+        Initialize route recorder
+
+        Args:
+            path: Stats file shared across runs
+        """
+        self.path = path
+        self._latencies = {}
+
+    def observe(self, role: str, model_id: str, seconds: float):
+        """Record one stage call"""
+        if model_id:
+            self._latencies.setdefault((role, model_id), []).append(seconds)
+
+    def finish(self, passed: bool):
+        """
+        Merge this run into the stats file (every role/model used counts the run outcome)
+
+        Args:
+            passed: Whether the run passed QA
+        """
+        if not self._latencies:
+            return
+        try:
+            self._merge(passed)
+        except OSError as e:
+            log.warning(f"Could not save model routing stats: {e}")
+        self._latencies.clear()
+
+    def _merge(self, passed: bool):
+        """Re-read the stats file under the lock, add this run and write it back atomically"""
+        with _locked_stats(self.path):
+            stats = _load_stats(self.path)
+            for (role, model_id), latencies in self._latencies.items():
+                entry = stats.setdefault(role, {}).setdefault(model_id, {"runs": 0, "passes": 0, "calls": 0})
+                entry["runs"] += 1
+                entry["passes"] += int(passed)
+                entry["calls"] += len(latencies)
+                for seconds in latencies:
+                    previous = entry.get("latency")
+                    entry["latency"] = seconds if previous is None else (
+                        LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * previous
+                    )
+            write_files_atomically({self.path: json.dumps(stats, indent=2)})
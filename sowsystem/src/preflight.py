@@ -0,0 +1,187 @@
+"""
+Preflight - Deterministic checks run before the QA Judge.
+
+Responsibilities:
+- Detect attempts that left src/ identical to snapshot/
+- Byte-compile the changed Python files and run AST sanity checks
+- Validate changed JSON files
+- Report failures as machine-readable issues the Architect can act on,
+  without spending a QA Judge LLM call
+"""
+
+import ast
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+from workspace_index import get_workspace_index
+
+
+@dataclass
+class PreflightIssue:
+    """One problem found by a preflight check"""
+    code: str
+    path: str
+    message: str
+    line: Optional[int] = None
+
+
+@dataclass
+class PreflightResult:
+    """Outcome of all preflight checks"""
+    issues: List[PreflightIssue] = field(default_factory=list)
+    changed_files: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def to_dict(self) -> dict:
+        """Machine-readable report"""
+        return {
+            "stage": "preflight",
+            "ok": self.ok,
+            "issues": [asdict(issue) for issue in self.issues],
+            "changed_files": self.changed_files,
+        }
+
+    def to_json(self) -> str:
+        """Machine-readable report as JSON text (sent to the Architect on failure)"""
+        return json.dumps(self.to_dict(), indent=2)
+
+
+def _is_stub(node) -> bool:
+    """Whether a function body only contains a docstring, pass, ... or raise NotImplementedError"""
+    for stmt in node.body:
+        if isinstance(stmt, ast.Pass):
+            continue
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+            continue
+        if isinstance(stmt, ast.Raise) and stmt.exc is not None:
+            exc = stmt.exc.func if isinstance(stmt.exc, ast.Call) else stmt.exc
+            if isinstance(exc, ast.Name) and exc.id == "NotImplementedError":
+                continue
+        return False
+    return True
+
+
+# Bases and decorators of declarations whose bodies are meant to be stubs
+_INTERFACE_BASES = {"ABC", "Protocol"}
+_DECLARATION_DECORATORS = {"abstractmethod", "abstractproperty", "abstractclassmethod", "abstractstaticmethod",
+                           "overload"}
+
+
+def _name(node) -> str:
+    """Last component of a (possibly dotted or subscripted) name: typing.Protocol[T] -> Protocol"""
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return node.id if isinstance(node, ast.Name) else ""
+
+
+def _is_interface(node: ast.ClassDef) -> bool:
+    """Whether a class is an ABC or a Protocol"""
+    if any(_name(base) in _INTERFACE_BASES for base in node.bases):
+        return True
+    return any(kw.arg == "metaclass" and _name(kw.value) == "ABCMeta" for kw in node.keywords)
+
+
+def _implementations(node, in_interface: bool = False):
+    """Functions expected to have a body (not abstract, overload or interface declarations)"""
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, ast.ClassDef):
+            yield from _implementations(child, _is_interface(child))
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            declared = any(_name(d) in _DECLARATION_DECORATORS for d in child.decorator_list)
+            if not in_interface and not declared:
+                yield child
+            yield from _implementations(child)
+        else:
+            yield from _implementations(child, in_interface)
+
+
+def check_python(path: str, source: str) -> List[PreflightIssue]:
+    """
+    Byte-compile a Python file and run AST sanity checks
+
+    Stub files (.pyi) are only compiled and checked for duplicates.
+
+    Args:
+        path: File path (for reporting)
+        source: File contents
+
+    Returns:
+        Issues found (empty if the file looks sane)
+    """
+    try:
+        compile(source, path, "exec", dont_inherit=True)
+        tree = ast.parse(source, path)
+    except SyntaxError as e:
+        return [PreflightIssue("SYNTAX_ERROR", path, f"{e.msg}", e.lineno)]
+    except ValueError as e:
+        return [PreflightIssue("SYNTAX_ERROR", path, str(e))]
+
+    issues = []
+    seen = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name in seen and not node.decorator_list:
+                issues.append(PreflightIssue(
+                    "DUPLICATE_DEFINITION", path,
+                    f"{node.name} is defined again (first at line {seen[node.name]})", node.lineno,
+                ))
+            seen[node.name] = node.lineno
+    # ABCs, Protocols, @abstractmethod and @overload declarations are legitimately empty
+    functions = list(_implementations(tree))
+    if functions and not path.endswith(".pyi") and all(_is_stub(fn) for fn in functions):
+        issues.append(PreflightIssue("PLACEHOLDER_ONLY", path, "every function is a stub (pass / ... / NotImplementedError)"))
+    return issues
+
+
+def run_preflight(src_dir: str = "src", snapshot_dir: str = "snapshot") -> PreflightResult:
+    """
+    Run all preflight checks on the files that differ from the snapshot
+
+    Args:
+        src_dir: Directory the Artisan writes to
+        snapshot_dir: Read-only copy of src taken before the run
+
+    Returns:
+        PreflightResult (ok when nothing blocks sending the code to QA)
+    """
+    src_index = get_workspace_index(src_dir)
+    src_index.refresh()
+    current = src_index.snapshot()
+
+    if os.path.isdir(snapshot_dir):
+        snapshot_index = get_workspace_index(snapshot_dir)
+        snapshot_index.refresh()
+        baseline = snapshot_index.snapshot()
+    else:
+        baseline = {}
+
+    changed = sorted(rel for rel, digest in current.items() if baseline.get(rel) != digest)
+    result = PreflightResult(changed_files=[os.path.join(src_dir, rel) for rel in changed])
+    if baseline and not changed and set(current) == set(baseline):
+        result.issues.append(PreflightIssue("NO_CHANGES", src_dir, "src/ is identical to snapshot/; nothing was implemented"))
+        return result
+
+    for rel in changed:
+        path = os.path.join(src_dir, rel)
+        text = src_index.read_text(rel)
+        if not text.strip():
+            if os.path.basename(rel) != "__init__.py":
+                result.issues.append(PreflightIssue("EMPTY_FILE", path, "file is empty"))
+            continue
+        if rel.endswith((".py", ".pyi")):
+            result.issues.extend(check_python(path, text))
+        elif rel.endswith(".json"):
+            try:
+                json.loads(text)
+            except ValueError as e:
+                result.issues.append(PreflightIssue("INVALID_JSON", path, str(e), getattr(e, "lineno", None)))
+    return result
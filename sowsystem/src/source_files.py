@@ -0,0 +1,145 @@
+"""
+Source Files - Language selection, binary detection and large-file reading.
+
+Responsibilities:
+- Map language names to file extensions (configurable per call or via env)
+- Detect binary files by sniffing their first bytes
+- Read large files through mmap, returning only a head and a tail slice
+"""
+
+import mmap
+import os
+
+LANGUAGE_EXTENSIONS = {
+    "python": (".py", ".pyi"),
+    "typescript": (".ts", ".tsx", ".mts", ".cts"),
+    "javascript": (".js", ".jsx", ".mjs", ".cjs"),
+    "go": (".go",),
+    "java": (".java",),
+    "kotlin": (".kt", ".kts"),
+    "rust": (".rs",),
+    "ruby": (".rb",),
+    "php": (".php",),
+    "csharp": (".cs",),
+    "c": (".c", ".h"),
+    "cpp": (".cc", ".cpp", ".cxx", ".hpp", ".hh"),
+    "swift": (".swift",),
+    "shell": (".sh", ".bash"),
+    "sql": (".sql",),
+}
+
+# Languages read when a tool call does not name any ("all" = every language above)
+DEFAULT_LANGUAGES = os.getenv("SOW_SOURCE_LANGUAGES", "all")
+
+# Bytes sniffed to decide whether a file is binary
+SNIFF_BYTES = 8192
+
+# Files above this size are read through mmap as head/tail slices
+LARGE_FILE_BYTES = int(os.getenv("SOW_LARGE_FILE_BYTES", str(256 * 1024)))
+
+_TEXT_CONTROL = {7, 8, 9, 10, 12, 13, 27}
+
+
+def resolve_extensions(languages: str = "", extensions: str = "") -> tuple:
+    """
+    Build the set of file extensions to read
+
+    Args:
+        languages: Comma-separated language names, or "all" (default: SOW_SOURCE_LANGUAGES)
+        extensions: Comma-separated extra extensions (e.g. ".vue,.svelte")
+
+    Returns:
+        Tuple of extensions
+
+    Raises:
+        ValueError: If a language name is unknown
+    """
+    names = [name.strip().lower() for name in (languages or DEFAULT_LANGUAGES).split(",") if name.strip()]
+    selected = set()
+    for name in names:
+        if name == "all":
+            for exts in LANGUAGE_EXTENSIONS.values():
+                selected.update(exts)
+        elif name in LANGUAGE_EXTENSIONS:
+            selected.update(LANGUAGE_EXTENSIONS[name])
+        else:
+            raise ValueError(f"Unknown language {name!r}; known: {', '.join(sorted(LANGUAGE_EXTENSIONS))}, all")
+    for ext in extensions.split(","):
+        ext = ext.strip()
+        if ext:
+            selected.add(ext if ext.startswith(".") else f".{ext}")
+    return tuple(sorted(selected))
+
+
+def is_binary(head: bytes) -> bool:
+    """
+    Guess whether content is binary from its first bytes
+
+    Args:
+        head: First bytes of the file (SNIFF_BYTES is plenty)
+
+    Returns:
+        True for NUL bytes, undecodable UTF-8 or mostly control characters
+    """
+    if not head:
+        return False
+    if b"\0" in head:
+        return True
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the sniff boundary is fine
+        if e.start < len(head) - 3:
+            return True
+    control = sum(1 for byte in head if byte < 32 and byte not in _TEXT_CONTROL)
+    return control / len(head) > 0.3
+
+
+def is_binary_file(path: str) -> bool:
+    """Sniff the first bytes of a file on disk"""
+    with open(path, 'rb') as f:
+        return is_binary(f.read(SNIFF_BYTES))
+
+
+def head_tail_text(buf, limit: int) -> str:
+    """
+    Decode a buffer, keeping only its head and tail when it exceeds limit
+
+    Args:
+        buf: bytes or mmap
+        limit: Maximum bytes kept (split evenly between head and tail)
+
+    Returns:
+        Text, with the omitted middle replaced by a marker line
+    """
+    size = len(buf)
+    if size <= limit:
+        return bytes(buf[:]).decode("utf-8", errors="replace")
+    half = max(limit // 2, 1)
+    head = bytes(buf[:half]).decode("utf-8", errors="ignore")
+    tail = bytes(buf[size - half:]).decode("utf-8", errors="ignore")
+    # Cut on line boundaries so no partial lines are shown
+    if "\n" in head:
+        head = head[:head.rindex("\n")]
+    if "\n" in tail:
+        tail = tail[tail.index("\n") + 1:]
+    omitted = size - len(head.encode("utf-8")) - len(tail.encode("utf-8"))
+    return f"{head}\n... [{omitted} bytes omitted of {size}] ...\n{tail}"
+
+
+def read_large_file(path: str, limit: int) -> str:
+    """
+    Read a head and tail slice of a large file without loading all of it
+
+    Args:
+        path: File path
+        limit: Maximum bytes kept
+
+    Returns:
+        Text as produced by head_tail_text
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return head_tail_text(mapped, limit)
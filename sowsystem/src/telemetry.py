@@ -0,0 +1,291 @@
+"""
+Telemetry - OpenTelemetry spans for runs, stages, model calls and tool calls.
+
+Responsibilities:
+- Configure a tracer provider with an OTLP or JSON-lines file exporter
+  (SOW_OTEL_EXPORTER), or reuse the one installed by the ADOT distro
+- Provide span helpers for runs, attempts and agent stages
+- Trace model calls (time to first token, latency, tokens, payload bytes)
+  through a model wrapper, and tool calls through strands hooks
+- Degrade to no-ops when tracing is disabled or OpenTelemetry is missing
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # Tracing is optional
+    trace = None
+
+try:
+    from strands.hooks import AfterToolCallEvent, BeforeToolCallEvent, HookProvider
+except ImportError:  # Older strands without hooks: tool calls are not traced
+    HookProvider = None
+
+from strands.models.model import Model
+
+log = logging.getLogger(__name__)
+
+# none = spans only if a provider is already installed (e.g. ADOT), otlp, file or console
+OTEL_EXPORTER = os.getenv("SOW_OTEL_EXPORTER", "none").lower()
+OTEL_FILE = os.getenv("SOW_OTEL_FILE", "sow_traces.jsonl")
+
+TRACER_NAME = "sowsystem"
+
+_setup_lock = threading.Lock()
+_provider = None
+_configured = False
+
+
+class JsonLinesSpanExporter:
+    """Span exporter that appends one JSON object per finished span to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+        try:
+            lines = [json.dumps(json.loads(span.to_json(indent=None))) + "\n" for span in spans]
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+            return SpanExportResult.SUCCESS
+        except OSError as e:
+            log.warning(f"Could not write spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self):
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def _build_exporter(kind: str):
+    """Create the span exporter selected by SOW_OTEL_EXPORTER"""
+    if kind == "otlp":
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if kind == "file":
+        return JsonLinesSpanExporter(os.path.abspath(OTEL_FILE))
+    if kind == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown SOW_OTEL_EXPORTER {kind!r}; use none, otlp, file or console")
+
+
+def setup_tracing() -> bool:
+    """
+    Configure tracing once per process
+
+    Adds the exporter selected by SOW_OTEL_EXPORTER to the global tracer
+    provider, creating an SDK provider if none is installed yet.
+
+    Returns:
+        True if spans are recorded
+    """
+    global _provider, _configured
+    if trace is None:
+        return False
+    with _setup_lock:
+        if _configured:
+            return tracing_enabled()
+        _configured = True
+        if OTEL_EXPORTER == "none":
+            return tracing_enabled()
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            provider = trace.get_tracer_provider()
+            if not isinstance(provider, TracerProvider):
+                provider = TracerProvider(resource=Resource.create({"service.name": "sow-agent"}))
+                trace.set_tracer_provider(provider)
+            provider.add_span_processor(BatchSpanProcessor(_build_exporter(OTEL_EXPORTER)))
+            _provider = provider
+        except Exception as e:
+            log.warning(f"Tracing disabled: could not set up the {OTEL_EXPORTER} exporter: {e}")
+    return tracing_enabled()
+
+
+def tracing_enabled() -> bool:
+    """Whether a recording tracer provider is installed"""
+    if trace is None:
+        return False
+    provider = trace.get_tracer_provider()
+    return type(provider).__name__ not in ("ProxyTracerProvider", "NoOpTracerProvider")
+
+
+def flush_tracing():
+    """Export buffered spans (call at the end of a run)"""
+    provider = _provider or (trace.get_tracer_provider() if trace is not None else None)
+    if hasattr(provider, "force_flush"):
+        try:
+            provider.force_flush()
+        except Exception as e:
+            log.warning(f"Could not flush spans: {e}")
+
+
+def _tracer():
+    return trace.get_tracer(TRACER_NAME)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a span around a block, as the current span
+
+    Args:
+        name: Span name (e.g. "sow.stage")
+        **attributes: Span attributes (None values are skipped)
+
+    Yields:
+        The span (or None when tracing is off); use set_attributes on it
+    """
+    if trace is None:
+        yield None
+        return
+    with _tracer().start_as_current_span(name) as current:
+        set_attributes(current, **attributes)
+        yield current
+
+
+def set_attributes(current, **attributes):
+    """Set attributes on a span, ignoring None spans and None values"""
+    if current is None:
+        return
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def _payload_bytes(value) -> int:
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+class TracingModel(Model):
+    """Model wrapper that records one span per model call"""
+
+    def __init__(self, model: Model):
+        """
+        Initialize tracing model
+
+        Args:
+            model: Model to wrap
+        """
+        self.model = model
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self):
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        config = self.model.get_config() or {}
+        # Started without becoming current: the stream is resumed from other contexts
+        current = _tracer().start_span("llm.stream")
+        set_attributes(
+            current,
+            **{
+                "gen_ai.request.model": config.get("model_id"),
+                "sow.request_bytes": _payload_bytes(messages) + len((system_prompt or "").encode("utf-8")),
+                "sow.message_count": len(messages),
+                "sow.tool_count": len(tool_specs or []),
+            },
+        )
+        start = time.perf_counter()
+        first_token = None
+        response_bytes = 0
+        try:
+            async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+                delta = event.get("contentBlockDelta", {}).get("delta") if isinstance(event, dict) else None
+                if delta:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        current.set_attribute("sow.ttft_ms", round((first_token - start) * 1000, 1))
+                    response_bytes += len(delta.get("text", "").encode("utf-8"))
+                    response_bytes += len(delta.get("toolUse", {}).get("input", "").encode("utf-8"))
+                if isinstance(event, dict) and "metadata" in event:
+                    usage = event["metadata"].get("usage", {})
+                    set_attributes(
+                        current,
+                        **{
+                            "gen_ai.usage.input_tokens": usage.get("inputTokens"),
+                            "gen_ai.usage.output_tokens": usage.get("outputTokens"),
+                        },
+                    )
+                yield event
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller stopped reading (early close or task cancellation): not a model error
+            current.set_attribute("sow.cancelled", True)
+            raise
+        except Exception as e:
+            current.record_exception(e)
+            current.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            set_attributes(current, **{
+                "sow.latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                "sow.response_bytes": response_bytes,
+            })
+            current.end()
+
+
+if HookProvider is not None:
+    class ToolSpanHooks(HookProvider):
+        """Strands hooks that record one span per tool call"""
+
+        def __init__(self):
+            self._spans = {}
+            self._lock = threading.Lock()
+
+        def register_hooks(self, registry, **kwargs):
+            registry.add_callback(BeforeToolCallEvent, self._before)
+            registry.add_callback(AfterToolCallEvent, self._after)
+
+        def _before(self, event):
+            tool_use = event.tool_use
+            current = _tracer().start_span("tool.call")
+            set_attributes(current, **{
+                "sow.tool.name": tool_use.get("name"),
+                "sow.request_bytes": _payload_bytes(tool_use.get("input", {})),
+            })
+            with self._lock:
+                self._spans[tool_use.get("toolUseId")] = (current, time.perf_counter())
+
+        def _after(self, event):
+            with self._lock:
+                started = self._spans.pop(event.tool_use.get("toolUseId"), None)
+            if started is None:
+                return
+            current, start = started
+            result = event.result or {}
+            set_attributes(current, **{
+                "sow.tool.status": result.get("status"),
+                "sow.response_bytes": _payload_bytes(result.get("content", [])),
+                "sow.latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            })
+            if result.get("status") == "error":
+                current.set_status(Status(StatusCode.ERROR))
+            current.end()
+
+
+def tool_tracing_hooks() -> list:
+    """Hooks to pass to an Agent so its tool calls are traced ([] when tracing is off)"""
+    if HookProvider is None or not tracing_enabled():
+        return []
+    return [ToolSpanHooks()]
@@ -0,0 +1,212 @@
+"""
+Test Runner - Resource-limited pytest runs with results cached by source tree hash.
+
+Responsibilities:
+- Run the project's pytest suite in a subprocess with a capped timeout,
+  resource limits (CPU, memory, file size) and a scrubbed environment
+  (this limits runaway tests; it is not an isolation boundary)
+- Use pytest-xdist workers when requested and installed
+- Cache results on disk keyed by the content hash of the tree, so an
+  unchanged tree is never tested twice across retries or runs
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from atomic_write import write_files_atomically
+from workspace_index import WorkspaceIndex
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; limits are skipped there
+    resource = None
+
+log = logging.getLogger(__name__)
+
+# Shared on-disk cache for the agent (test results, LLM responses, ...)
+CACHE_DIR = os.path.expanduser(os.getenv("SOW_CACHE_DIR", "~/.cache/sow-agent"))
+
+# Limits for a test run
+TEST_TIMEOUT_SECONDS = int(os.getenv("SOW_TEST_TIMEOUT_SECONDS", "300"))
+# Upper bound for a caller-supplied timeout
+TEST_MAX_TIMEOUT_SECONDS = int(os.getenv("SOW_TEST_MAX_TIMEOUT_SECONDS", str(TEST_TIMEOUT_SECONDS)))
+TEST_MEMORY_BYTES = int(os.getenv("SOW_TEST_MEMORY_BYTES", str(2 * 1024 ** 3)))
+TEST_FILE_BYTES = int(os.getenv("SOW_TEST_FILE_BYTES", str(256 * 1024 ** 2)))
+
+# Output kept per result (the end of the pytest output, where the summary is)
+TEST_OUTPUT_CHARS = int(os.getenv("SOW_TEST_OUTPUT_CHARS", "12000"))
+
+# Environment variables passed through to the tests; everything else
+# (AWS credentials, API keys, tokens) is dropped
+_ENV_ALLOWLIST = ("PATH", "HOME", "LANG", "LC_ALL", "TMPDIR", "TZ", "VIRTUAL_ENV")
+
+_EXIT_STATUS = {0: "passed", 1: "failed", 2: "interrupted", 3: "error", 4: "usage_error", 5: "no_tests"}
+
+# Indexes of every file (gitignored ones too) of recently tested trees, most recent last
+TREE_INDEXES_MAX = 8
+_tree_indexes = OrderedDict()
+_tree_indexes_lock = threading.Lock()
+
+
+def tree_hash(directory: str) -> str:
+    """
+    Hash the content of every file in a directory
+
+    Gitignored files are included: the tests can read them (fixtures,
+    generated data, local config), so editing one must change the hash.
+
+    Args:
+        directory: Directory to hash (uses an incremental index, so unchanged
+                   files are not re-read)
+
+    Returns:
+        Hex digest that changes whenever any file is added, removed or edited
+    """
+    key = os.path.realpath(directory)
+    with _tree_indexes_lock:
+        index = _tree_indexes.pop(key, None) or WorkspaceIndex(directory, use_gitignore=False)
+        _tree_indexes[key] = index
+        while len(_tree_indexes) > TREE_INDEXES_MAX:
+            _tree_indexes.popitem(last=False)
+    index.refresh()
+    h = hashlib.sha256()
+    for rel, digest in sorted(index.snapshot().items()):
+        h.update(f"{rel}\0{digest}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+# Applies the rlimits given as JSON in argv[1], then execs argv[2:]. Runs in
+# the child itself, so no Python code executes between fork and exec in the
+# (threaded) agent process.
+_LIMIT_WRAPPER = """\
+import json, os, resource, sys
+for name, value in json.loads(sys.argv[1]):
+    limit = getattr(resource, name)
+    try:
+        _, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(limit, (value, hard))
+    except (ValueError, OSError):
+        pass
+os.execv(sys.argv[2], sys.argv[2:])
+"""
+
+
+def _limited_command(command: list, timeout: int) -> list:
+    """Wrap a command so it starts with CPU, memory, file size and core rlimits"""
+    if resource is None:
+        return command
+    limits = [
+        ("RLIMIT_CPU", timeout + 5),
+        ("RLIMIT_AS", TEST_MEMORY_BYTES),
+        ("RLIMIT_FSIZE", TEST_FILE_BYTES),
+        ("RLIMIT_CORE", 0),
+    ]
+    return [sys.executable, "-c", _LIMIT_WRAPPER, json.dumps(limits), *command]
+
+
+def _test_env(directory: str) -> dict:
+    """Minimal environment for the test subprocess"""
+    env = {key: os.environ[key] for key in _ENV_ALLOWLIST if key in os.environ}
+    env["PYTHONPATH"] = os.path.abspath(directory)
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    env["PYTHONHASHSEED"] = "0"
+    return env
+
+
+def _summary_line(output: str) -> str:
+    """The final "N passed, M failed in Xs" line of pytest output"""
+    for line in reversed(output.splitlines()):
+        line = line.strip("= ").strip()
+        if line:
+            return line
+    return ""
+
+
+def run_pytest(directory: str = "src", args=(), timeout: int = TEST_TIMEOUT_SECONDS, workers: int = 0,
+               use_cache: bool = True) -> dict:
+    """
+    Run pytest in a directory, or return the cached result for the same tree
+
+    Args:
+        directory: Directory to run pytest in (it is also put on PYTHONPATH)
+        args: Extra pytest arguments (test paths, -k expressions)
+        timeout: Wall-clock limit in seconds (capped at TEST_MAX_TIMEOUT_SECONDS)
+        workers: Number of pytest-xdist workers (0 = no xdist)
+        use_cache: Look up and store results in the on-disk cache
+
+    Returns:
+        Dict with status, exit_code, summary, output (tail), duration,
+        tree_hash and cached
+    """
+    args = [str(arg) for arg in args]
+    timeout = max(1, min(int(timeout), TEST_MAX_TIMEOUT_SECONDS))
+    parallel = workers > 1 and importlib.util.find_spec("xdist") is not None
+    if workers > 1 and not parallel:
+        log.info("pytest-xdist is not installed; running tests serially")
+
+    digest = tree_hash(directory)
+    key = hashlib.sha256(json.dumps(
+        [digest, args, parallel, sys.version_info[:2]], sort_keys=True
+    ).encode("utf-8")).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, "tests", f"{key}.json")
+    if use_cache and os.path.isfile(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            result["cached"] = True
+            return result
+        except (OSError, ValueError):
+            pass
+
+    command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--color=no", *args]
+    if parallel:
+        command += ["-n", str(workers)]
+
+    start = time.monotonic()
+    process = subprocess.Popen(
+        _limited_command(command, timeout), cwd=directory, env=_test_env(directory),
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        start_new_session=True,
+    )
+    try:
+        output, _ = process.communicate(timeout=timeout)
+        exit_code = process.returncode
+        status = _EXIT_STATUS.get(exit_code, "error")
+    except subprocess.TimeoutExpired:
+        # Kill the whole process group so xdist workers and spawned servers die too
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+        output, _ = process.communicate()
+        exit_code = None
+        status = "timeout"
+    output = output.decode("utf-8", errors="replace")
+
+    result = {
+        "status": status,
+        "exit_code": exit_code,
+        "summary": f"timed out after {timeout}s" if status == "timeout" else _summary_line(output),
+        "output": output[-TEST_OUTPUT_CHARS:],
+        "duration": round(time.monotonic() - start, 2),
+        "tree_hash": digest,
+        "cached": False,
+    }
+    # Only deterministic outcomes are worth replaying
+    if use_cache and status in ("passed", "failed", "no_tests"):
+        try:
+            write_files_atomically({cache_path: json.dumps(result)})
+        except OSError as e:
+            log.warning(f"Could not cache test result: {e}")
+    return result
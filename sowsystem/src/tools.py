@@ -1,14 +1,55 @@
+import ast
+import io
 import os
+import re
+import tokenize
+from itertools import islice
 from strands import tool
-from typing import List
+from typing import Dict, List
+from atomic_write import write_files_atomically
+from code_edit import EditError, replace_text, resolve_unified_diff
+from code_outline import build_outlines
+from code_search import get_search_index, reindex_written_file
+from context_budget import get_output_store
+from file_walker import iter_project_files
+from test_runner import TEST_TIMEOUT_SECONDS, run_pytest
+from source_files import (
+    LARGE_FILE_BYTES, SNIFF_BYTES, head_tail_text, is_binary, is_binary_file, read_large_file,
+    resolve_extensions,
+)
+from workspace_context import current_root, detach_tree, resolve_path
+from workspace_index import get_workspace_index, mark_file_changed
+
+# read_source_code page limits (roughly 4 bytes per token)
+READ_PAGE_BYTES = int(os.getenv("SOW_READ_PAGE_BYTES", "60000"))
+READ_FILE_BYTES = int(os.getenv("SOW_READ_FILE_BYTES", "20000"))
 
 
 @tool
-def list_project_files() -> List[str]:
-    """List all files in the current directory"""
+def list_project_files(directory: str = ".", max_depth: int = 10, max_files: int = 500) -> List[str]:
+    """
+    List project files recursively with their sizes, skipping .gitignore'd paths.
+
+    Use this to see the project tree and plan which files to read. Files of a
+    directory are listed before its subdirectories.
+
+    Args:
+        directory: Directory to list
+        max_depth: Deepest subdirectory level to enter (0 = only this directory)
+        max_files: Maximum number of files to return
+    """
     try:
-        files = os.listdir('.')
-        return [f for f in files if os.path.isfile(f)]
+        root = resolve_path(directory or ".")
+        if not os.path.isdir(root):
+            return [f"Error: Directory {directory} does not exist"]
+        listing = []
+        walker = iter_project_files(root, max_depth=max_depth)
+        for rel, entry in islice(walker, max_files):
+            path = rel if directory in (".", "") else os.path.join(directory, rel)
+            listing.append(f"{path} ({entry.stat(follow_symlinks=False).st_size} bytes)")
+        if next(walker, None) is not None:
+            listing.append(f"... more files not listed (max_files={max_files}); list a subdirectory to see them")
+        return listing
     except Exception as e:
         return [f"Error listing files: {str(e)}"]
 
@@ -17,7 +58,7 @@ def list_project_files() -> List[str]:
 def read_sow_file() -> str:
     """Read the content of sow_reference.md file"""
     try:
-        with open('sow_reference.md', 'r') as f:
+        with open(resolve_path('sow_reference.md'), 'r') as f:
             return f.read()
     except FileNotFoundError:
         return "Error: sow_reference.md file not found"
@@ -25,44 +66,403 @@ def read_sow_file() -> str:
         return f"Error reading file: {str(e)}"
 
 
+def _on_own_lines(lines: List[str], node) -> bool:
+    """Whether a statement is the only code on the lines it spans (trailing comments allowed)"""
+    # AST column offsets count UTF-8 bytes
+    before = lines[node.lineno - 1].encode("utf-8")[:node.col_offset]
+    after = lines[node.end_lineno - 1].encode("utf-8")[node.end_col_offset:].strip()
+    return not before.strip() and (not after or after.startswith(b"#"))
+
+
+def _strip_comments_and_docstrings(source: str) -> str:
+    """Remove comments, docstrings and blank lines from Python source"""
+    try:
+        tree = ast.parse(source)
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (SyntaxError, tokenize.TokenError):
+        return source
+
+    lines = source.splitlines()
+    drop = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            doc = body[0]
+            if not _on_own_lines(lines, doc):
+                # e.g. `def f(): """doc"""`: blanking the line would drop the def too
+                continue
+            if len(body) == 1:
+                # Keep the block syntactically valid
+                lines[doc.lineno - 1] = " " * doc.col_offset + "..."
+                drop.update(range(doc.lineno, doc.end_lineno))
+            else:
+                drop.update(range(doc.lineno - 1, doc.end_lineno))
+
+    for tok in tokens:
+        if tok.type == tokenize.COMMENT:
+            row, col = tok.start
+            lines[row - 1] = lines[row - 1][:col].rstrip()
+
+    return "\n".join(line for i, line in enumerate(lines) if i not in drop and line.strip())
+
+
+def _render_page(directory: str, filepaths: List[str], cursor: int, max_bytes: int, render) -> str:
+    """
+    Render files into one page bounded by a byte budget
+
+    Args:
+        directory: Directory the relative file paths belong to
+        filepaths: Sorted relative paths
+        cursor: Index of the first file on the page
+        max_bytes: Byte budget for the page
+        render: Callable mapping a relative path to the text shown for it
+
+    Returns:
+        Page text ending with a NEXT CURSOR or END marker
+    """
+    result = []
+    used = 0
+    position = cursor
+    while position < len(filepaths):
+        filepath = filepaths[position]
+        entry = f"=== {os.path.join(directory, filepath)} ===\n{render(filepath)}\n"
+        size = len(entry.encode("utf-8"))
+        if result and used + size > max_bytes:
+            break
+        result.append(entry)
+        used += size
+        position += 1
+    
+    if position < len(filepaths):
+        result.append(f"--- files {cursor + 1}-{position} of {len(filepaths)}; NEXT CURSOR: {position} ---")
+    else:
+        result.append(f"--- files {cursor + 1}-{position} of {len(filepaths)}; END ---")
+    return "\n".join(result)
+
+
 @tool
-def read_source_code(directory: str = "src") -> str:
-    """Read all Python files in the specified directory"""
+def read_source_code(directory: str = "src", cursor: int = 0, max_bytes: int = READ_PAGE_BYTES,
+                     max_file_bytes: int = READ_FILE_BYTES, compact: bool = False,
+                     languages: str = "", extensions: str = "") -> str:
+    """
+    Read source files in the specified directory, one bounded page at a time.
+
+    Files are returned in sorted path order. When more files remain, the page
+    ends with "NEXT CURSOR: <n>"; call again with cursor=<n> to read on.
+    Binary files are skipped; files over max_file_bytes show only their
+    beginning and end.
+
+    Args:
+        directory: Directory to read
+        cursor: Index of the first file to return (0 for the first page)
+        max_bytes: Byte budget for the whole page (about 4 bytes per token)
+        max_file_bytes: Maximum bytes per file; the middle of longer files is omitted
+        compact: Strip comments, docstrings and blank lines from Python files
+        languages: Comma-separated languages to read, e.g. "python,typescript,go" (default: all)
+        extensions: Comma-separated extra file extensions to read, e.g. ".vue,.graphql"
+    """
     try:
-        code_files = {}
+        directory = resolve_path(directory)
         if not os.path.exists(directory):
             return f"Error: Directory {directory} does not exist"
         
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if file.endswith('.py'):
-                    filepath = os.path.join(root, file)
-                    with open(filepath, 'r') as f:
-                        code_files[filepath] = f.read()
+        suffixes = resolve_extensions(languages, extensions)
+        index = get_workspace_index(directory)
+        index.refresh()
+        filepaths = index.files(suffixes=suffixes)
         
-        if not code_files:
-            return f"No Python files found in {directory}"
+        if not filepaths:
+            return f"No source files ({', '.join(suffixes)}) found in {directory}"
+        if cursor < 0 or cursor >= len(filepaths):
+            return f"Error: cursor {cursor} is out of range (0-{len(filepaths) - 1})"
         
-        result = []
-        for filepath, content in code_files.items():
-            result.append(f"=== {filepath} ===\n{content}\n")
-        
-        return "\n".join(result)
+        max_file_bytes = min(max_file_bytes, max_bytes)
+
+        def render(filepath):
+            size = index.entry(filepath)["size"]
+            if size > LARGE_FILE_BYTES:
+                # Never pull large files into memory or the content cache
+                path = os.path.join(directory, filepath)
+                if is_binary_file(path):
+                    return f"(binary file, {size} bytes, skipped)"
+                return read_large_file(path, max_file_bytes)
+            data = index.read_bytes(filepath)
+            if is_binary(data[:SNIFF_BYTES]):
+                return f"(binary file, {size} bytes, skipped)"
+            if compact and filepath.endswith('.py'):
+                data = _strip_comments_and_docstrings(data.decode("utf-8", errors="replace")).encode("utf-8")
+            return head_tail_text(data, max_file_bytes)
+
+        return _render_page(directory, filepaths, cursor, max_bytes, render)
+    except ValueError as e:
+        return f"Error: {str(e)}"
     except Exception as e:
         return f"Error reading source code: {str(e)}"
 
 
+@tool
+def outline_source_code(directory: str = "src", cursor: int = 0, max_bytes: int = READ_PAGE_BYTES) -> str:
+    """
+    Get a compact structural outline of the Python files in a directory.
+
+    For each file: module docstring, imports, constants, classes and
+    functions with their signatures and the first line of their docstrings.
+    Much smaller than read_source_code; use it to learn what exists, then
+    read_source_code only where details matter. Paged like read_source_code.
+
+    Args:
+        directory: Directory to outline
+        cursor: Index of the first file to return (0 for the first page)
+        max_bytes: Byte budget for the whole page
+    """
+    try:
+        directory = resolve_path(directory)
+        if not os.path.exists(directory):
+            return f"Error: Directory {directory} does not exist"
+        
+        index = get_workspace_index(directory)
+        index.refresh()
+        filepaths = index.files(suffixes=('.py',))
+        
+        if not filepaths:
+            return f"No Python files found in {directory}"
+        if cursor < 0 or cursor >= len(filepaths):
+            return f"Error: cursor {cursor} is out of range (0-{len(filepaths) - 1})"
+        
+        hashes = {filepath: index.hash_of(filepath) for filepath in filepaths}
+        outlines = build_outlines({
+            digest: (lambda filepath=filepath: index.read_text(filepath))
+            for filepath, digest in hashes.items()
+        })
+        return _render_page(directory, filepaths, cursor, max_bytes,
+                            lambda filepath: outlines[hashes[filepath]])
+    except Exception as e:
+        return f"Error outlining source code: {str(e)}"
+
+
+@tool
+def fetch_full_output(ref: str, offset: int = 0, max_chars: int = 20000) -> str:
+    """
+    Fetch the full text behind a digest that was shortened to fit the prompt.
+
+    Digests end their omitted section with a reference such as
+    fetch_full_output(ref="bridge-1a2b3c4d5e"). Long texts are returned in
+    pages; call again with the NEXT OFFSET value to continue.
+
+    Args:
+        ref: Reference named in the digest
+        offset: Character offset to start from
+        max_chars: Maximum characters to return
+    """
+    text = get_output_store().get(ref)
+    if text is None:
+        return f"Error: unknown or expired reference {ref}"
+    chunk = text[offset:offset + max_chars]
+    end = offset + len(chunk)
+    if end < len(text):
+        return f"{chunk}\n--- chars {offset}-{end} of {len(text)}; NEXT OFFSET: {end} ---"
+    return f"{chunk}\n--- chars {offset}-{end} of {len(text)}; END ---"
+
+
+@tool
+def search_code(pattern: str, path_glob: str = "*", directory: str = "src", ignore_case: bool = False,
+                max_results: int = 30, context_lines: int = 2) -> str:
+    """
+    Search the code for a regular expression using a trigram index.
+
+    Returns matching lines with surrounding context, files with the most
+    matches first. Use this to find the relevant spots instead of reading
+    every file.
+
+    Args:
+        pattern: Python regular expression (e.g. "def handle_\\w+" or "X-Frame-Options")
+        path_glob: Glob on the path relative to directory (e.g. "*.py", "api/*")
+        directory: Directory to search
+        ignore_case: Match case-insensitively
+        max_results: Maximum number of matching lines to return
+        context_lines: Lines of context around each match
+    """
+    try:
+        directory = resolve_path(directory)
+        if not os.path.exists(directory):
+            return f"Error: Directory {directory} does not exist"
+        return get_search_index(directory).search(pattern, path_glob, ignore_case, max_results, context_lines)
+    except re.error as e:
+        return f"Error: invalid regular expression {pattern!r}: {e}"
+    except Exception as e:
+        return f"Error searching code: {str(e)}"
+
+
+@tool
+def run_tests(test_path: str = "", keyword: str = "", directory: str = "src",
+              timeout_seconds: int = TEST_TIMEOUT_SECONDS, workers: int = 0) -> str:
+    """
+    Run the project's pytest suite and report the result.
+
+    Tests run in a subprocess with a timeout, CPU/memory limits and no
+    credentials in the environment. Results are cached by the content hash
+    of the directory, so re-running on an unchanged tree is instant.
+
+    Args:
+        test_path: Test file or directory relative to directory (default: whole suite)
+        keyword: pytest -k expression to select tests (e.g. "auth and not slow")
+        directory: Directory to run pytest in
+        timeout_seconds: Wall-clock limit for the run (capped by SOW_TEST_MAX_TIMEOUT_SECONDS)
+        workers: Parallel pytest-xdist workers (0 = serial; ignored if xdist is not installed)
+    """
+    try:
+        directory = resolve_path(directory)
+        if not os.path.isdir(directory):
+            return f"Error: Directory {directory} does not exist"
+        if current_root() is not None:
+            # Test code may write files in place; keep that out of the branch's parent
+            detach_tree(directory)
+        args = [test_path] if test_path else []
+        if keyword:
+            args += ["-k", keyword]
+        result = run_pytest(directory, args, timeout_seconds, workers)
+        cached = " (cached result for unchanged tree)" if result["cached"] else ""
+        return (f"STATUS: {result['status'].upper()}{cached}\n"
+                f"SUMMARY: {result['summary']}\n"
+                f"DURATION: {result['duration']}s\n\n"
+                f"{result['output']}")
+    except Exception as e:
+        return f"Error running tests: {str(e)}"
+
+
+def _write_files(files: Dict[str, str]) -> List[dict]:
+    """Write files atomically as one batch and update the code indexes"""
+    files = {resolve_path(filename): content for filename, content in files.items()}
+    results = write_files_atomically(files)
+    for filename in files:
+        mark_file_changed(filename)
+        reindex_written_file(filename)
+    return results
+
+
+def _write_file(filename: str, content: str):
+    """Atomically write a single file, creating parent directories"""
+    _write_files({filename: content})
+
+
+def _remove_file(filename: str):
+    """Delete a file and update the code indexes"""
+    filename = resolve_path(filename)
+    os.remove(filename)
+    mark_file_changed(filename)
+    reindex_written_file(filename)
+
+
 @tool
 def write_code_to_file(filename: str, content: str) -> str:
     """Write code content to a specified file"""
     try:
-        # Create directory if it doesn't exist
-        directory = os.path.dirname(filename)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
-        
-        with open(filename, 'w') as f:
-            f.write(content)
+        _write_file(filename, content)
         return f"Successfully wrote to {filename}"
     except Exception as e:
         return f"Error writing to {filename}: {str(e)}"
+
+
+@tool
+def write_files(files: List[Dict[str, str]]) -> str:
+    """
+    Write several files in one call.
+
+    Each file is written atomically (temp file + rename), so a failed or
+    cancelled run never leaves a half-written file. Prefer this over many
+    write_code_to_file calls when a plan creates or rewrites several files.
+
+    Args:
+        files: List of {"filename": "<path>", "content": "<file content>"} objects
+    """
+    try:
+        batch = {}
+        for i, item in enumerate(files):
+            if not isinstance(item, dict) or "filename" not in item or "content" not in item:
+                return f"Error: files[{i}] must be an object with 'filename' and 'content'"
+            batch[item["filename"]] = item["content"]
+        if not batch:
+            return "Error: no files given"
+        results = _write_files(batch)
+        lines = [
+            f"- {r['path']}: {'created' if r['created'] else 'updated'} ({r['bytes']} bytes)"
+            for r in results
+        ]
+        return f"Successfully wrote {len(results)} file(s):\n" + "\n".join(lines)
+    except Exception as e:
+        return f"Error writing files (no file was changed if staging failed): {str(e)}"
+
+
+@tool
+def apply_edit(filename: str, old_string: str, new_string: str, replace_all: bool = False) -> str:
+    """
+    Replace an exact snippet in an existing file.
+
+    Much cheaper than rewriting the whole file for small changes. old_string
+    must match the file exactly (including indentation) and, unless
+    replace_all is set, occur exactly once; include a few surrounding lines
+    to make it unique.
+
+    Args:
+        filename: File to edit
+        old_string: Exact text to replace
+        new_string: Replacement text
+        replace_all: Replace every occurrence of old_string
+    """
+    try:
+        with open(resolve_path(filename), 'r') as f:
+            content = f.read()
+        _write_file(filename, replace_text(content, old_string, new_string, replace_all, filename))
+        return f"Successfully edited {filename}"
+    except FileNotFoundError:
+        return f"Error: {filename} does not exist (use write_code_to_file to create it)"
+    except EditError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error editing {filename}: {str(e)}"
+
+
+@tool
+def apply_unified_diff(diff: str) -> str:
+    """
+    Apply a unified diff (one or more files) to the workspace.
+
+    Use paths relative to the workspace root, e.g. "--- a/src/app.py" and
+    "+++ b/src/app.py"; use /dev/null to create or delete a file. Context and
+    removed lines must match the current file. If any hunk does not apply,
+    nothing is written and the error names the hunk and the mismatching line.
+
+    Args:
+        diff: Unified diff text
+    """
+    try:
+        def read_file(path):
+            with open(resolve_path(path), 'r') as f:
+                return f.read()
+
+        results = resolve_unified_diff(diff, read_file)
+    except EditError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error parsing diff: {str(e)}"
+
+    try:
+        # Check every delete before writing anything, so a bad delete leaves no partial patch
+        for filename, content in results.items():
+            if content is None:
+                path = resolve_path(filename)
+                if not os.path.isfile(path):
+                    return f"Error: cannot delete {filename}: not a file"
+                if not os.access(os.path.dirname(path) or ".", os.W_OK):
+                    return f"Error: cannot delete {filename}: directory is not writable"
+        _write_files({filename: content for filename, content in results.items() if content is not None})
+        for filename, content in results.items():
+            if content is None:
+                _remove_file(filename)
+        summary = [f"{'deleted' if content is None else 'patched'} {filename}" for filename, content in results.items()]
+        return "Successfully applied diff: " + ", ".join(summary)
+    except Exception as e:
+        return f"Error applying diff: {str(e)}"
@@ -0,0 +1,201 @@
+"""
+Verdicts - Structured QA verdicts and per-requirement bookkeeping.
+
+Responsibilities:
+- Extract requirement IDs from the Auditor's JSON output
+- Parse the QA Judge's JSON verdict (falling back to legacy "PASS" /
+  "FAIL: reason" text)
+- Track which requirements have passed across attempts so retries only
+  re-plan and re-judge the ones still failing
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+_FENCED_JSON = re.compile(r"```(?:json)?\s*\n(.*?)```", re.DOTALL)
+_STATUS_ALIASES = {"PASS": "PASS", "PASSED": "PASS", "MET": "PASS", "OK": "PASS",
+                   "FAIL": "FAIL", "FAILED": "FAIL", "NOT MET": "FAIL", "UNMET": "FAIL", "PARTIAL": "FAIL"}
+
+
+def extract_json(text: str, required_key: str = None):
+    """
+    Find the first JSON value embedded in agent output
+
+    Args:
+        text: Agent output (may contain prose and ``` fences)
+        required_key: Only accept objects containing this key
+
+    Returns:
+        Parsed JSON value, or None if there is none
+    """
+    candidates = [m.group(1) for m in _FENCED_JSON.finditer(text)] + [text]
+    decoder = json.JSONDecoder()
+    for candidate in candidates:
+        for start, char in enumerate(candidate):
+            if char not in "{[":
+                continue
+            try:
+                value, _ = decoder.raw_decode(candidate, start)
+            except ValueError:
+                continue
+            if required_key is None or (isinstance(value, dict) and required_key in value):
+                return value
+    return None
+
+
+def parse_requirements(auditor_output: str) -> dict:
+    """
+    Get the requirements the Auditor extracted, keyed by requirement ID
+
+    Args:
+        auditor_output: Auditor agent output
+
+    Returns:
+        Ordered dict of requirement ID -> requirement object ({} if the
+        output has no usable JSON, in which case retries fall back to
+        re-planning the whole SOW)
+    """
+    data = extract_json(auditor_output, "requirements")
+    if data is None:
+        data = extract_json(auditor_output)
+    items = data.get("requirements", []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return {}
+    requirements = {}
+    for item in items:
+        if isinstance(item, dict):
+            req_id = item.get("id") or item.get("requirement_id")
+            if req_id:
+                requirements[str(req_id)] = item
+    return requirements
+
+
+@dataclass
+class RequirementVerdict:
+    """QA result for one requirement"""
+    id: str
+    status: str
+    reason: str = ""
+
+
+@dataclass
+class QAVerdict:
+    """Parsed QA Judge output"""
+    verdict: str
+    requirements: List[RequirementVerdict] = field(default_factory=list)
+    summary: str = ""
+    structured: bool = False
+
+    @property
+    def passed(self) -> bool:
+        return self.verdict == "PASS"
+
+    def failed(self) -> List[RequirementVerdict]:
+        return [r for r in self.requirements if r.status != "PASS"]
+
+    def failure_report(self) -> str:
+        """Human/agent-readable list of what failed and why"""
+        lines = [f"- {r.id}: {r.reason or 'not met'}" for r in self.failed()]
+        if self.summary:
+            lines.append(f"Summary: {self.summary}")
+        return "\n".join(lines) or self.summary or self.verdict
+
+
+def _status(value) -> str:
+    return _STATUS_ALIASES.get(str(value).strip().upper(), "FAIL")
+
+
+def parse_qa_verdict(text: str) -> QAVerdict:
+    """
+    Parse QA Judge output into a verdict
+
+    Expects {"verdict": "PASS"|"FAIL", "requirements": [{"id", "status",
+    "reason"}], "summary": "..."}; falls back to "PASS" / "FAIL: reason".
+    A verdict with any failed requirement is FAIL whatever it claims.
+
+    Args:
+        text: QA Judge output
+
+    Returns:
+        QAVerdict (verdict is "UNCLEAR" when neither format is found)
+    """
+    data = extract_json(text, "verdict") or extract_json(text, "requirements")
+    if isinstance(data, dict):
+        requirements = [
+            RequirementVerdict(str(item.get("id")), _status(item.get("status")), str(item.get("reason", "")))
+            for item in data.get("requirements", []) if isinstance(item, dict) and item.get("id")
+        ]
+        if "verdict" in data:
+            verdict = _status(data["verdict"])
+        else:
+            verdict = "PASS" if requirements and all(r.status == "PASS" for r in requirements) else "FAIL"
+        if any(r.status != "PASS" for r in requirements):
+            verdict = "FAIL"
+        return QAVerdict(verdict, requirements, str(data.get("summary", "")), structured=True)
+
+    stripped = text.strip()
+    if stripped.startswith("PASS"):
+        return QAVerdict("PASS", summary=stripped)
+    if stripped.startswith("FAIL"):
+        return QAVerdict("FAIL", summary=stripped[len("FAIL"):].lstrip(": ").strip())
+    return QAVerdict("UNCLEAR", summary=stripped)
+
+
+class RequirementLedger:
+    """Tracks per-requirement status across self-healing attempts"""
+
+    def __init__(self, requirement_ids):
+        """
+        Initialize ledger
+
+        Args:
+            requirement_ids: IDs from the Auditor (may be empty)
+        """
+        self.requirement_ids = list(requirement_ids)
+        self.passed = {}
+        self.failed = {}
+
+    def pending_ids(self) -> list:
+        """Requirement IDs not yet passed, in SOW order"""
+        return [req_id for req_id in self.requirement_ids if req_id not in self.passed]
+
+    def record(self, verdict: QAVerdict, judged_ids=None):
+        """
+        Merge a QA verdict; requirements that passed stay passed
+
+        Args:
+            verdict: Parsed QA verdict
+            judged_ids: IDs the QA Judge was asked to judge; an overall PASS
+                        marks all of them passed
+        """
+        for result in verdict.requirements:
+            if result.status == "PASS":
+                self.passed[result.id] = result
+                self.failed.pop(result.id, None)
+            else:
+                self.failed[result.id] = result
+        if verdict.passed:
+            for req_id in judged_ids or []:
+                self.passed.setdefault(req_id, RequirementVerdict(req_id, "PASS"))
+
+    def complete(self, verdict: QAVerdict) -> bool:
+        """Whether the run is done: every known requirement has passed"""
+        if not self.requirement_ids:
+            return verdict.passed
+        return not self.pending_ids()
+
+
+def select_requirements(requirements: dict, ids) -> str:
+    """
+    Render a subset of the Auditor's requirements as JSON for a prompt
+
+    Args:
+        requirements: Result of parse_requirements
+        ids: Requirement IDs to keep
+
+    Returns:
+        JSON text
+    """
+    return json.dumps({"requirements": [requirements[i] for i in ids if i in requirements]}, indent=2)
@@ -0,0 +1,214 @@
+"""
+Workspace Context - Per-task workspace roots and copy-on-write branches.
+
+Responsibilities:
+- Hold the workspace root that file tools resolve relative paths against
+  (a ContextVar, so concurrent branches in one process do not interfere)
+- Create copy-on-write branches of src/ using hardlinks; tools only write
+  through atomic replace, and a branch is detached (each linked file copied,
+  then swapped in) before code that may write in place, such as the tests,
+  runs in it, so a branch write never touches its parent
+- Promote the files a branch changed back into the workspace
+"""
+
+import os
+import shutil
+from contextvars import ContextVar
+
+from code_search import reindex_written_file
+from workspace_index import forget_workspace_indexes, get_workspace_index, mark_file_changed
+
+# Branches live under the workspace root
+BRANCHES_DIR = "branches"
+
+# Read-only inputs every branch sees (linked, not copied)
+SHARED_PATHS = ("snapshot", "sow", "sow_reference.md")
+
+_workspace_root = ContextVar("sow_workspace_root", default=None)
+
+
+def current_root():
+    """Workspace root of the current task (None = the process working directory)"""
+    return _workspace_root.get()
+
+
+def set_workspace_root(root):
+    """
+    Point the file tools of the current task at another workspace root
+
+    Set it inside the task (or async generator) that drives the agents;
+    tool calls inherit it from there.
+
+    Args:
+        root: Workspace root, or None for the process working directory
+
+    Returns:
+        Token for reset_workspace_root
+    """
+    return _workspace_root.set(root)
+
+
+def reset_workspace_root(token):
+    """Restore the workspace root that was active before set_workspace_root"""
+    _workspace_root.reset(token)
+
+
+def resolve_path(path: str) -> str:
+    """
+    Resolve a tool path against the current workspace root
+
+    Absolute paths and paths already inside the root are returned unchanged,
+    so paths echoed back by tools can be passed to tools again.
+
+    Args:
+        path: Path as given by an agent
+
+    Returns:
+        Path to use on disk
+    """
+    root = _workspace_root.get()
+    if root is None or os.path.isabs(path):
+        return path
+    normalized = os.path.normpath(path)
+    root = os.path.normpath(root)
+    if normalized == root or normalized.startswith(root + os.sep):
+        return path
+    return os.path.join(root, path)
+
+
+def _link_tree(source: str, destination: str):
+    """Mirror a directory with hardlinks (copies if the filesystem refuses links)"""
+    def link(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    shutil.copytree(source, destination, copy_function=link, symlinks=True)
+
+
+def detach_file(path: str) -> bool:
+    """
+    Give a hardlinked file its own copy so in-place writes stay private
+
+    The copy is staged next to the file and swapped in with os.replace.
+
+    Args:
+        path: File to detach
+
+    Returns:
+        True if the file was shared and has been copied
+    """
+    try:
+        if os.lstat(path).st_nlink < 2 or os.path.islink(path):
+            return False
+    except FileNotFoundError:
+        return False
+    staged = f"{path}.detach.tmp"
+    shutil.copy2(path, staged)
+    os.replace(staged, path)
+    return True
+
+
+def detach_tree(directory: str) -> int:
+    """
+    Detach every hardlinked file under a directory (see detach_file)
+
+    Args:
+        directory: Branch directory about to be handed to code that may write
+                   files in place
+
+    Returns:
+        Number of files copied
+    """
+    copied = 0
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            copied += detach_file(os.path.join(dirpath, filename))
+    return copied
+
+
+def create_branch(name: str, parent: str = ".") -> str:
+    """
+    Create a copy-on-write branch of a workspace's src/
+
+    Args:
+        name: Branch name (e.g. "plan-1"); an existing branch is replaced
+        parent: Workspace root to branch from
+
+    Returns:
+        Root of the branch workspace
+    """
+    branch = os.path.join(parent, BRANCHES_DIR, name)
+    if os.path.exists(branch):
+        forget_workspace_indexes(branch)
+        shutil.rmtree(branch)
+    os.makedirs(branch)
+    src = os.path.join(parent, "src")
+    if os.path.isdir(src):
+        _link_tree(src, os.path.join(branch, "src"))
+    else:
+        os.makedirs(os.path.join(branch, "src"))
+    for shared in SHARED_PATHS:
+        target = os.path.join(parent, shared)
+        if os.path.isdir(target):
+            os.symlink(os.path.abspath(target), os.path.join(branch, shared), target_is_directory=True)
+        elif os.path.isfile(target):
+            os.link(target, os.path.join(branch, shared))
+    return branch
+
+
+def promote_branch(branch: str, parent: str = ".") -> list:
+    """
+    Make a workspace's src/ match a branch's src/
+
+    Only files that differ are touched; each is swapped in atomically.
+
+    Args:
+        branch: Branch root returned by create_branch
+        parent: Workspace root to promote into
+
+    Returns:
+        Sorted paths (relative to src/) that were added, modified or removed
+    """
+    src = os.path.join(parent, "src")
+    branch_src = os.path.join(branch, "src")
+    target_index = get_workspace_index(src)
+    branch_index = get_workspace_index(branch_src)
+    target_index.refresh()
+    branch_index.refresh()
+    current = target_index.snapshot()
+    wanted = branch_index.snapshot()
+
+    changed = []
+    for rel, digest in wanted.items():
+        if current.get(rel) == digest:
+            continue
+        destination = os.path.join(src, rel)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        staged = f"{destination}.promote.tmp"
+        if os.path.lexists(staged):
+            os.remove(staged)
+        try:
+            os.link(os.path.join(branch_src, rel), staged)
+        except OSError:
+            shutil.copy2(os.path.join(branch_src, rel), staged)
+        os.replace(staged, destination)
+        changed.append(rel)
+    for rel in current:
+        if rel not in wanted:
+            os.remove(os.path.join(src, rel))
+            changed.append(rel)
+
+    for rel in changed:
+        path = os.path.join(src, rel)
+        mark_file_changed(path)
+        reindex_written_file(path)
+    return sorted(changed)
+
+
+def remove_branches(parent: str = "."):
+    """Delete every branch of a workspace, and the file indexes kept for them"""
+    branches = os.path.join(parent, BRANCHES_DIR)
+    # Before the rmtree: the index keys are real paths, resolved while the branches exist
+    forget_workspace_indexes(branches)
+    shutil.rmtree(branches, ignore_errors=True)
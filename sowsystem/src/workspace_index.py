@@ -0,0 +1,348 @@
+"""
+Workspace Index - Incremental file index for directories in a workspace.
+
+Responsibilities:
+- Record path, size, mtime and content hash of every file under a directory
+  (honouring .gitignore, except for files the agent tools wrote)
+- On refresh, only re-stat the tree; hashes are recomputed lazily and only
+  for files whose size or mtime changed
+- Serve file contents from an in-memory cache keyed by content hash
+- Persist the index under the workspace metadata/ directory
+- Diff index states (e.g. to see which files the Artisan changed)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from file_walker import iter_project_files
+from source_files import LARGE_FILE_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for cached file contents held in memory
+CACHE_MAX_BYTES = int(os.getenv("SOW_INDEX_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+
+class WorkspaceIndex:
+    """Incremental, hash-keyed index of the files under one directory"""
+
+    def __init__(self, root, metadata_dir=None, use_gitignore=True):
+        """
+        Initialize workspace index
+
+        Args:
+            root: Directory to index
+            metadata_dir: Directory to persist the index in (None = memory only)
+            use_gitignore: Skip files matched by .gitignore (False = index every file)
+        """
+        self.root = Path(root)
+        self.use_gitignore = use_gitignore
+        self.index_path = None
+        if metadata_dir is not None:
+            rel = self.root.as_posix()
+            name = "root" if rel == "." else rel.removeprefix("/").replace("/", "_")
+            self.index_path = Path(metadata_dir) / f"file_index_{name}.json"
+        self.entries = {}
+        self._contents = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        """Load a previously persisted index, if any"""
+        if self.index_path is None or not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable file index {self.index_path}: {e}")
+            self.entries = {}
+
+    def _save(self):
+        """Persist the index to metadata/"""
+        if self.index_path is None:
+            return
+        try:
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to persist file index {self.index_path}: {e}")
+
+    def _walk(self):
+        """Yield (relative path, stat result) for every non-ignored or written file under root"""
+        seen = set()
+        for rel, entry in iter_project_files(self.root, use_gitignore=self.use_gitignore):
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            seen.add(rel)
+            yield rel, st
+        # Generated deliverables count even when .gitignore matches them
+        root = os.path.realpath(self.root)
+        with _indexes_lock:
+            written = sorted(_written)
+        for path in written:
+            if not path.startswith(root + os.sep):
+                continue
+            rel = Path(os.path.relpath(path, root)).as_posix()
+            if rel in seen:
+                continue
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                yield rel, st
+
+    def refresh(self) -> dict:
+        """
+        Bring the index up to date with the file system
+
+        Returns:
+            Dict with "added", "modified" and "removed" relative paths
+        """
+        with self._lock:
+            changes = {"added": [], "modified": [], "removed": []}
+            seen = set()
+            for rel, st in self._walk():
+                seen.add(rel)
+                entry = self.entries.get(rel)
+                if entry is None:
+                    changes["added"].append(rel)
+                elif entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                    continue
+                else:
+                    changes["modified"].append(rel)
+                self.entries[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": None}
+            for rel in list(self.entries):
+                if rel not in seen:
+                    del self.entries[rel]
+                    changes["removed"].append(rel)
+            if any(changes.values()):
+                self._save()
+            return changes
+
+    def refresh_path(self, rel: str) -> bool:
+        """
+        Bring a single file's entry up to date (e.g. right after writing it)
+
+        Args:
+            rel: Path relative to the index root
+
+        Returns:
+            True if the file exists
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.root / rel, follow_symlinks=False)
+            except OSError:
+                self.entries.pop(rel, None)
+                return False
+            if not stat.S_ISREG(st.st_mode):
+                self.entries.pop(rel, None)
+                return False
+            entry = self.entries.get(rel)
+            if entry is None or entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+                self.entries[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": None}
+            return True
+
+    def files(self, suffixes=None) -> list:
+        """
+        List indexed files in sorted order
+
+        Args:
+            suffixes: Optional tuple of file suffixes to keep (e.g. (".py",))
+
+        Returns:
+            Relative paths
+        """
+        with self._lock:
+            paths = sorted(self.entries)
+        if suffixes:
+            paths = [p for p in paths if p.endswith(tuple(suffixes))]
+        return paths
+
+    def entry(self, rel: str) -> dict:
+        """Get the index entry (size, mtime_ns, sha256) for a file, or None"""
+        with self._lock:
+            return self.entries.get(rel)
+
+    def read_bytes(self, rel: str) -> bytes:
+        """
+        Read a file through the content cache
+
+        Args:
+            rel: Path relative to the index root
+
+        Returns:
+            File contents
+        """
+        return self._read(rel)[1]
+
+    def _read(self, rel: str):
+        """Read a file through the content cache, returning (sha256, contents)"""
+        with self._lock:
+            entry = self.entries.get(rel)
+            digest = entry["sha256"] if entry else None
+            if digest in self._contents:
+                self._contents.move_to_end(digest)
+                return digest, self._contents[digest]
+
+        with open(self.root / rel, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            entry = self.entries.get(rel)
+            if entry is not None and entry["sha256"] != digest:
+                entry["sha256"] = digest
+            self._cache_put(digest, data)
+        return digest, data
+
+    def read_text(self, rel: str) -> str:
+        """Read a file through the content cache as text"""
+        return self.read_bytes(rel).decode("utf-8", errors="replace")
+
+    def _cache_put(self, digest: str, data: bytes):
+        """Add contents to the LRU cache, evicting old entries over the limit"""
+        if digest in self._contents or len(data) > CACHE_MAX_BYTES:
+            return
+        self._contents[digest] = data
+        self._cached_bytes += len(data)
+        while self._cached_bytes > CACHE_MAX_BYTES:
+            _, evicted = self._contents.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def hash_of(self, rel: str) -> str:
+        """Get the content hash of a file, computing it if needed"""
+        entry = self.entry(rel)
+        if entry is not None and entry["sha256"]:
+            return entry["sha256"]
+        if entry is not None and entry["size"] > LARGE_FILE_BYTES:
+            # Hash large files in chunks without pulling them into the cache
+            digest = hashlib.sha256()
+            with open(self.root / rel, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            with self._lock:
+                entry["sha256"] = digest.hexdigest()
+            return entry["sha256"]
+        return self._read(rel)[0]
+
+    def snapshot(self) -> dict:
+        """
+        Get the current content hash of every file
+
+        Returns:
+            Dict of relative path -> sha256
+        """
+        hashes = {rel: self.hash_of(rel) for rel in self.files()}
+        with self._lock:
+            self._save()
+        return hashes
+
+    def diff(self, baseline: dict) -> dict:
+        """
+        Compare the current tree against an earlier snapshot()
+
+        Args:
+            baseline: Result of a previous snapshot() call
+
+        Returns:
+            Dict with "added", "modified" and "removed" relative paths
+        """
+        self.refresh()
+        current = self.snapshot()
+        return {
+            "added": sorted(p for p in current if p not in baseline),
+            "modified": sorted(p for p in current if p in baseline and current[p] != baseline[p]),
+            "removed": sorted(p for p in baseline if p not in current),
+        }
+
+    def invalidate(self, rel: str):
+        """Forget what is known about a file so the next refresh re-reads it"""
+        with self._lock:
+            entry = self.entries.get(rel)
+            if entry is not None:
+                entry.update(mtime_ns=-1, sha256=None)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+# Real paths of files written through the agent tools (indexed even if gitignored)
+_written = set()
+
+
+def get_workspace_index(directory: str = "src") -> WorkspaceIndex:
+    """
+    Get the process-wide index for a directory, creating it on first use
+
+    The index is persisted in ./metadata when the current directory is a
+    workspace root (as created by WorkspaceManager), otherwise kept in memory.
+
+    Args:
+        directory: Directory to index
+
+    Returns:
+        WorkspaceIndex (not refreshed; call refresh() before reading)
+    """
+    key = os.path.realpath(directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            metadata_dir = "metadata" if os.path.isdir("metadata") else None
+            index = WorkspaceIndex(directory, metadata_dir)
+            _indexes[key] = index
+        return index
+
+
+def forget_workspace_indexes(directory: str):
+    """
+    Drop the indexes of a directory and everything under it (e.g. deleted branches)
+
+    Removes the in-memory indexes, their persisted metadata/file_index_*.json
+    files and the written-file marks under the directory.
+
+    Args:
+        directory: Directory that was (or is about to be) deleted
+    """
+    root = os.path.realpath(directory)
+    with _indexes_lock:
+        keys = [key for key in _indexes if key == root or key.startswith(root + os.sep)]
+        dropped = [_indexes.pop(key) for key in keys]
+        _written.difference_update([path for path in _written if path.startswith(root + os.sep)])
+    for index in dropped:
+        if index.index_path is not None:
+            try:
+                index.index_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove file index {index.index_path}: {e}")
+
+
+def mark_file_changed(path: str):
+    """
+    Invalidate a written file in every index that covers it
+
+    The file stays indexed from then on, even if .gitignore matches it.
+
+    Args:
+        path: Path of the file that was written
+    """
+    real = os.path.realpath(path)
+    with _indexes_lock:
+        _written.add(real)
+        indexes = list(_indexes.items())
+    for root, index in indexes:
+        if real.startswith(root + os.sep):
+            index.invalidate(Path(os.path.relpath(real, root)).as_posix())
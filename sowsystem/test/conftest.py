@@ -0,0 +1,6 @@
+"""Shared pytest setup: the agent modules are imported from src/ like main.py does"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -0,0 +1,61 @@
+from strands.agent.state import AgentState
+
+from agent_pool import AgentPool, reset_agent
+
+
+class _Agent:
+    """Minimal stand-in for a strands Agent"""
+
+    def __init__(self, role, state=None):
+        self.role = role
+        self.model = f"{role}-model"
+        self.messages = []
+        self.state = AgentState(state)
+
+
+def _pool(**initial_state):
+    return AgentPool({
+        "auditor": lambda session_manager: _Agent("auditor", initial_state),
+        "architect": lambda session_manager: _Agent("architect"),
+    })
+
+
+class TestAgentPool:
+
+    def test_reuse_per_slot(self):
+        """Each (role, slot) is built once and reused afterwards"""
+        pool = _pool()
+        first = pool.get("architect", 1)
+        assert pool.get("architect", 1) is first
+        assert pool.get("architect", 2) is not first
+        assert pool.stats()["builds"] == 2
+        assert pool.stats()["reuses"] == 1
+
+    def test_reuse_resets_messages_and_state(self):
+        """A reused agent starts with an empty conversation and its initial state"""
+        pool = _pool(mode="audit")
+        agent = pool.get("auditor")
+        agent.messages.append({"role": "user", "content": [{"text": "hi"}]})
+        agent.state.set("notes", ["REQ-1 is risky"])
+        agent.state.set("mode", "changed")
+
+        agent = pool.get("auditor")
+        assert agent.messages == []
+        assert agent.state.get() == {"mode": "audit"}
+
+    def test_model_override(self):
+        """Once set, the override model is used by built and reused agents"""
+        pool = _pool()
+        assert pool.get("auditor").model == "auditor-model"
+        pool.model_override = "cheap-model"
+        assert pool.get("auditor").model == "cheap-model"
+        assert pool.get("architect").model == "cheap-model"
+
+
+class TestResetAgent:
+
+    def test_clears_state_without_initial(self):
+        """Without an initial state every key is removed"""
+        agent = _Agent("bridge", {"seen": 1})
+        reset_agent(agent)
+        assert agent.state.get() == {}
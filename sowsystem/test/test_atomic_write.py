@@ -0,0 +1,52 @@
+import os
+import stat
+from unittest.mock import patch
+
+import pytest
+
+import atomic_write
+from atomic_write import NEW_FILE_MODE, write_files_atomically
+
+
+class TestWriteFilesAtomically:
+
+    def test_writes_batch(self, tmp_path):
+        """Every file of the batch is written, creating parent directories"""
+        results = write_files_atomically({
+            str(tmp_path / "a.py"): "a = 1\n",
+            str(tmp_path / "pkg" / "b.py"): "b = 2\n",
+        })
+        assert (tmp_path / "a.py").read_text() == "a = 1\n"
+        assert (tmp_path / "pkg" / "b.py").read_text() == "b = 2\n"
+        assert [r["created"] for r in results] == [True, True]
+        assert results[0]["bytes"] == 6
+
+    def test_keeps_existing_mode(self, tmp_path):
+        """Rewritten files keep their permissions; new files get the umask default"""
+        existing = tmp_path / "run.sh"
+        existing.write_text("#!/bin/sh\n")
+        os.chmod(existing, 0o750)
+        write_files_atomically({str(existing): "#!/bin/sh\necho hi\n", str(tmp_path / "new.txt"): "x"})
+        assert stat.S_IMODE(os.stat(existing).st_mode) == 0o750
+        assert stat.S_IMODE(os.stat(tmp_path / "new.txt").st_mode) == NEW_FILE_MODE
+
+    def test_failed_staging_touches_nothing(self, tmp_path):
+        """If staging fails, no destination changes and no temp file is left"""
+        (tmp_path / "a.py").write_text("old\n")
+        with patch.object(atomic_write.os, "fsync", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                write_files_atomically({str(tmp_path / "a.py"): "new\n", str(tmp_path / "b.py"): "b\n"})
+        assert (tmp_path / "a.py").read_text() == "old\n"
+        assert sorted(os.listdir(tmp_path)) == ["a.py"]
+
+
+class TestUmask:
+
+    def test_umask_read_without_changing_it(self):
+        """The umask is read from /proc, matching the process umask"""
+        current = os.umask(0o022)
+        os.umask(current)
+        with patch.object(atomic_write.os, "umask", side_effect=AssertionError("umask changed")):
+            umask = atomic_write._read_umask()
+        if umask is not None:
+            assert umask == current
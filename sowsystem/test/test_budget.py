@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+
+# budget reads model IDs through model.load, which imports strands
+pytest.importorskip("strands")
+
+from budget import BudgetGovernor, BudgetLimits  # noqa: E402
+
+
+class _Metrics:
+    def __init__(self, input_tokens, output_tokens):
+        self.accumulated_usage = {"inputTokens": input_tokens, "outputTokens": output_tokens}
+
+
+class _Agent:
+    model = None
+
+    def __init__(self, input_tokens=0, output_tokens=0):
+        self.event_loop_metrics = _Metrics(input_tokens, output_tokens)
+
+
+class TestBudgetLimits:
+
+    def test_payload_overrides(self):
+        """Payload settings override the env defaults"""
+        limits = BudgetLimits.from_payload({"budget": {"max_tokens": "5000", "policy": "Downgrade"}})
+        assert limits.max_tokens == 5000
+        assert limits.policy == "downgrade"
+
+    def test_unknown_settings_are_ignored(self, caplog):
+        """Unknown keys, bad values and unknown policies are logged, not raised"""
+        with caplog.at_level(logging.WARNING, logger="budget"):
+            limits = BudgetLimits.from_payload({"budget": {"max_tokenz": 10, "max_usd": "lots", "policy": "yolo"}})
+        assert limits == BudgetLimits(policy="stop")
+        assert "max_tokenz" in caplog.text
+        assert "max_usd" in caplog.text
+        assert "yolo" in caplog.text
+
+    def test_non_object_budget(self):
+        """A budget that is not an object falls back to the defaults"""
+        assert BudgetLimits.from_payload({"budget": 100}) == BudgetLimits.from_payload({})
+
+
+class TestBudgetGovernor:
+
+    def test_records_deltas_of_reused_agents(self):
+        """A reused agent's accumulated usage is only counted once"""
+        governor = BudgetGovernor(BudgetLimits(max_tokens=1000))
+        agent = _Agent(100, 50)
+        governor.record(agent, "auditor")
+        agent.event_loop_metrics = _Metrics(300, 80)
+        governor.record(agent, "architect")
+        assert (governor.input_tokens, governor.output_tokens) == (300, 80)
+        assert governor.by_stage["architect"] == {"input_tokens": 200, "output_tokens": 30}
@@ -0,0 +1,125 @@
+import pytest
+
+from code_edit import EditError, apply_hunks, parse_unified_diff, replace_text, resolve_unified_diff
+
+
+class TestReplaceText:
+
+    def test_replaces_unique_snippet(self):
+        """A unique snippet is replaced"""
+        assert replace_text("a = 1\nb = 2\n", "b = 2", "b = 3") == "a = 1\nb = 3\n"
+
+    def test_ambiguous_snippet(self):
+        """A snippet that occurs more than once needs replace_all"""
+        with pytest.raises(EditError, match="matches 2 times"):
+            replace_text("x\nx\n", "x", "y")
+        assert replace_text("x\nx\n", "x", "y", replace_all=True) == "y\ny\n"
+
+    def test_missing_snippet_suggests_closest_line(self):
+        """A missing snippet reports the closest line"""
+        with pytest.raises(EditError, match=r"closest line is 'def handle\(request\):'"):
+            replace_text("def handle(request):\n    pass\n", "def handle(req):", "x")
+
+    @pytest.mark.parametrize("old", ["", "   ", "\n\n", "\t\n"])
+    def test_blank_old_string(self, old):
+        """Empty or whitespace-only snippets are rejected"""
+        with pytest.raises(EditError, match="empty or only whitespace"):
+            replace_text("a\n\nb\n", old, "x")
+
+
+class TestApplyHunks:
+
+    def _apply(self, text, diff):
+        return apply_hunks(text, parse_unified_diff(diff)[0]["hunks"])
+
+    def test_replacement_with_context(self):
+        """Context and removed lines are matched and replaced"""
+        diff = "--- a/f\n+++ b/f\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+        assert self._apply("a\nb\nc\nd\n", diff) == "a\nB\nc\nd\n"
+
+    def test_pure_insertion_goes_after_old_start(self):
+        """With an old count of 0, old_start is the line to insert after"""
+        diff = "--- a/f\n+++ b/f\n@@ -2,0 +3,1 @@\n+NEW\n"
+        assert self._apply("a\nb\nc\nd\n", diff) == "a\nb\nNEW\nc\nd\n"
+
+    def test_insertion_at_start_of_file(self):
+        """old_start 0 inserts before the first line"""
+        diff = "--- a/f\n+++ b/f\n@@ -0,0 +1,1 @@\n+first\n"
+        assert self._apply("a\nb\n", diff) == "first\na\nb\n"
+
+    def test_insertion_after_earlier_hunk(self):
+        """Line shifts from earlier hunks apply to later insertions"""
+        diff = ("--- a/f\n+++ b/f\n@@ -1,1 +1,2 @@\n a\n+a2\n"
+                "@@ -3,0 +5,1 @@\n+after-c\n")
+        assert self._apply("a\nb\nc\nd\n", diff) == "a\na2\nb\nc\nafter-c\nd\n"
+
+    def test_drifted_hunk_is_found(self):
+        """A hunk whose line numbers are off still applies at the nearest match"""
+        diff = "--- a/f\n+++ b/f\n@@ -1,2 +1,2 @@\n c\n-d\n+D\n"
+        assert self._apply("a\nb\nc\nd\n", diff) == "a\nb\nc\nD\n"
+
+    def test_mismatch_names_line(self):
+        """A hunk that does not apply names the mismatching line"""
+        diff = "--- a/f\n+++ b/f\n@@ -1,1 +1,1 @@\n-zzz\n+y\n"
+        with pytest.raises(EditError, match="hunk 1 .* line 1: expected 'zzz', found 'a'"):
+            self._apply("a\n", diff)
+
+
+class TestResolveUnifiedDiff:
+
+    def test_create_and_delete(self):
+        """/dev/null creates and deletes files"""
+        files = {"old.py": "x = 1\n"}
+
+        def read_file(path):
+            if path not in files:
+                raise FileNotFoundError(path)
+            return files[path]
+
+        diff = ("--- /dev/null\n+++ b/new.py\n@@ -0,0 +1,1 @@\n+y = 2\n"
+                "--- a/old.py\n+++ /dev/null\n@@ -1,1 +0,0 @@\n-x = 1\n")
+        assert resolve_unified_diff(diff, read_file) == {"new.py": "y = 2\n", "old.py": None}
+
+    def test_delete_of_missing_file(self):
+        """Deleting a file that does not exist fails before anything is written"""
+        def read_file(path):
+            raise FileNotFoundError(path)
+
+        with pytest.raises(EditError, match="does not exist"):
+            resolve_unified_diff("--- a/gone.py\n+++ /dev/null\n@@ -1,1 +0,0 @@\n-x\n", read_file)
+
+    def test_patch_after_delete(self):
+        """Patching a file the same diff deleted is rejected, naming the file and hunk"""
+        diff = ("--- a/old.py\n+++ /dev/null\n@@ -1,1 +0,0 @@\n-x = 1\n"
+                "--- a/old.py\n+++ b/old.py\n@@ -1,1 +1,1 @@\n-x = 1\n+x = 2\n")
+        with pytest.raises(EditError, match=r"old.py: diff patches the file after deleting it \(hunk 1, @@ -1,1"):
+            resolve_unified_diff(diff, lambda path: "x = 1\n")
+
+    def test_delete_then_recreate(self):
+        """A file deleted and then created again in one diff gets the new contents"""
+        diff = ("--- a/old.py\n+++ /dev/null\n@@ -1,1 +0,0 @@\n-x = 1\n"
+                "--- /dev/null\n+++ b/old.py\n@@ -0,0 +1,1 @@\n+y = 2\n")
+        assert resolve_unified_diff(diff, lambda path: "x = 1\n") == {"old.py": "y = 2\n"}
+
+    def test_delete_twice(self):
+        """Deleting the same file twice is rejected"""
+        diff = "--- a/old.py\n+++ /dev/null\n@@ -1,1 +0,0 @@\n-x = 1\n" * 2
+        with pytest.raises(EditError, match="deletes the file twice"):
+            resolve_unified_diff(diff, lambda path: "x = 1\n")
+
+    @pytest.mark.parametrize("header", ["@@ -1,3 +1,3 @@", "@@ -1,2 +1,4 @@", "@@ -1 +1 @@"])
+    def test_hunk_counts_must_match_body(self, header):
+        """A hunk whose header counts disagree with its body is rejected, naming the file and hunk"""
+        diff = f"--- a/f.py\n+++ b/f.py\n@@ -1,1 +1,1 @@\n-a\n+A\n{header}\n b\n-c\n+C\n"
+        with pytest.raises(EditError, match=r"f.py: hunk 2 \(@@ .*\) header counts .* but its body has 2 old and 2 new"):
+            resolve_unified_diff(diff, lambda path: "a\nb\nc\n")
+
+    def test_omitted_counts_default_to_one(self):
+        """A header without counts means one line on each side"""
+        diff = "--- a/f.py\n+++ b/f.py\n@@ -2 +2 @@\n-b\n+B\n"
+        assert resolve_unified_diff(diff, lambda path: "a\nb\n") == {"f.py": "a\nB\n"}
+
+    def test_no_file_headers(self):
+        """Text without file headers is rejected"""
+        with pytest.raises(EditError, match="no file headers"):
+            resolve_unified_diff("just prose", lambda path: "")
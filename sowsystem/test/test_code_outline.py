@@ -0,0 +1,71 @@
+import code_outline
+from code_outline import build_outlines, outline_source
+
+SOURCE = '''"""Payments service."""
+import os
+from typing import List
+
+MAX_RETRIES = 3
+
+
+class Gateway(Base):
+    """Talks to the card processor."""
+
+    @staticmethod
+    def charge(amount: int, currency: str = "USD") -> bool:
+        """Charge a card."""
+        return True
+
+
+async def refund(payment_id):
+    pass
+'''
+
+
+class TestOutlineSource:
+
+    def test_outline_lists_structure(self):
+        """Module docstring, imports, constants, classes and signatures are outlined"""
+        outline = outline_source(SOURCE)
+        assert outline.splitlines() == [
+            '"""Payments service."""',
+            "imports: os, typing.List",
+            "constants: MAX_RETRIES",
+            "class Gateway(Base)  # Talks to the card processor.",
+            "    @staticmethod def charge(amount: int, currency: str='USD') -> bool  # Charge a card.",
+            "async def refund(payment_id)",
+        ]
+
+    def test_syntax_error(self):
+        """Unparsable files are reported instead of raising"""
+        assert outline_source("def broken(:\n").startswith("(syntax error:")
+
+
+class TestBuildOutlines:
+
+    def test_cached_by_hash(self):
+        """Sources are only read for hashes that are not cached yet"""
+        calls = []
+
+        def source():
+            calls.append(1)
+            return "x = 1\n"
+
+        build_outlines({"hash-cached-1": source})
+        build_outlines({"hash-cached-1": source})
+        assert len(calls) == 1
+
+    def test_cache_is_bounded(self, monkeypatch):
+        """The least recently used outlines are evicted beyond the limit"""
+        monkeypatch.setattr(code_outline, "OUTLINE_CACHE_MAX_ENTRIES", 2)
+        for i in range(5):
+            build_outlines({f"hash-bounded-{i}": lambda: "y = 2\n"})
+        assert len(code_outline._outline_cache) <= 2
+        assert "hash-bounded-4" in code_outline._outline_cache
+
+    def test_process_pool(self, monkeypatch):
+        """Large batches are parsed by spawned worker processes"""
+        monkeypatch.setattr(code_outline, "PARALLEL_MIN_FILES", 2)
+        sources = {f"hash-pool-{i}": (lambda i=i: f"def f{i}(): pass\n") for i in range(3)}
+        outlines = build_outlines(sources)
+        assert outlines == {f"hash-pool-{i}": f"def f{i}()" for i in range(3)}
@@ -0,0 +1,58 @@
+from code_search import TrigramIndex, _required_literals, get_search_index, reindex_written_file
+
+
+class TestRequiredLiterals:
+
+    def test_plain_literals(self):
+        """Literal runs of three or more characters are required"""
+        assert _required_literals(r"def handle_\w+") == ["def handle_"]
+        assert _required_literals(r"X-Frame-Options") == ["X-Frame-Options"]
+
+    def test_optional_and_alternation(self):
+        """Optional characters and alternations never produce literals"""
+        assert _required_literals(r"colou?r") == ["colo"]
+        assert _required_literals(r"foo|bar") == []
+
+    def test_escaped_punctuation(self):
+        """Escaped punctuation is literal text"""
+        assert _required_literals(r"items\[0\]\.name") == ["items[0].name"]
+
+    def test_hex_escapes_are_decoded(self):
+        """\\x and \\u escapes become the character they name"""
+        assert _required_literals(r"\x41BCD") == ["ABCD"]
+        assert _required_literals(r"ABCD") == ["ABCD"]
+
+    def test_undecoded_escapes_give_up(self):
+        """Octal, named and back-reference escapes yield no literals"""
+        assert _required_literals(r"\0ABCD") == []
+        assert _required_literals(r"\N{LATIN CAPITAL LETTER A}BCD") == []
+        assert _required_literals(r"(abc)\1xyz") == []
+
+
+class TestTrigramIndex:
+
+    def test_search_with_escapes(self, tmp_path):
+        """Escaped patterns find their matches (the prefilter must not exclude them)"""
+        (tmp_path / "a.txt").write_text("value = ABCD\n")
+        (tmp_path / "b.txt").write_text("nothing here\n")
+        index = TrigramIndex(str(tmp_path))
+        assert "a.txt" in index.search(r"\x41BCD")
+        assert "a.txt" in index.search(r"ABCD")
+        assert index.candidates("ABCD") == ["a.txt"]
+
+    def test_written_file_is_reindexed_without_walk(self, tmp_path, monkeypatch):
+        """Re-indexing a written file does not walk the whole tree"""
+        (tmp_path / "a.py").write_text("old_name = 1\n")
+        index = get_search_index(str(tmp_path))
+        index.update()
+
+        def no_walk():
+            raise AssertionError("full refresh on write")
+
+        monkeypatch.setattr(index.files, "refresh", no_walk)
+        (tmp_path / "a.py").write_text("new_name = 1\n")
+        (tmp_path / "b.py").write_text("new_name = 2\n")
+        reindex_written_file(str(tmp_path / "a.py"))
+        reindex_written_file(str(tmp_path / "b.py"))
+        assert index.candidates("new_name") == ["a.py", "b.py"]
+        assert index.candidates("old_name") == []
@@ -0,0 +1,70 @@
+import json
+
+from context_budget import OutputStore, _normalize, digest, estimate_tokens, tool_schema_tokens
+
+
+def _requirements_json(count):
+    return json.dumps({"requirements": [
+        {"id": f"REQ-{i}", "type": "deliverable", "description": f"Endpoint number {i}"} for i in range(count)
+    ]}, indent=2)
+
+
+class TestNormalize:
+
+    def test_json_is_kept_verbatim(self):
+        """Repeated lines of a JSON document are never dropped"""
+        text = _requirements_json(5)
+        assert _normalize(text) == text
+        assert _normalize(text).count('"type": "deliverable",') == 5
+
+    def test_json_inside_prose_is_kept(self):
+        """JSON embedded in prose or in a fence keeps its repeated lines"""
+        body = "\n".join(['    "status": "unknown",'] * 3)
+        text = f"Requirements follow.\n{{\n{body}\n}}\n```\nretry_connection_to_the_server()\nretry_connection_to_the_server()\n```"
+        assert _normalize(text) == text
+
+    def test_consecutive_log_lines_collapse(self):
+        """Runs of identical prose/log lines collapse into one with a count"""
+        text = "start\n" + "ERROR connection refused by upstream\n" * 3 + "done\nERROR connection refused by upstream"
+        assert _normalize(text) == ("start\nERROR connection refused by upstream [x3]\n"
+                                    "done\nERROR connection refused by upstream")
+
+    def test_whitespace(self):
+        """Trailing whitespace and runs of blank lines are dropped"""
+        assert _normalize("a   \n\n\n\nb\t\n") == "a\n\nb"
+
+
+class TestDigest:
+
+    def test_within_budget_unchanged(self):
+        """Texts within budget are returned unchanged"""
+        assert digest("short text", 100) == "short text"
+
+    def test_head_tail_with_reference(self):
+        """Over-budget texts keep a head and tail and name the reference"""
+        text = "\n".join(f"line {i} of the bridge report" for i in range(2000))
+        result = digest(text, 200, "bridge-abc")
+        assert result.startswith("line 0 of the bridge report")
+        assert result.endswith("line 1999 of the bridge report")
+        assert 'fetch_full_output(ref="bridge-abc")' in result
+        assert estimate_tokens(result) <= 200
+
+
+class TestOutputStore:
+
+    def test_put_get_and_eviction(self):
+        """Texts are addressed by reference; the oldest are evicted over the limit"""
+        store = OutputStore(max_chars=10)
+        first = store.put("a", "123456")
+        second = store.put("b", "abcdef")
+        assert first.startswith("a-")
+        assert store.get(second) == "abcdef"
+        assert store.get(first) is None
+
+
+class TestEstimates:
+
+    def test_tool_schema_tokens(self):
+        """Schema tokens are estimated from compact JSON"""
+        spec = {"name": "search", "description": "Search logs", "inputSchema": {"json": {"type": "object"}}}
+        assert tool_schema_tokens([spec, spec]) == 2 * estimate_tokens(json.dumps(spec, separators=(",", ":")))
@@ -0,0 +1,48 @@
+import contextvars
+
+import pytest
+
+# The client subclasses strands' MCPClient
+pytest.importorskip("strands")
+pytest.importorskip("mcp")
+
+from mcp_client.datadog_client import CachingMCPClient, normalize_arguments, start_cache_run  # noqa: E402
+
+KEY = ("search_datadog_logs", "{}")
+RESULT = {"status": "success", "toolUseId": "t1", "content": [{"text": "ok"}]}
+
+
+def _lookups(client, count):
+    """Start a run and look up the same call count times"""
+    stats = start_cache_run()
+    for _ in range(count):
+        state, value = client._claim(KEY)
+        if state == "lead":
+            client._settle(KEY, value, RESULT)
+    return stats
+
+
+class TestCachingMCPClient:
+
+    def test_stats_are_per_run(self):
+        """Each run counts its own lookups while cached results are shared"""
+        client = CachingMCPClient(lambda: None)
+        first = contextvars.copy_context().run(_lookups, client, 3)
+        second = contextvars.copy_context().run(_lookups, client, 2)
+        assert first == {"hits": 2, "misses": 1, "coalesced": 0}
+        assert second == {"hits": 2, "misses": 0, "coalesced": 0}
+        assert client.cache_stats["hits"] == 4
+
+    def test_side_effect_tools_not_cached(self):
+        """Tools that change state are never served from the cache"""
+        client = CachingMCPClient(lambda: None)
+        assert not client._cacheable("create_datadog_notebook")
+        assert client._cacheable("search_datadog_logs")
+
+
+class TestNormalizeArguments:
+
+    def test_equivalent_arguments_match(self):
+        """Key order, empty values and whitespace do not change the cache key"""
+        assert (normalize_arguments({"query": "service:api  status:error", "limit": 10, "cursor": None})
+                == normalize_arguments({"limit": 10, "query": "service:api status:error"}))
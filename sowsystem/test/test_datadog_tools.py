@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# FilteredToolProvider is a strands ToolProvider
+pytest.importorskip("strands")
+
+import datadog_tools  # noqa: E402
+from context_budget import tool_schema_tokens  # noqa: E402
+from datadog_tools import (  # noqa: E402
+    DATADOG_TOOL_ALLOWLIST,
+    FilteredToolProvider,
+    allowed_datadog_tools,
+    datadog_tool_stats,
+    get_datadog_tools,
+)
+
+# Every tool named in an allow-list, plus some no role uses
+SERVER_TOOLS = sorted({name for names in DATADOG_TOOL_ALLOWLIST.values() for name in names}
+                      | {"list_datadog_dashboards", "search_datadog_rum_events"})
+
+
+def _tool(name, prefixed=True):
+    """MCP agent tool stand-in; the agent-facing name may carry a client prefix"""
+    spec = {"name": f"dd_{name}" if prefixed else name, "description": f"{name} tool",
+            "inputSchema": {"json": {"type": "object", "properties": {"query": {"type": "string"}}}}}
+    return SimpleNamespace(mcp_tool=SimpleNamespace(name=name), tool_name=spec["name"], tool_spec=spec)
+
+
+class _StubProvider:
+    """Shared MCP session stand-in that lists a fixed set of tools"""
+
+    def __init__(self, names=SERVER_TOOLS):
+        self.tools = [_tool(name) for name in names]
+        self.loads = 0
+        self.consumers = []
+
+    async def load_tools(self, **kwargs):
+        self.loads += 1
+        return list(self.tools)
+
+    def add_consumer(self, consumer_id, **kwargs):
+        self.consumers.append(consumer_id)
+
+    def remove_consumer(self, consumer_id, **kwargs):
+        self.consumers.remove(consumer_id)
+
+
+@pytest.fixture(autouse=True)
+def _clean(monkeypatch):
+    for role in DATADOG_TOOL_ALLOWLIST:
+        monkeypatch.delenv(f"SOW_DATADOG_TOOLS_{role.upper()}", raising=False)
+    monkeypatch.setattr(datadog_tools, "_schema_stats", {})
+
+
+def _server_names(tools):
+    return sorted(tool.mcp_tool.name for tool in tools)
+
+
+class TestAllowedDatadogTools:
+
+    def test_defaults(self):
+        """Each role gets its allow-list; unknown roles get all tools"""
+        for role, names in DATADOG_TOOL_ALLOWLIST.items():
+            assert allowed_datadog_tools(role) == names
+        assert allowed_datadog_tools("unknown") is None
+
+    def test_env_override(self, monkeypatch):
+        """SOW_DATADOG_TOOLS_<ROLE> replaces the list; "*" means all, "" means none"""
+        monkeypatch.setenv("SOW_DATADOG_TOOLS_ARTISAN", " get_datadog_trace , ")
+        assert allowed_datadog_tools("artisan") == ["get_datadog_trace"]
+        monkeypatch.setenv("SOW_DATADOG_TOOLS_ARTISAN", "*")
+        assert allowed_datadog_tools("artisan") is None
+        monkeypatch.setenv("SOW_DATADOG_TOOLS_ARTISAN", "")
+        assert allowed_datadog_tools("artisan") == []
+
+
+class TestFilteredToolProvider:
+
+    def test_each_role_gets_only_its_tools(self):
+        """Every role's view of the shared session holds exactly its allow-listed tools"""
+        provider = _StubProvider()
+        for role, names in DATADOG_TOOL_ALLOWLIST.items():
+            tools = asyncio.run(FilteredToolProvider(provider, names, role).load_tools())
+            assert _server_names(tools) == sorted(names)
+        assert provider.loads == len(DATADOG_TOOL_ALLOWLIST)
+
+    def test_records_schema_token_stats(self):
+        """The listing records tool counts and schema tokens against the full server"""
+        provider = _StubProvider()
+        names = DATADOG_TOOL_ALLOWLIST["artisan"]
+        selected = asyncio.run(FilteredToolProvider(provider, names, "artisan").load_tools())
+        stats = datadog_tool_stats()["artisan"]
+        assert stats == {
+            "tools": len(names),
+            "available": len(SERVER_TOOLS),
+            "schema_tokens": tool_schema_tokens(tool.tool_spec for tool in selected),
+            "available_schema_tokens": tool_schema_tokens(tool.tool_spec for tool in provider.tools),
+        }
+        assert 0 < stats["schema_tokens"] < stats["available_schema_tokens"]
+
+    def test_missing_tools_are_skipped(self):
+        """Allow-listed tools the server does not offer are left out"""
+        provider = _StubProvider(["search_datadog_logs"])
+        tools = asyncio.run(FilteredToolProvider(provider, DATADOG_TOOL_ALLOWLIST["auditor"], "auditor").load_tools())
+        assert _server_names(tools) == ["search_datadog_logs"]
+        assert datadog_tool_stats()["auditor"]["tools"] == 1
+
+    def test_unprefixed_tools_match_by_tool_name(self):
+        """Tools without an MCP tool object are matched by their agent-facing name"""
+        provider = _StubProvider([])
+        plain = _tool("get_datadog_trace", prefixed=False)
+        del plain.mcp_tool
+        provider.tools = [plain]
+        tools = asyncio.run(FilteredToolProvider(provider, ["get_datadog_trace"], "artisan").load_tools())
+        assert tools == [plain]
+
+    def test_consumers_are_forwarded(self):
+        """Consumer registration reaches the shared session, which owns the connection"""
+        provider = _StubProvider()
+        view = FilteredToolProvider(provider, ["get_datadog_trace"], "artisan")
+        view.add_consumer("agent-1")
+        assert provider.consumers == ["agent-1"]
+        view.remove_consumer("agent-1")
+        assert provider.consumers == []
+
+
+class TestGetDatadogTools:
+
+    def test_without_session(self, monkeypatch):
+        """No Datadog session means no tools"""
+        monkeypatch.setattr(datadog_tools, "_shared_session", lambda: None)
+        assert get_datadog_tools("artisan") == []
+
+    def test_role_views(self, monkeypatch):
+        """Roles get a filtered view; no role or "*" gets the session; an empty list gets nothing"""
+        session = _StubProvider()
+        monkeypatch.setattr(datadog_tools, "_shared_session", lambda: session)
+        (view,) = get_datadog_tools("bridge")
+        assert isinstance(view, FilteredToolProvider)
+        assert view.provider is session
+        assert view.allowed == set(DATADOG_TOOL_ALLOWLIST["bridge"])
+        assert get_datadog_tools() == [session]
+        monkeypatch.setenv("SOW_DATADOG_TOOLS_BRIDGE", "*")
+        assert get_datadog_tools("bridge") == [session]
+        monkeypatch.setenv("SOW_DATADOG_TOOLS_BRIDGE", "")
+        assert get_datadog_tools("bridge") == []
@@ -0,0 +1,120 @@
+import asyncio
+
+from events import RESULT, STAGE_START, STATUS, TEXT, TextRenderer, WorkflowEvent, coalesce_events
+
+
+async def _stream(events, delay=0.0):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+def _collect(events, **kwargs):
+    async def run():
+        return [event async for event in coalesce_events(_stream(events), **kwargs)]
+    return asyncio.run(run())
+
+
+class TestWorkflowEvent:
+
+    def test_to_dict_defaults_ts_end(self):
+        """ts_end falls back to ts for single-chunk events"""
+        event = WorkflowEvent(TEXT, stage="auditor", agent="auditor", data="hi", ts=1.0)
+        assert event.to_dict() == {"kind": TEXT, "stage": "auditor", "agent": "auditor", "attempt": None,
+                                   "data": "hi", "ts": 1.0, "ts_end": 1.0}
+
+
+class TestCoalesceEvents:
+
+    def test_merges_text_per_stream(self):
+        """Interleaved text of two agents is merged per agent, in first-chunk order"""
+        events = [
+            WorkflowEvent(TEXT, stage="auditor", agent="auditor", data="a1"),
+            WorkflowEvent(TEXT, stage="bridge", agent="bridge", data="b1"),
+            WorkflowEvent(TEXT, stage="auditor", agent="auditor", data="a2"),
+        ]
+        merged = _collect(events, max_delay_ms=10_000, max_chars=0)
+        assert [(event.agent, event.data) for event in merged] == [("auditor", "a1a2"), ("bridge", "b1")]
+
+    def test_non_text_event_flushes_buffers(self):
+        """Buffered text is released before a status event, keeping order"""
+        events = [
+            WorkflowEvent(TEXT, data="one"),
+            WorkflowEvent(STATUS, data={"message": "done"}),
+            WorkflowEvent(TEXT, data="two"),
+        ]
+        merged = _collect(events, max_delay_ms=10_000, max_chars=0)
+        assert [event.kind for event in merged] == [TEXT, STATUS, TEXT]
+
+    def test_size_bound(self):
+        """A buffer is released once it reaches max_chars"""
+        events = [WorkflowEvent(TEXT, data="x" * 4) for _ in range(3)]
+        merged = _collect(events, max_delay_ms=10_000, max_chars=8)
+        assert [event.data for event in merged] == ["x" * 8, "x" * 4]
+
+    def test_disabled(self):
+        """With both bounds at 0 events pass through unchanged"""
+        events = [WorkflowEvent(TEXT, data="a"), WorkflowEvent(TEXT, data="b")]
+        assert [event.data for event in _collect(events, max_delay_ms=0, max_chars=0)] == ["a", "b"]
+
+    def test_early_close_closes_source(self):
+        """Closing the coalesced stream early runs the source's cleanup right away"""
+        for blocked_in_source in (True, False):
+            log = []
+
+            async def source():
+                try:
+                    if blocked_in_source:
+                        yield WorkflowEvent(STATUS, data={"message": "started"})
+                        await asyncio.Event().wait()
+                    for i in range(1000):  # More than the queue holds: the producer blocks on put
+                        yield WorkflowEvent(STATUS, data={"message": str(i)})
+                finally:
+                    log.append("source closed")
+
+            async def run():
+                merged = coalesce_events(source(), max_delay_ms=10_000, max_chars=0)
+                await merged.__anext__()
+                await merged.aclose()
+                return list(log)
+
+            assert asyncio.run(run()) == ["source closed"]
+
+    def test_disabled_early_close_closes_source(self):
+        """Closing the pass-through stream early also closes the source"""
+        log = []
+
+        async def source():
+            try:
+                yield WorkflowEvent(TEXT, data="a")
+                yield WorkflowEvent(TEXT, data="b")
+            finally:
+                log.append("source closed")
+
+        async def run():
+            merged = coalesce_events(source(), max_delay_ms=0, max_chars=0)
+            await merged.__anext__()
+            await merged.aclose()
+            return list(log)
+
+        assert asyncio.run(run()) == ["source closed"]
+
+
+class TestTextRenderer:
+
+    def test_renders_banners_and_text(self):
+        """Stage starts become agent banners; interleaved agents are tagged"""
+        renderer = TextRenderer()
+        text = "".join(renderer.render(event) for event in [
+            WorkflowEvent(STAGE_START, stage="auditor", agent="auditor", data={"prompt_tokens": 12}),
+            WorkflowEvent(TEXT, stage="auditor", agent="auditor", data="REQ-1"),
+            WorkflowEvent(TEXT, stage="bridge", agent="bridge", data="src/ has app.py"),
+        ])
+        assert text == ("\n\n=== AUDITOR AGENT ===\n[auditor prompt: ~12 tokens]\n"
+                        "REQ-1\n[bridge] src/ has app.py")
+
+    def test_renders_result(self):
+        """The result event ends the text stream"""
+        event = WorkflowEvent(RESULT, data={"status": "PASS", "message": "Passed on attempt 1/3"})
+        assert TextRenderer().render(event).endswith("Passed on attempt 1/3\n=== WORKFLOW COMPLETE ===\n")
@@ -0,0 +1,63 @@
+from itertools import islice
+
+from file_walker import is_ignored, iter_project_files, parse_gitignore
+
+
+def _tree(root, paths):
+    for path in paths:
+        target = root / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("x\n")
+
+
+class TestGitignoreRules:
+
+    def test_basename_and_anchored_patterns(self):
+        """Patterns without a slash match at any depth; with a slash they are anchored"""
+        rules = parse_gitignore("*.log\n/build\ndocs/tmp\n")
+        assert is_ignored(rules, "app.log", False)
+        assert is_ignored(rules, "deep/nested/app.log", False)
+        assert is_ignored(rules, "build", True)
+        assert not is_ignored(rules, "src/build", True)
+        assert is_ignored(rules, "docs/tmp", True)
+        assert not is_ignored(rules, "other/docs/tmp", True)
+
+    def test_negation_and_dir_only(self):
+        """The last matching rule wins; trailing slashes only match directories"""
+        rules = parse_gitignore("*.env\n!example.env\ncache/\n")
+        assert is_ignored(rules, "prod.env", False)
+        assert not is_ignored(rules, "example.env", False)
+        assert is_ignored(rules, "cache", True)
+        assert not is_ignored(rules, "cache", False)
+
+    def test_double_star(self):
+        """** crosses directory levels"""
+        rules = parse_gitignore("logs/**/debug.txt\n")
+        assert is_ignored(rules, "logs/debug.txt", False)
+        assert is_ignored(rules, "logs/a/b/debug.txt", False)
+
+
+class TestIterProjectFiles:
+
+    def test_stable_order_and_gitignore(self, tmp_path):
+        """Files come before subdirectories, in name order; ignored paths are pruned"""
+        _tree(tmp_path, ["b.py", "a.py", "pkg/z.py", "pkg/sub/y.py", "dist/out.js",
+                         "node_modules/lib.js", "pkg/.gitignore", "pkg/gen.py"])
+        (tmp_path / ".gitignore").write_text("dist/\n")
+        (tmp_path / "pkg" / ".gitignore").write_text("gen.py\n")
+        files = [rel for rel, _ in iter_project_files(tmp_path)]
+        assert files == [".gitignore", "a.py", "b.py", "pkg/.gitignore", "pkg/z.py", "pkg/sub/y.py"]
+
+    def test_max_depth_and_islice(self, tmp_path):
+        """max_depth limits the walk; islice bounds the count lazily"""
+        _tree(tmp_path, ["a.py", "pkg/b.py", "pkg/sub/c.py"])
+        assert [rel for rel, _ in iter_project_files(tmp_path, max_depth=0)] == ["a.py"]
+        assert [rel for rel, _ in iter_project_files(tmp_path, max_depth=1)] == ["a.py", "pkg/b.py"]
+        assert len(list(islice(iter_project_files(tmp_path), 2))) == 2
+
+    def test_without_gitignore(self, tmp_path):
+        """use_gitignore=False lists ignored files too"""
+        _tree(tmp_path, ["keep.py", "skip.log"])
+        (tmp_path / ".gitignore").write_text("*.log\n")
+        files = [rel for rel, _ in iter_project_files(tmp_path, use_gitignore=False)]
+        assert "skip.log" in files
@@ -39,4 +39,135 @@
 #         """Test that entrypoint function is properly decorated"""
 
 #         assert hasattr(invoke, '__name__')
-#         assert invoke.__name__ == 'invoke'
\ No newline at end of file
+#         assert invoke.__name__ == 'invoke'
+
+import asyncio
+import subprocess
+import sys
+from contextlib import aclosing
+from pathlib import Path
+
+import pytest
+
+
+class TestStartup:
+
+    def test_import_main_skips_agent_stack(self):
+        """Importing main does not load strands, the tools or the MCP clients"""
+        pytest.importorskip("dotenv")
+        heavy = ("strands", "mcp", "tools", "telemetry", "datadog_tools", "model.load", "budget")
+        code = f"import sys, main; print([m for m in {heavy!r} if m in sys.modules])"
+        result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent / "src",
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "[]"
+
+
+async def _stream(name, steps, log, gate=None):
+    """Event stream that yields "<name>:<i>", optionally waiting on gate after each event"""
+    try:
+        for i in range(steps):
+            yield f"{name}:{i}"
+            if gate is not None:
+                await gate.wait()
+            else:
+                await asyncio.sleep(0)
+        log.append(f"{name} done")
+    finally:
+        log.append(f"{name} closed")
+
+
+async def _failing(log):
+    try:
+        yield "bad:0"
+        await asyncio.sleep(0)
+        raise RuntimeError("stage failed")
+    finally:
+        log.append("bad closed")
+
+
+def _collect(streams):
+    async def run():
+        from main import _merge_streams
+        return [event async for event in _merge_streams(streams)]
+    return asyncio.run(run())
+
+
+class TestMergeStreams:
+
+    def test_interleaves_streams(self):
+        """Events from concurrent streams arrive interleaved, each in its own order"""
+        pytest.importorskip("dotenv")
+        log = []
+        events = _collect([_stream("a", 3, log), _stream("b", 3, log)])
+        assert sorted(events) == ["a:0", "a:1", "a:2", "b:0", "b:1", "b:2"]
+        assert events != ["a:0", "a:1", "a:2", "b:0", "b:1", "b:2"]
+        assert [e for e in events if e.startswith("a")] == ["a:0", "a:1", "a:2"]
+        assert sorted(log) == ["a closed", "a done", "b closed", "b done"]
+
+    def test_error_propagates_and_cancels_others(self):
+        """A failing stream raises its error and the other streams are closed"""
+        pytest.importorskip("dotenv")
+        log = []
+
+        async def run():
+            from main import _merge_streams
+            gate = asyncio.Event()  # never set: "slow" blocks until cancelled
+            events = []
+            with pytest.raises(RuntimeError, match="stage failed"):
+                async for event in _merge_streams([_stream("slow", 3, log, gate), _failing(log)]):
+                    events.append(event)
+            return events
+
+        events = asyncio.run(run())
+        assert sorted(events) == ["bad:0", "slow:0"]
+        assert sorted(log) == ["bad closed", "slow closed"]
+
+    def test_early_close_cancels_streams(self):
+        """Closing the merged generator stops the streams still running"""
+        pytest.importorskip("dotenv")
+        log = []
+
+        async def run():
+            from main import _merge_streams
+            gate = asyncio.Event()
+            async with aclosing(_merge_streams([_stream("a", 3, log, gate), _stream("b", 3, log, gate)])) as merged:
+                first = await merged.__anext__()
+            return first
+
+        assert asyncio.run(run()) in ("a:0", "b:0")
+        assert sorted(log) == ["a closed", "b closed"]
+
+
+AUDITOR_OUTPUT = """Assumption: the service keeps its public REST paths.
+Out of scope: the billing dashboard.
+
+{"requirements": [
+  {"id": "REQ-1", "text": "Add retries to the payment client"},
+  {"id": "REQ-2", "text": "Log every declined payment"}
+]}
+
+Constraint: no new third-party dependencies."""
+
+
+class TestArchitectPrompt:
+
+    def _prompt(self, attempt, judged_ids=()):
+        pytest.importorskip("dotenv")
+        from main import _architect_prompt
+        from verdicts import RequirementLedger, parse_requirements
+        requirements = parse_requirements(AUDITOR_OUTPUT)
+        return _architect_prompt(attempt, requirements, RequirementLedger(requirements), list(judged_ids),
+                                 AUDITOR_OUTPUT, "state", "REQ-2: no log line")
+
+    def test_first_plan_keeps_auditor_notes(self):
+        """The first plan gets the whole Auditor output, not only the requirements array"""
+        prompt = self._prompt(1)
+        assert AUDITOR_OUTPUT in prompt
+        assert "Constraint: no new third-party dependencies." in prompt
+
+    def test_retry_targets_failed_requirements(self):
+        """A targeted retry lists only the failed requirements"""
+        prompt = self._prompt(2, ["REQ-2"])
+        assert '"REQ-2"' in prompt
+        assert '"REQ-1"' not in prompt
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+import pytest
+
+from model.cache import CacheMissError, CachingModel, ResponseCache, request_key
+
+MESSAGES = [{"role": "user", "content": [{"text": "hi"}, {"image": {"source": {"bytes": b"\x89PNG"}}}]}]
+
+
+class _Model:
+    """Stand-in model streaming fixed events"""
+
+    def __init__(self, events):
+        self.events = events
+        self.calls = 0
+
+    def get_config(self):
+        return {"model_id": "test-model"}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        for event in self.events:
+            yield event
+
+
+def _collect(model, messages=MESSAGES):
+    async def run():
+        return [event async for event in model.stream(messages, None, "system")]
+    return asyncio.run(run())
+
+
+class TestRequestKey:
+
+    def test_stable_for_equal_requests(self):
+        """Equal requests hash equally, whatever the key order; any change changes the key"""
+        key = request_key("m", "sys", MESSAGES, [{"name": "t"}], tool_choice={"auto": {}})
+        assert key == request_key("m", "sys", [dict(reversed(list(MESSAGES[0].items())))], [{"name": "t"}],
+                                  tool_choice={"auto": {}})
+        assert key != request_key("m", "sys", MESSAGES, [{"name": "t2"}], tool_choice={"auto": {}})
+
+    def test_unknown_types_rejected(self):
+        """Objects without a stable JSON form are refused instead of hashed by repr"""
+        with pytest.raises(TypeError):
+            request_key("m", "sys", [{"content": object()}], None)
+
+
+class TestResponseCache:
+
+    def test_bytes_round_trip(self, tmp_path):
+        """Bytes in recorded events are bytes again on replay"""
+        cache = ResponseCache(str(tmp_path))
+        cache.put("ab" * 32, [{"chunk": b"\x00\x01"}], "m")
+        assert cache.get("ab" * 32) == [{"chunk": b"\x00\x01"}]
+
+    def test_lru_eviction_by_bytes(self, tmp_path):
+        """Over the byte budget the least recently used entries go first"""
+        cache = ResponseCache(str(tmp_path), max_bytes=10_000)
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for age, key in enumerate(keys):
+            cache.put(key, [{"text": "x" * 3000}], "m")
+            os.utime(cache._path(key), ns=(age * 10**9, age * 10**9))
+        assert cache.get(keys[0]) is not None  # now the most recently used
+        cache.put("99" * 32, [{"text": "x" * 3000}], "m")
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+
+
+class TestCachingModel:
+
+    def test_records_then_replays(self, tmp_path):
+        """A miss calls the model and records; the same request then replays offline"""
+        events = [{"contentBlockDelta": {"delta": {"text": "hello"}}}]
+        model = _Model(events)
+        cache = ResponseCache(str(tmp_path))
+        assert _collect(CachingModel(model, "on", cache)) == events
+        assert _collect(CachingModel(model, "replay", cache)) == events
+        assert model.calls == 1
+
+    def test_replay_miss(self, tmp_path):
+        """Replay mode never calls the model for unseen requests"""
+        model = _Model([])
+        with pytest.raises(CacheMissError):
+            _collect(CachingModel(model, "replay", ResponseCache(str(tmp_path))))
+        assert model.calls == 0
+
+    def test_unencodable_request_not_cached(self, tmp_path):
+        """Requests with unencodable values pass through uncached in "on" mode"""
+        model = _Model([{"done": True}])
+        messages = [{"role": "user", "content": [{"obj": object()}]}]
+        assert _collect(CachingModel(model, "on", ResponseCache(str(tmp_path))), messages) == [{"done": True}]
+        assert not any(files for _, _, files in os.walk(tmp_path))
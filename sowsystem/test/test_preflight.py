@@ -0,0 +1,91 @@
+import json
+
+from preflight import check_python, run_preflight
+
+
+def _codes(issues):
+    return [issue.code for issue in issues]
+
+
+class TestCheckPython:
+
+    def test_sane_module(self):
+        """A module with real function bodies has no issues"""
+        assert check_python("app.py", "def add(a, b):\n    return a + b\n") == []
+
+    def test_syntax_error(self):
+        """Syntax errors are reported with their line"""
+        issues = check_python("app.py", "def broken(:\n    pass\n")
+        assert _codes(issues) == ["SYNTAX_ERROR"]
+        assert issues[0].line == 1
+
+    def test_duplicate_definition(self):
+        """A top-level name defined twice is reported"""
+        issues = check_python("app.py", "def f():\n    return 1\n\ndef f():\n    return 2\n")
+        assert _codes(issues) == ["DUPLICATE_DEFINITION"]
+
+    def test_placeholder_only(self):
+        """A module whose functions are all stubs is reported"""
+        source = "def handler():\n    pass\n\ndef other():\n    raise NotImplementedError()\n"
+        assert _codes(check_python("app.py", source)) == ["PLACEHOLDER_ONLY"]
+
+    def test_interfaces_are_not_placeholders(self):
+        """ABCs, Protocols, @abstractmethod and @overload declarations may be empty"""
+        source = '''
+from abc import ABC, ABCMeta, abstractmethod
+from typing import Protocol, overload
+import typing
+
+
+class Repository(ABC):
+    def get(self, key):
+        """Fetch an item."""
+        ...
+
+
+class Store(metaclass=ABCMeta):
+    @abstractmethod
+    def put(self, key, value):
+        raise NotImplementedError
+
+
+class Reader(typing.Protocol):
+    def read(self) -> bytes: ...
+
+
+class Parser:
+    @overload
+    def parse(self, data: str) -> dict: ...
+'''
+        assert check_python("interfaces.py", source) == []
+
+    def test_stub_file(self):
+        """.pyi stub files are compiled but never placeholder-checked"""
+        assert check_python("api.pyi", "def get(key: str) -> bytes: ...\n") == []
+
+
+class TestRunPreflight:
+
+    def test_no_changes(self, tmp_path, monkeypatch):
+        """src/ identical to snapshot/ fails without calling QA"""
+        monkeypatch.chdir(tmp_path)
+        for directory in ("src", "snapshot"):
+            (tmp_path / directory).mkdir()
+            (tmp_path / directory / "app.py").write_text("x = 1\n")
+        result = run_preflight()
+        assert _codes(result.issues) == ["NO_CHANGES"]
+
+    def test_changed_files_are_checked(self, tmp_path, monkeypatch):
+        """Only changed files are checked; the report is machine-readable"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "snapshot").mkdir()
+        (tmp_path / "snapshot" / "old.py").write_text("def f(:\n")
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "old.py").write_text("def f(:\n")
+        (tmp_path / "src" / "config.json").write_text("{broken")
+        (tmp_path / "src" / "ok.py").write_text("def f():\n    return 1\n")
+        result = run_preflight()
+        assert not result.ok
+        report = json.loads(result.to_json())
+        assert [issue["code"] for issue in report["issues"]] == ["INVALID_JSON"]
+        assert report["changed_files"] == ["src/config.json", "src/ok.py"]
@@ -0,0 +1,57 @@
+import json
+
+from mcp_client import results
+from mcp_client.results import compact_lines, compact_records, compact_tool_result
+
+
+def _logs(count):
+    return [{"timestamp": f"2026-10-17T04:{i // 60:02d}:{i % 60:02d}Z", "message": f"request {i} served",
+             "service": "api", "payload": "x" * 200} for i in range(count)]
+
+
+class TestCompactLines:
+
+    def test_repeats_collapsed_errors_first(self):
+        """Lines differing only in volatile parts collapse; errors survive a tight budget"""
+        text = "\n".join([f"GET /health took {i}ms" for i in range(1, 6)] + ["ERROR database unreachable"])
+        body, kept, unique, duplicates = compact_lines(text, 12)
+        assert (unique, duplicates) == (2, 4)
+        assert "ERROR database unreachable" in body
+
+    def test_status_codes_are_not_volatile(self):
+        """Lines with different status codes stay distinct"""
+        _, _, unique, _ = compact_lines("GET /api 200\nGET /api 500", 100)
+        assert unique == 2
+
+
+class TestCompactRecords:
+
+    def test_newest_first(self):
+        """Records are kept newest first within the budget"""
+        kept, unique, _ = compact_records(_logs(3), 10_000)
+        assert unique == 3
+        assert kept[0]["message"] == "request 2 served"
+
+
+class TestCompactToolResult:
+
+    def test_small_result_unchanged(self):
+        """Results within the limit are returned as they are"""
+        result = {"status": "success", "toolUseId": "t1", "content": [{"text": "ok"}]}
+        assert compact_tool_result("search_datadog_logs", result) is result
+
+    def test_sibling_fields_kept(self, monkeypatch):
+        """Only the record list is trimmed; cursors, totals and meta stay in the payload"""
+        monkeypatch.setattr(results, "MCP_RESULT_MAX_TOKENS", 1000)
+        payload = {"meta": {"page": {"after": "cursor-123"}}, "data": _logs(200), "total": 200}
+        result = {"status": "success", "toolUseId": "t1", "content": [{"json": payload}]}
+        compacted = compact_tool_result("search_datadog_logs", result)
+
+        text = compacted["content"][0]["text"]
+        body, note = text.rsplit("\n", 1)
+        trimmed = json.loads(body)
+        assert list(trimmed) == ["meta", "data", "total"]
+        assert trimmed["meta"] == {"page": {"after": "cursor-123"}}
+        assert trimmed["total"] == 200
+        assert 0 < len(trimmed["data"]) < 200
+        assert "fetch_full_output" in note
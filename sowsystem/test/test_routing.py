@@ -0,0 +1,109 @@
+import importlib
+import json
+import random
+import threading
+
+import pytest
+
+from model import routing
+from model.routing import LITE, MICRO, PRO
+
+
+class TestRoutes:
+
+    def test_baseline_profile_is_default(self, monkeypatch):
+        """Without opting in, every role keeps the baseline model"""
+        monkeypatch.delenv("SOW_MODEL_PROFILE", raising=False)
+        monkeypatch.delenv("SOW_MODEL_ROUTES", raising=False)
+        try:
+            importlib.reload(routing)
+            assert set(routing.ROUTES.values()) == {LITE}
+        finally:
+            monkeypatch.undo()
+            importlib.reload(routing)
+
+    def test_economy_profile_is_opt_in(self, monkeypatch):
+        """SOW_MODEL_PROFILE=economy routes the intake agents to Micro"""
+        monkeypatch.setenv("SOW_MODEL_PROFILE", "economy")
+        try:
+            importlib.reload(routing)
+            assert routing.ROUTES["auditor"] == MICRO
+            assert routing.ROUTES["architect"] == LITE
+        finally:
+            monkeypatch.undo()
+            importlib.reload(routing)
+
+    def test_malformed_routes_do_not_break_import(self, monkeypatch):
+        """A malformed SOW_MODEL_ROUTES imports fine and fails validation at run start"""
+        monkeypatch.setenv("SOW_MODEL_ROUTES", "{auditor: micro}")
+        try:
+            importlib.reload(routing)
+            assert routing.ROUTES == routing.DEFAULT_ROUTES
+            with pytest.raises(ValueError, match="SOW_MODEL_ROUTES is not valid JSON"):
+                routing.validate_routing()
+            monkeypatch.setenv("SOW_MODEL_ROUTES", '["auditor"]')
+            importlib.reload(routing)
+            with pytest.raises(ValueError, match="JSON object of role to model ID"):
+                routing.validate_routing()
+        finally:
+            monkeypatch.undo()
+            importlib.reload(routing)
+
+    def test_routes_override(self, monkeypatch):
+        """SOW_MODEL_ROUTES overrides the profile; SOW_MODEL_<ROLE> overrides both"""
+        monkeypatch.setenv("SOW_MODEL_ROUTES", json.dumps({"auditor": MICRO, "artisan": MICRO}))
+        monkeypatch.setenv("SOW_MODEL_ARTISAN", PRO)
+        try:
+            importlib.reload(routing)
+            routing.validate_routing()
+            assert routing.ROUTES["auditor"] == MICRO
+            assert routing.ROUTES["artisan"] == PRO
+        finally:
+            monkeypatch.undo()
+            importlib.reload(routing)
+
+    def test_unknown_routing_mode(self, monkeypatch):
+        """An unknown SOW_MODEL_ROUTING is reported by validate_routing, naming the modes"""
+        monkeypatch.setattr(routing, "MODEL_ROUTING", "fastest")
+        with pytest.raises(ValueError, match="Unknown SOW_MODEL_ROUTING 'fastest'; use one of static, adaptive"):
+            routing.validate_routing()
+        monkeypatch.setattr(routing, "MODEL_ROUTING", "adaptive")
+        routing.validate_routing()
+
+
+class TestChooseModel:
+
+    def test_default_without_data(self):
+        """With no recorded runs the role's default model is used"""
+        assert routing.choose_model("auditor", {}, [LITE, MICRO], LITE) == LITE
+
+    def test_fastest_model_with_close_pass_rate(self):
+        """The fastest model wins when its pass rate is close to the best one"""
+        stats = {"auditor": {
+            LITE: {"runs": 10, "passes": 9, "latency": 8.0},
+            MICRO: {"runs": 10, "passes": 9, "latency": 2.0},
+            PRO: {"runs": 10, "passes": 10, "latency": 20.0},
+        }}
+        rng = random.Random(0)
+        rng.random = lambda: 1.0
+        assert routing.choose_model("auditor", stats, [LITE, MICRO, PRO], LITE, rng) == MICRO
+
+
+class TestRouteRecorder:
+
+    def test_concurrent_finishes_merge(self, tmp_path):
+        """Runs finishing at the same time each add their run to the stats file"""
+        path = str(tmp_path / "model_stats.json")
+        recorders = []
+        for _ in range(8):
+            recorder = routing.RouteRecorder(path)
+            recorder.observe("auditor", LITE, 1.0)
+            recorders.append(recorder)
+        threads = [threading.Thread(target=recorder.finish, args=(True,)) for recorder in recorders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open(path) as f:
+            entry = json.load(f)["auditor"][LITE]
+        assert (entry["runs"], entry["passes"], entry["calls"]) == (8, 8, 8)
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+# MCPSession is a strands ToolProvider
+pytest.importorskip("strands")
+
+from mcp_client import session as mcp_session  # noqa: E402
+from mcp_client.session import MCPSession, MCPSessionManager  # noqa: E402
+
+
+class _Page(list):
+    pagination_token = None
+
+
+class _FakeClient:
+    """MCPClient stand-in whose tool listing can block or fail"""
+
+    def __init__(self):
+        self.starts = 0
+        self.fail = False
+        self.probing = threading.Event()
+        self.release = threading.Event()
+        self.block = False
+
+    def start(self):
+        self.starts += 1
+
+    def stop(self, *args):
+        pass
+
+    def list_tools_sync(self, pagination_token=None):
+        if self.block:
+            self.probing.set()
+            self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("connection reset")
+        return _Page(["tool"])
+
+
+class TestMCPSession:
+
+    def test_probe_does_not_hold_the_lock(self):
+        """Other threads can use the session while a health probe is in flight"""
+        client = _FakeClient()
+        session = MCPSession("fake", lambda: client)
+        session.ensure_connected()
+        client.block = True
+        checker = threading.Thread(target=session.check)
+        checker.start()
+        assert client.probing.wait(5)
+        acquired = session._lock.acquire(timeout=1)
+        if acquired:
+            session._lock.release()
+        client.release.set()
+        checker.join(5)
+        assert acquired
+
+    def test_failed_check_reconnects(self):
+        """A failed probe restarts the same client"""
+        client = _FakeClient()
+        session = MCPSession("fake", lambda: client)
+        session.ensure_connected()
+        client.fail = True
+        assert session.check() is False
+        assert client.starts == 2
+        assert session.stats["reconnects"] == 1
+
+
+class TestMCPSessionManager:
+
+    def test_unknown_scope_fails_at_start_not_end(self, monkeypatch):
+        """A bad SOW_MCP_SESSION_SCOPE is reported when a run starts; end_run never raises"""
+        monkeypatch.setattr(mcp_session, "MCP_SESSION_SCOPE", "forever")
+        manager = MCPSessionManager(health_interval=0)
+        with pytest.raises(ValueError, match="SOW_MCP_SESSION_SCOPE"):
+            manager.start_run()
+        manager.end_run()
@@ -0,0 +1,47 @@
+import pytest
+
+from source_files import head_tail_text, is_binary, read_large_file, resolve_extensions
+
+
+class TestResolveExtensions:
+
+    def test_languages_and_extras(self):
+        """Language names map to extensions; extra extensions are normalized"""
+        assert resolve_extensions("python,go", "vue") == (".go", ".py", ".pyi", ".vue")
+
+    def test_unknown_language(self):
+        """Unknown language names are rejected"""
+        with pytest.raises(ValueError, match="Unknown language 'cobol'"):
+            resolve_extensions("cobol")
+
+
+class TestIsBinary:
+
+    def test_text_and_binary(self):
+        """NUL bytes and invalid UTF-8 are binary; UTF-8 text is not"""
+        assert not is_binary("héllo wörld\n".encode("utf-8"))
+        assert is_binary(b"PK\x03\x04\x00\x00")
+        assert is_binary(b"\xff\xfe\xfa" + b"a" * 20)
+        assert not is_binary(b"")
+
+    def test_character_cut_at_sniff_boundary(self):
+        """A multi-byte character cut off at the end is still text"""
+        assert not is_binary(("a" * 100 + "é").encode("utf-8")[:-1])
+
+
+class TestHeadTail:
+
+    def test_small_content_unchanged(self):
+        """Content within the limit is returned whole"""
+        assert head_tail_text(b"a\nb\n", 100) == "a\nb\n"
+
+    def test_large_file_keeps_whole_lines(self, tmp_path):
+        """Large files keep a head and a tail on line boundaries"""
+        path = tmp_path / "big.txt"
+        path.write_text("".join(f"line {i}\n" for i in range(1000)))
+        text = read_large_file(str(path), 200)
+        lines = text.splitlines()
+        assert lines[0] == "line 0"
+        assert lines[-1] == "line 999"
+        assert "bytes omitted of" in text
+        assert all(line.startswith(("line ", "... [")) for line in lines)
@@ -0,0 +1,191 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+import telemetry
+from telemetry import ToolSpanHooks, TracingModel, span
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Route the module's spans to an in-memory exporter"""
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(telemetry, "_tracer", lambda: provider.get_tracer(telemetry.TRACER_NAME))
+    return exporter
+
+
+class _Model:
+    """Model stub that streams a fixed list of events, then optionally fails"""
+
+    def __init__(self, events, error=None):
+        self.events = events
+        self.error = error
+
+    def get_config(self):
+        return {"model_id": "stub-model"}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        for event in self.events:
+            yield event
+        if self.error:
+            raise self.error
+
+
+_EVENTS = [
+    {"contentBlockDelta": {"delta": {"text": "hello"}}},
+    {"contentBlockDelta": {"delta": {"text": " world"}}},
+    {"metadata": {"usage": {"inputTokens": 12, "outputTokens": 3}}},
+]
+
+
+def _drain(model):
+    async def run():
+        return [event async for event in model.stream([{"role": "user", "content": [{"text": "hi"}]}])]
+    return asyncio.run(run())
+
+
+class TestSpan:
+
+    def test_records_attributes(self, exporter):
+        """span() exports one span with its non-None attributes"""
+        with span("sow.stage", **{"sow.role": "auditor", "sow.attempt": None}):
+            pass
+        (finished,) = exporter.get_finished_spans()
+        assert finished.name == "sow.stage"
+        assert dict(finished.attributes) == {"sow.role": "auditor"}
+
+    def test_exception_marks_error(self, exporter):
+        """An exception escaping the block sets the error status"""
+        with pytest.raises(RuntimeError):
+            with span("sow.stage"):
+                raise RuntimeError("boom")
+        (finished,) = exporter.get_finished_spans()
+        assert finished.status.status_code == StatusCode.ERROR
+
+
+class TestTracingModel:
+
+    def test_records_usage_and_bytes(self, exporter):
+        """A completed stream records tokens, response bytes and time to first token"""
+        events = _drain(TracingModel(_Model(_EVENTS)))
+        assert events == _EVENTS
+        (finished,) = exporter.get_finished_spans()
+        attributes = finished.attributes
+        assert finished.name == "llm.stream"
+        assert attributes["gen_ai.request.model"] == "stub-model"
+        assert attributes["gen_ai.usage.input_tokens"] == 12
+        assert attributes["gen_ai.usage.output_tokens"] == 3
+        assert attributes["sow.response_bytes"] == len("hello world")
+        assert "sow.ttft_ms" in attributes
+        assert finished.status.status_code == StatusCode.UNSET
+
+    def test_model_error_marks_error(self, exporter):
+        """An exception from the wrapped model is recorded as an error"""
+        with pytest.raises(RuntimeError):
+            _drain(TracingModel(_Model(_EVENTS, error=RuntimeError("throttled"))))
+        (finished,) = exporter.get_finished_spans()
+        assert finished.status.status_code == StatusCode.ERROR
+        assert [event.name for event in finished.events] == ["exception"]
+
+    def test_early_close_is_not_an_error(self, exporter):
+        """Closing the stream early ends the span as cancelled, not failed"""
+        async def run():
+            stream = TracingModel(_Model(_EVENTS)).stream([])
+            await stream.__anext__()
+            await stream.aclose()
+        asyncio.run(run())
+        (finished,) = exporter.get_finished_spans()
+        assert finished.attributes["sow.cancelled"] is True
+        assert finished.status.status_code == StatusCode.UNSET
+        assert not finished.events
+
+    def test_task_cancel_is_not_an_error(self, exporter):
+        """Cancelling the task reading the stream ends the span as cancelled"""
+        async def slow():
+            yield _EVENTS[0]
+            await asyncio.sleep(10)
+            yield _EVENTS[1]
+
+        model = _Model([])
+        model.stream = lambda *args, **kwargs: slow()
+
+        async def run():
+            async def consume():
+                async for _ in TracingModel(model).stream([]):
+                    pass
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        asyncio.run(run())
+        (finished,) = exporter.get_finished_spans()
+        assert finished.attributes["sow.cancelled"] is True
+        assert finished.status.status_code == StatusCode.UNSET
+
+
+class TestToolSpanHooks:
+
+    def _call(self, hooks, tool_use_id, result):
+        tool_use = {"toolUseId": tool_use_id, "name": "read_file", "input": {"path": "a.py"}}
+        hooks._before(SimpleNamespace(tool_use=tool_use))
+        hooks._after(SimpleNamespace(tool_use=tool_use, result=result))
+
+    def test_one_span_per_call(self, exporter):
+        """Each tool call gets a span with its name and status"""
+        hooks = ToolSpanHooks()
+        self._call(hooks, "t1", {"status": "success", "content": [{"text": "x = 1"}]})
+        self._call(hooks, "t2", {"status": "error", "content": [{"text": "Error: missing"}]})
+        first, second = exporter.get_finished_spans()
+        assert first.attributes["sow.tool.name"] == "read_file"
+        assert first.attributes["sow.tool.status"] == "success"
+        assert first.status.status_code == StatusCode.UNSET
+        assert second.status.status_code == StatusCode.ERROR
+        assert hooks._spans == {}
+
+    def test_unknown_call_ignored(self, exporter):
+        """An after-event without a matching before-event records nothing"""
+        hooks = ToolSpanHooks()
+        hooks._after(SimpleNamespace(tool_use={"toolUseId": "t9"}, result={"status": "success"}))
+        assert exporter.get_finished_spans() == ()
+
+
+class TestSetupTracing:
+
+    def test_file_exporter_on_existing_provider(self, monkeypatch, tmp_path):
+        """setup_tracing adds the file exporter to an installed SDK provider, once"""
+        provider = TracerProvider()
+        monkeypatch.setattr(telemetry.trace, "get_tracer_provider", lambda: provider)
+        monkeypatch.setattr(telemetry, "_tracer", lambda: provider.get_tracer(telemetry.TRACER_NAME))
+        monkeypatch.setattr(telemetry, "OTEL_EXPORTER", "file")
+        monkeypatch.setattr(telemetry, "OTEL_FILE", str(tmp_path / "spans.jsonl"))
+        monkeypatch.setattr(telemetry, "_configured", False)
+        monkeypatch.setattr(telemetry, "_provider", None)
+
+        assert telemetry.setup_tracing()
+        assert telemetry.setup_tracing()
+        with span("sow.run"):
+            pass
+        telemetry.flush_tracing()
+
+        lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+        assert len(lines) == 1
+        assert '"sow.run"' in lines[0]
+
+    def test_none_without_provider(self, monkeypatch):
+        """With SOW_OTEL_EXPORTER=none and no provider, tracing stays off"""
+        monkeypatch.setattr(telemetry, "OTEL_EXPORTER", "none")
+        monkeypatch.setattr(telemetry, "_configured", False)
+        monkeypatch.setattr(telemetry, "tracing_enabled", lambda: False)
+        assert telemetry.setup_tracing() is False
+        assert telemetry.tool_tracing_hooks() == []
@@ -0,0 +1,87 @@
+import sys
+
+import pytest
+
+import test_runner
+from test_runner import _limited_command, run_pytest, tree_hash
+
+resource = pytest.importorskip("resource")
+
+LIMITS_TEST = '''import resource
+
+
+def test_limits():
+    assert resource.getrlimit(resource.RLIMIT_CORE)[0] == 0
+'''
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(test_runner, "CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "test_limits.py").write_text(LIMITS_TEST)
+    return root
+
+
+class TestLimitedCommand:
+
+    def test_wraps_command(self):
+        """The command is started through the rlimit wrapper, not preexec_fn"""
+        command = _limited_command([sys.executable, "-m", "pytest"], 30)
+        assert command[:2] == [sys.executable, "-c"]
+        assert command[-3:] == [sys.executable, "-m", "pytest"]
+        assert '["RLIMIT_CPU", 35]' in command[3]
+
+
+class TestRunPytest:
+
+    def test_limits_applied_and_cached(self, project):
+        """Tests see the rlimits, and a second run on the same tree is cached"""
+        result = run_pytest(str(project))
+        assert result["status"] == "passed", result["output"]
+        assert result["cached"] is False
+        assert run_pytest(str(project))["cached"] is True
+
+    def test_timeout_is_capped(self, project, monkeypatch):
+        """A caller-supplied timeout cannot exceed the configured maximum"""
+        monkeypatch.setattr(test_runner, "TEST_MAX_TIMEOUT_SECONDS", 1)
+        (project / "test_slow.py").write_text("import time\n\n\ndef test_slow():\n    time.sleep(30)\n")
+        result = run_pytest(str(project), timeout=3600, use_cache=False)
+        assert result["status"] == "timeout"
+        assert result["summary"] == "timed out after 1s"
+
+    def test_tree_hash_tracks_content(self, project):
+        """Editing a file changes the tree hash"""
+        before = tree_hash(str(project))
+        (project / "test_limits.py").write_text(LIMITS_TEST + "\n# edited\n")
+        assert tree_hash(str(project)) != before
+
+    def test_tree_hash_includes_ignored_files(self, project):
+        """Editing a gitignored file the tests read changes the tree hash"""
+        (project / ".gitignore").write_text("fixtures/\n*.local\n")
+        (project / "fixtures").mkdir()
+        (project / "fixtures" / "data.json").write_text('{"rows": 1}')
+        before = tree_hash(str(project))
+        (project / "fixtures" / "data.json").write_text('{"rows": 2}')
+        edited = tree_hash(str(project))
+        assert edited != before
+        (project / "settings.local").write_text("debug = true")
+        assert tree_hash(str(project)) != edited
+
+    def test_cached_result_not_reused_after_ignored_edit(self, project):
+        """A cached result is not replayed once a gitignored fixture changes"""
+        (project / ".gitignore").write_text("expected.txt\n")
+        (project / "expected.txt").write_text("one")
+        (project / "test_fixture.py").write_text(
+            "from pathlib import Path\n\n\n"
+            "def test_fixture():\n"
+            "    assert (Path(__file__).parent / 'expected.txt').read_text() == 'one'\n"
+        )
+        first = run_pytest(str(project), ["test_fixture.py"])
+        assert first["status"] == "passed"
+        assert run_pytest(str(project), ["test_fixture.py"])["cached"]
+        (project / "expected.txt").write_text("two")
+        second = run_pytest(str(project), ["test_fixture.py"])
+        assert not second["cached"]
+        assert second["status"] == "failed"
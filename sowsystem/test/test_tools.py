@@ -0,0 +1,82 @@
+import ast
+
+import pytest
+
+# The tools are declared with strands' @tool decorator
+pytest.importorskip("strands")
+
+from tools import _render_page, _strip_comments_and_docstrings, read_source_code  # noqa: E402
+
+
+def _page(files, cursor=0, max_bytes=10_000):
+    return _render_page("src", sorted(files), cursor, max_bytes, lambda path: files[path])
+
+
+class TestRenderPage:
+
+    def test_single_page(self):
+        """All files fit: the page ends with END"""
+        page = _page({"a.py": "a = 1", "b.py": "b = 2"})
+        assert "=== src/a.py ===\na = 1" in page
+        assert page.endswith("--- files 1-2 of 2; END ---")
+
+    def test_budget_and_cursor(self):
+        """Files past the byte budget move to the next page, reached with the cursor"""
+        files = {f"f{i}.py": "x" * 40 for i in range(5)}
+        page = _page(files, max_bytes=130)
+        assert page.endswith("--- files 1-2 of 5; NEXT CURSOR: 2 ---")
+        page = _page(files, cursor=2, max_bytes=130)
+        assert "=== src/f2.py ===" in page and "=== src/f1.py ===" not in page
+        assert page.endswith("--- files 3-4 of 5; NEXT CURSOR: 4 ---")
+
+    def test_oversized_file_still_shown(self):
+        """A page always holds at least one file, even over budget"""
+        page = _page({"big.py": "y" * 500}, max_bytes=10)
+        assert "y" * 500 in page
+        assert page.endswith("END ---")
+
+
+class TestReadSourceCode:
+
+    def test_per_file_cap(self, tmp_path):
+        """Files over max_file_bytes show only their beginning and end"""
+        (tmp_path / "long.py").write_text("".join(f"line_{i} = {i}\n" for i in range(500)))
+        page = read_source_code(str(tmp_path), max_file_bytes=200)
+        assert "line_0 = 0" in page and "line_499 = 499" in page
+        assert "line_250 = 250" not in page
+
+    def test_cursor_out_of_range(self, tmp_path):
+        """A cursor past the last file is reported"""
+        (tmp_path / "a.py").write_text("a = 1\n")
+        assert read_source_code(str(tmp_path), cursor=5).startswith("Error: cursor 5 is out of range")
+
+    def test_compact_mode(self, tmp_path):
+        """compact=True strips comments and docstrings from Python files"""
+        (tmp_path / "mod.py").write_text('"""Module."""\n# comment\nx = 1  # trailing\n')
+        page = read_source_code(str(tmp_path), compact=True)
+        assert "x = 1\n" in page
+        assert "comment" not in page and "Module" not in page and "trailing" not in page
+
+
+class TestStripCommentsAndDocstrings:
+
+    def test_docstring_only_body_becomes_ellipsis(self):
+        """A body that was only a docstring stays valid"""
+        stripped = _strip_comments_and_docstrings('def f():\n    """Doc.\n\n    More.\n    """\n')
+        assert stripped == "def f():\n    ..."
+
+    def test_docstring_on_def_line_is_kept(self):
+        """A docstring sharing its line with the def is left alone, keeping the def"""
+        source = 'def f(): """doc"""\nclass A: """doc"""\n'
+        stripped = _strip_comments_and_docstrings(source)
+        assert stripped == source.rstrip("\n")
+        ast.parse(stripped)
+
+    def test_docstring_followed_by_code(self):
+        """Docstrings before other statements are removed with their lines"""
+        source = 'class A:\n    """Doc."""\n    x = 1\n\n    def m(self):\n        """Doc."""\n        return 2\n'
+        assert _strip_comments_and_docstrings(source) == "class A:\n    x = 1\n    def m(self):\n        return 2"
+
+    def test_syntax_error_returned_unchanged(self):
+        """Unparsable sources are not touched"""
+        assert _strip_comments_and_docstrings("def broken(:\n") == "def broken(:\n"
@@ -0,0 +1,74 @@
+import json
+
+from verdicts import (
+    QAVerdict, RequirementLedger, RequirementVerdict, extract_json, parse_qa_verdict, parse_requirements,
+    select_requirements,
+)
+
+AUDITOR_OUTPUT = """Here are the requirements:
+```json
+{"requirements": [
+  {"id": "REQ-1", "type": "deliverable", "description": "Add /health"},
+  {"id": "REQ-2", "type": "deliverable", "description": "Add /ready"},
+  {"id": "REQ-3", "type": "constraint", "description": "Python 3.10"}
+]}
+```"""
+
+
+class TestParsing:
+
+    def test_extract_json_skips_prose(self):
+        """The first JSON value with the required key is found inside prose"""
+        assert extract_json('note {"a": 1} then {"verdict": "PASS"}', "verdict") == {"verdict": "PASS"}
+        assert extract_json("no json here") is None
+
+    def test_parse_requirements(self):
+        """Requirements are keyed by ID in SOW order"""
+        requirements = parse_requirements(AUDITOR_OUTPUT)
+        assert list(requirements) == ["REQ-1", "REQ-2", "REQ-3"]
+        assert requirements["REQ-3"]["type"] == "constraint"
+        assert parse_requirements("no requirements") == {}
+
+    def test_structured_verdict(self):
+        """A failing requirement makes the verdict FAIL whatever it claims"""
+        verdict = parse_qa_verdict(json.dumps({
+            "verdict": "PASS",
+            "requirements": [{"id": "REQ-1", "status": "met"}, {"id": "REQ-2", "status": "FAIL", "reason": "404"}],
+        }))
+        assert verdict.structured
+        assert verdict.verdict == "FAIL"
+        assert [r.id for r in verdict.failed()] == ["REQ-2"]
+        assert verdict.failure_report() == "- REQ-2: 404"
+
+    def test_legacy_text_verdict(self):
+        """Plain "PASS" / "FAIL: reason" output is still understood"""
+        assert parse_qa_verdict("PASS all good").passed
+        failed = parse_qa_verdict("FAIL: missing endpoint")
+        assert failed.verdict == "FAIL" and failed.summary == "missing endpoint"
+        assert parse_qa_verdict("I am not sure").verdict == "UNCLEAR"
+
+
+class TestRequirementLedger:
+
+    def test_passed_requirements_stay_passed(self):
+        """Retries only keep the still-failing requirements pending"""
+        ledger = RequirementLedger(["REQ-1", "REQ-2", "REQ-3"])
+        ledger.record(QAVerdict("FAIL", [RequirementVerdict("REQ-1", "PASS"), RequirementVerdict("REQ-2", "FAIL")]))
+        assert ledger.pending_ids() == ["REQ-2", "REQ-3"]
+
+        verdict = QAVerdict("PASS")
+        ledger.record(verdict, judged_ids=["REQ-2", "REQ-3"])
+        assert ledger.pending_ids() == []
+        assert ledger.complete(verdict)
+
+    def test_without_requirement_ids(self):
+        """Without IDs, the overall verdict decides"""
+        ledger = RequirementLedger([])
+        assert not ledger.complete(QAVerdict("FAIL"))
+        assert ledger.complete(QAVerdict("PASS"))
+
+    def test_select_requirements_keeps_full_objects(self):
+        """Selected requirements are passed in full, in the requested order"""
+        requirements = parse_requirements(AUDITOR_OUTPUT)
+        selected = json.loads(select_requirements(requirements, ["REQ-3", "REQ-1", "REQ-9"]))
+        assert selected == {"requirements": [requirements["REQ-3"], requirements["REQ-1"]]}
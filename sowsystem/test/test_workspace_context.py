@@ -0,0 +1,67 @@
+import os
+
+import workspace_index
+from workspace_context import create_branch, detach_tree, promote_branch, remove_branches
+
+
+class TestBranches:
+
+    def test_detached_branch_does_not_share_inodes(self, tmp_path):
+        """In-place writes in a detached branch leave the parent's src/ unchanged"""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("x = 1\n")
+        branch = create_branch("plan-1", str(tmp_path))
+        linked = os.path.join(branch, "src", "app.py")
+        assert os.stat(linked).st_nlink == 2
+
+        assert detach_tree(os.path.join(branch, "src")) == 1
+        with open(linked, 'a') as f:
+            f.write("y = 2\n")
+        assert (tmp_path / "src" / "app.py").read_text() == "x = 1\n"
+        assert detach_tree(os.path.join(branch, "src")) == 0
+
+    def test_promote_applies_branch_changes(self, tmp_path):
+        """Promotion adds, modifies and removes files to match the branch"""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "keep.py").write_text("keep = 1\n")
+        (tmp_path / "src" / "old.py").write_text("old = 1\n")
+        branch = create_branch("plan-1", str(tmp_path))
+        branch_src = os.path.join(branch, "src")
+        os.remove(os.path.join(branch_src, "old.py"))
+        with open(os.path.join(branch_src, "new.py"), 'w') as f:
+            f.write("new = 1\n")
+
+        assert promote_branch(branch, str(tmp_path)) == ["new.py", "old.py"]
+        assert sorted(os.listdir(tmp_path / "src")) == ["keep.py", "new.py"]
+        remove_branches(str(tmp_path))
+        assert not (tmp_path / "branches").exists()
+
+    def test_remove_branches_drops_branch_indexes(self, tmp_path, monkeypatch):
+        """Removing branches forgets their in-memory indexes and persisted index files"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "metadata").mkdir()
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("x = 1\n")
+        for slot in (1, 2):
+            branch = create_branch(f"plan-{slot}")
+            with open(os.path.join(branch, "src", "new.py"), 'w') as f:
+                f.write(f"plan = {slot}\n")
+            promote_branch(branch)
+        branches = os.path.realpath("branches")
+        assert sorted(os.listdir("metadata")) == [
+            "file_index_branches_plan-1_src.json", "file_index_branches_plan-2_src.json", "file_index_src.json",
+        ]
+
+        remove_branches()
+        assert os.listdir("metadata") == ["file_index_src.json"]
+        assert not [key for key in workspace_index._indexes if key.startswith(branches + os.sep)]
+        assert os.path.realpath("src") in workspace_index._indexes
+
+    def test_recreated_branch_starts_with_a_fresh_index(self, tmp_path):
+        """Replacing a branch drops the index of the old one"""
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "app.py").write_text("x = 1\n")
+        branch = create_branch("plan-1", str(tmp_path))
+        old_index = workspace_index.get_workspace_index(os.path.join(branch, "src"))
+        branch = create_branch("plan-1", str(tmp_path))
+        assert workspace_index.get_workspace_index(os.path.join(branch, "src")) is not old_index
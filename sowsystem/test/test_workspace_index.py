@@ -0,0 +1,69 @@
+import os
+
+from workspace_index import WorkspaceIndex, get_workspace_index, mark_file_changed
+
+
+class TestWorkspaceIndex:
+
+    def test_refresh_reports_changes(self, tmp_path):
+        """Refresh reports added, modified and removed files"""
+        (tmp_path / "a.py").write_text("a = 1\n")
+        (tmp_path / "b.py").write_text("b = 1\n")
+        index = WorkspaceIndex(tmp_path)
+        assert index.refresh()["added"] == ["a.py", "b.py"]
+
+        (tmp_path / "a.py").write_text("a = 22\n")
+        (tmp_path / "b.py").unlink()
+        changes = index.refresh()
+        assert changes == {"added": [], "modified": ["a.py"], "removed": ["b.py"]}
+
+    def test_diff_against_snapshot(self, tmp_path):
+        """diff() compares content hashes against an earlier snapshot"""
+        (tmp_path / "a.py").write_text("a = 1\n")
+        index = WorkspaceIndex(tmp_path)
+        index.refresh()
+        baseline = index.snapshot()
+        (tmp_path / "new.py").write_text("x = 1\n")
+        assert index.diff(baseline)["added"] == ["new.py"]
+
+    def test_index_file_name_keeps_leading_dot(self, tmp_path):
+        """The persisted index name is derived from the path, not stripped of characters"""
+        index = WorkspaceIndex("./.venv-tools", metadata_dir=tmp_path)
+        assert index.index_path.name == "file_index_.venv-tools.json"
+        index = WorkspaceIndex("src/app", metadata_dir=tmp_path)
+        assert index.index_path.name == "file_index_src_app.json"
+        index = WorkspaceIndex(".", metadata_dir=tmp_path)
+        assert index.index_path.name == "file_index_root.json"
+
+
+class TestWrittenFiles:
+
+    def test_gitignored_written_file_is_indexed(self, tmp_path):
+        """Files written through the tools show up in diffs even if .gitignore matches them"""
+        (tmp_path / ".gitignore").write_text("generated/\n*.log\n")
+        (tmp_path / "app.py").write_text("print(1)\n")
+        index = get_workspace_index(str(tmp_path))
+        index.refresh()
+        baseline = index.snapshot()
+
+        (tmp_path / "generated").mkdir()
+        written = tmp_path / "generated" / "client.py"
+        written.write_text("x = 1\n")
+        mark_file_changed(str(written))
+        (tmp_path / "debug.log").write_text("not written by a tool\n")
+
+        changes = index.diff(baseline)
+        assert changes["added"] == ["generated/client.py"]
+
+    def test_removed_written_file_is_reported(self, tmp_path):
+        """A written file that is deleted again is reported as removed"""
+        (tmp_path / ".gitignore").write_text("*.out\n")
+        written = tmp_path / "result.out"
+        written.write_text("1\n")
+        mark_file_changed(str(written))
+        index = WorkspaceIndex(tmp_path)
+        index.refresh()
+        assert "result.out" in index.files()
+
+        os.remove(written)
+        assert index.refresh()["removed"] == ["result.out"]